@@ -0,0 +1,255 @@
+"""Admission control: shed load early instead of timing out late."""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from starlette.responses import JSONResponse
+
+from application.src.core.config import Settings
+from application.src.core.loop_monitor import LoopMonitor, get_loop_monitor
+
+DEFAULT_CLASS = "default"
+
+# Weight of the newest sample in the latency and queue wait averages
+EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """A request was turned away; retry after ``retry_after`` seconds."""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+@dataclass
+class RouteClassState:
+    """Limits and live load of one route class."""
+
+    limit: int
+    max_queue: int
+    slots: asyncio.Semaphore = field(init=False)
+    in_flight: int = 0
+    waiting: int = 0
+    rejected: int = 0
+    latency: Optional[float] = None  # Seconds a request runs, averaged
+    queue_wait: float = 0.0  # Seconds admitted requests waited, averaged
+
+    def __post_init__(self):
+        self.slots = asyncio.Semaphore(self.limit)
+
+
+def _ewma(average: Optional[float], sample: float) -> float:
+    if average is None:
+        return sample
+    return average + EWMA_ALPHA * (sample - average)
+
+
+class AdmissionController:
+    """Caps requests in flight per route class and rejects the excess.
+
+    A request beyond a class's limit waits in a bounded queue for a free
+    slot. It is rejected at once with 429 when that queue is full, and
+    with 503 when it would wait longer than ``queue_timeout``, going by
+    how long the class's requests take, or when the event loop is
+    lagging. Each rejection carries the number of seconds the work
+    already queued should take to drain.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, int],
+        max_queue: Dict[str, int],
+        queue_timeout: float = 5.0,
+        max_loop_lag: float = 0.5,
+        max_retry_after: int = 60,
+        loop_monitor: Optional[LoopMonitor] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the controller.
+
+        Args:
+            limits: Requests in flight per route class; classes not
+                listed share the 'default' limits
+            max_queue: Requests that may wait per route class
+            queue_timeout: Longest a request waits for a slot
+            max_loop_lag: Event loop lag beyond which requests are shed
+            max_retry_after: Cap on the Retry-After given
+            loop_monitor: Source of the event loop lag
+            clock: Monotonic time source
+        """
+        self.limits = limits
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_loop_lag = max_loop_lag
+        self.max_retry_after = max_retry_after
+        self.loop_monitor = loop_monitor or get_loop_monitor()
+        self.clock = clock
+        self.classes: Dict[str, RouteClassState] = {}
+
+    def state(self, route_class: str) -> RouteClassState:
+        """Return a route class's state, creating it on first use."""
+        state = self.classes.get(route_class)
+        if state is None:
+            name = route_class if route_class in self.limits else DEFAULT_CLASS
+            state = self.classes[route_class] = RouteClassState(
+                limit=self.limits[name],
+                max_queue=self.max_queue.get(name, self.limits[name]),
+            )
+        return state
+
+    @property
+    def loop_lag(self) -> float:
+        return self.loop_monitor.lag
+
+    @property
+    def overloaded(self) -> bool:
+        """Whether the event loop is too far behind to take requests."""
+        return self.loop_lag > self.max_loop_lag
+
+    def retry_after(self, state: RouteClassState) -> int:
+        """Seconds until the requests queued ahead should have run."""
+        latency = state.latency or 1.0
+        drain = latency * (state.waiting + 1) / state.limit
+        return min(self.max_retry_after, max(1, math.ceil(drain)))
+
+    def _reject(
+        self, state: RouteClassState, status_code: int, detail: str
+    ) -> Overloaded:
+        state.rejected += 1
+        return Overloaded(status_code, self.retry_after(state), detail)
+
+    async def acquire(self, route_class: str) -> float:
+        """Wait for a slot in a route class.
+
+        Returns:
+            Clock time the request was admitted, for ``release``
+
+        Raises:
+            Overloaded: The request should be rejected
+        """
+        state = self.state(route_class)
+        if self.overloaded:
+            raise self._reject(state, 503, "Server overloaded")
+        if state.slots.locked():
+            if state.waiting >= state.max_queue:
+                raise self._reject(state, 429, "Too many requests")
+            wait = (state.latency or 0.0) * (state.waiting + 1) / state.limit
+            if wait > self.queue_timeout:
+                raise self._reject(state, 503, "Server overloaded")
+
+        queued = self.clock()
+        state.waiting += 1
+        try:
+            await asyncio.wait_for(state.slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject(state, 503, "Server overloaded")
+        finally:
+            state.waiting -= 1
+        admitted = self.clock()
+        state.queue_wait = _ewma(state.queue_wait, admitted - queued)
+        state.in_flight += 1
+        return admitted
+
+    def release(self, route_class: str, admitted: float) -> None:
+        """Free the slot taken by ``acquire``."""
+        state = self.state(route_class)
+        state.in_flight -= 1
+        state.latency = _ewma(state.latency, self.clock() - admitted)
+        state.slots.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current load, e.g. for readiness checks."""
+        return {
+            "loop_lag": self.loop_lag,
+            "classes": {
+                name: {
+                    "in_flight": state.in_flight,
+                    "waiting": state.waiting,
+                    "rejected": state.rejected,
+                    "latency": state.latency,
+                    "queue_wait": state.queue_wait,
+                }
+                for name, state in self.classes.items()
+            },
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an ``AdmissionController`` to requests."""
+
+    def __init__(
+        self,
+        app: Any,
+        controller: Optional[AdmissionController] = None,
+        route_classes: Optional[Dict[str, str]] = None,
+        exempt_paths: Iterable[str] = (),
+    ):
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to protect
+            controller: Admission controller, the process-wide one if
+                omitted
+            route_classes: Path prefix to route class; other paths are
+                in the 'default' class
+            exempt_paths: Paths always admitted, e.g. health checks
+        """
+        self.app = app
+        self.controller = controller or get_admission_controller()
+        # Longest prefix first so nested prefixes win
+        self.route_classes = sorted(
+            (route_classes or {}).items(), key=lambda item: -len(item[0])
+        )
+        self.exempt_paths = set(exempt_paths)
+
+    def classify(self, path: str) -> str:
+        """Return the route class of a request path."""
+        for prefix, route_class in self.route_classes:
+            if path.startswith(prefix):
+                return route_class
+        return DEFAULT_CLASS
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.classify(scope["path"])
+        try:
+            admitted = await self.controller.acquire(route_class)
+        except Overloaded as e:
+            response = JSONResponse(
+                {"detail": e.detail},
+                status_code=e.status_code,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class, admitted)
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller."""
+    global _admission_controller
+    if _admission_controller is None:
+        settings = Settings()
+        _admission_controller = AdmissionController(
+            settings.ADMISSION_LIMITS,
+            settings.ADMISSION_QUEUE_LIMITS,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+            max_loop_lag=settings.ADMISSION_MAX_LOOP_LAG,
+            max_retry_after=settings.ADMISSION_MAX_RETRY_AFTER,
+        )
+    return _admission_controller
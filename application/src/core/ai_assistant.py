@@ -3,56 +3,42 @@
 import json
 import os
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-import anthropic
-import openai
 import pinecone
 from langchain.embeddings import OpenAIEmbeddings
 
+from application.src.core.config import Settings
+from application.src.services.ai.clients import LLMClientPool, get_client_pool
+from application.src.services.ai.model_selector import (
+    ModelSelector,
+    get_model_selector,
+)
+from application.src.services.ai.scheduler import scheduling
+from application.src.services.cache import get_semantic_cache
+
 
 class AIAssistant:
     """Manages AI-driven project analysis and code generation tasks."""
 
-    def __init__(self):
+    def __init__(self, client_pool: Optional[LLMClientPool] = None):
         """Initialize AI assistant with required API clients.
 
-        Sets up OpenAI, Anthropic, and Pinecone clients using env vars
-        for authentication and configuration.
-        """
-        # Initialize API clients with configuration
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if not openai_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-        anthropic_key = os.getenv("ANTHROPIC_API_KEY")
-        if not anthropic_key:
-            raise ValueError(
-                "ANTHROPIC_API_KEY environment variable is required"
-            )
+        Routes completions through the shared model gateway, and sets up
+        embeddings and Pinecone using env vars for authentication and
+        configuration.
 
-        # Initialize Helicone configuration
-        helicone_key = os.getenv("HELICONE_API_KEY")
-        if not helicone_key:
-            raise ValueError(
-                "HELICONE_API_KEY environment variable is required"
-            )
-
-        # Configure OpenAI client with Helicone integration
-        self.openai_client = openai.OpenAI(
-            api_key=openai_key,
-            max_retries=3,
-            timeout=30.0,
-            default_headers={
-                "X-Custom-Header": "nu-cron",
-                "Helicone-Auth": f"Bearer {helicone_key}",
-                "Helicone-Cache-Enabled": "true",
-                "Helicone-Cache-TTL": "3600",
-                "Helicone-Retry-Enabled": "true",
-                "Helicone-Rate-Limit-Policy": "throttle",
-            },
-            base_url="https://api.helicone.ai/v1/openai",
+        Args:
+            client_pool: Async provider clients, shared pool and selector
+                if omitted
+        """
+        self.client_pool = client_pool or get_client_pool()
+        self.model_selector = (
+            ModelSelector(Settings(), client_pool=client_pool)
+            if client_pool
+            else get_model_selector()
         )
-        self.claude_client = anthropic.Anthropic(api_key=anthropic_key)
+        openai_key = os.getenv("OPENAI_API_KEY")
         self.embeddings = OpenAIEmbeddings(openai_api_key=openai_key)
 
         # Initialize Pinecone vector store
@@ -67,26 +53,26 @@ class AIAssistant:
                 name=self.index_name, dimension=1536, metric="cosine"
             )
         self.index = pinecone.Index(self.index_name)
+        # Opt-in reuse of analyses for reworded requirements
+        self.semantic_cache = get_semantic_cache()
 
-    async def select_model(self, task_type: str) -> tuple[str, Any]:
+    async def select_model(self, task_type: str) -> str:
         """Select the most appropriate AI model based on task type.
 
         Args:
             task_type: Type of task to select model for.
 
         Returns:
-            Tuple containing:
-                - model_name: Name of the AI model to use
-                - client: API client instance for the model
+            Provider key from AI_MODELS; its fallback chain is walked by
+            the model gateway.
         """
-        default = ("gpt-4-turbo-preview", self.openai_client)
         model_mapping = {
-            "requirement_analysis": default,
-            "code_generation": default,
-            "code_review": ("claude-3-opus", self.claude_client),
-            "testing": ("mistral-7b", None),  # Placeholder
+            "requirement_analysis": "openai",
+            "code_generation": "openai",
+            "code_review": "claude",
+            "testing": "mistral",
         }
-        return model_mapping.get(task_type, default)
+        return model_mapping.get(task_type, "openai")
 
     async def analyze_requirements(
         self, project_data: Dict[str, Any]
@@ -100,8 +86,46 @@ class AIAssistant:
         Returns:
             Dictionary containing analysis results and model info.
         """
-        model, client = await self.select_model("requirement_analysis")
+        provider = await self.select_model("requirement_analysis")
+        model = self.model_selector.providers[provider]["name"]
 
+        try:
+            with scheduling(project_id=project_data.get("id")):
+                if self.semantic_cache is None:
+                    return await self._analyze_requirements(
+                        project_data, provider
+                    )
+                request = {
+                    key: project_data.get(key)
+                    for key in ("name", "description", "requirements")
+                }
+                result = await self.semantic_cache.get_or_compute(
+                    f"requirement_analysis:{model}",
+                    request,
+                    lambda: self._analyze_requirements(project_data, provider),
+                )
+                if "semantic_similarity" in result:
+                    # Reused from a similar project; index it for this one
+                    await self._index_analysis(
+                        project_data, result.get("analysis")
+                    )
+                return result
+        except Exception as e:
+            return {"status": "error", "error": str(e), "model_used": model}
+
+    async def _analyze_requirements(
+        self, project_data: Dict[str, Any], provider: str
+    ) -> Dict[str, Any]:
+        """Run the requirement analysis and index it in Pinecone.
+
+        Args:
+            project_data: Dictionary containing project details and
+                requirements.
+            provider: Provider key the completion is routed to.
+
+        Returns:
+            Dictionary containing analysis results and model info.
+        """
         # Format project data for prompt
         name = project_data.get("name")
         desc = project_data.get("description")
@@ -122,60 +146,59 @@ class AIAssistant:
             "5. Implementation timeline"
         )
 
-        try:
-            if isinstance(client, openai.OpenAI):
-                # Generate analysis using OpenAI
-                completion = await client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7,
-                    max_tokens=2000,
-                )
-                analysis = completion.choices[0].message.content
-            elif isinstance(client, anthropic.Anthropic):
-                # Generate analysis using Anthropic
-                msg = await client.messages.create(
-                    model=model,
-                    max_tokens=2000,
-                    messages=[{"role": "user", "content": prompt}],
-                )
-                analysis = msg.content[0].text
-
-            # Store analysis in vector store
-            query_text = analysis[:1000]  # Limit text length
-            embedding = await self.embeddings.aembed_query(query_text)
-            timestamp = datetime.utcnow()
-            vector_id = f"req-{timestamp.timestamp()}"
-
-            # Create vector metadata
-            metadata = {
-                "project_id": project_data.get("id"),
-                "type": "requirement_analysis",
-                "timestamp": (timestamp.isoformat()),
-            }
+        response = await self.model_selector.generate_completion(
+            prompt,
+            model=provider,
+            task_type="requirement_analysis",
+            temperature=0.7,
+            max_tokens=2000,
+        )
+        analysis = response.content
+        model = response.model
+        await self._index_analysis(project_data, analysis)
 
-            # Store in Pinecone
-            vector = {
-                "id": vector_id,
-                "values": embedding,
-                "metadata": metadata,
-            }
-            self.index.upsert(vectors=[vector])
+        # Parse analysis if needed
+        parsed = (
+            json.loads(analysis) if isinstance(analysis, str) else analysis
+        )
 
-            # Parse analysis if needed
-            parsed = (
-                json.loads(analysis) if isinstance(analysis, str) else analysis
-            )
+        # Return formatted response
+        return {
+            "status": "success",
+            "analysis": parsed,
+            "model_used": model,
+        }
 
-            # Return formatted response
-            return {
-                "status": "success",
-                "analysis": parsed,
-                "model_used": model,
-            }
+    async def _index_analysis(
+        self, project_data: Dict[str, Any], analysis: Any
+    ) -> None:
+        """Store a requirement analysis in Pinecone for a project.
 
-        except Exception as e:
-            return {"status": "error", "error": str(e), "model_used": model}
+        Args:
+            project_data: Dictionary containing project details.
+            analysis: Analysis text, or its parsed form.
+        """
+        if not isinstance(analysis, str):
+            analysis = json.dumps(analysis)
+        query_text = analysis[:1000]  # Limit text length
+        embedding = await self.embeddings.aembed_query(query_text)
+        timestamp = datetime.utcnow()
+        vector_id = f"req-{timestamp.timestamp()}"
+
+        # Create vector metadata
+        metadata = {
+            "project_id": project_data.get("id"),
+            "type": "requirement_analysis",
+            "timestamp": (timestamp.isoformat()),
+        }
+
+        # Store in Pinecone
+        vector = {
+            "id": vector_id,
+            "values": embedding,
+            "metadata": metadata,
+        }
+        self.index.upsert(vectors=[vector])
 
     async def assess_project_risks(self, project_id: int) -> Dict[str, Any]:
         """Perform risk assessment and feasibility analysis.
@@ -194,7 +217,8 @@ class AIAssistant:
             include_metadata=True,
         )
 
-        model, client = await self.select_model("requirement_analysis")
+        provider = await self.select_model("requirement_analysis")
+        model = self.model_selector.providers[provider]["name"]
 
         prompt = (
             f"Based on the project context and similar projects, "
@@ -210,23 +234,16 @@ class AIAssistant:
         )
 
         try:
-            if isinstance(client, openai.OpenAI):
-                # Generate assessment using OpenAI
-                completion = await client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": prompt}],
+            with scheduling(project_id=project_id):
+                response = await self.model_selector.generate_completion(
+                    prompt,
+                    model=provider,
+                    task_type="requirement_analysis",
                     temperature=0.7,
                     max_tokens=2000,
                 )
-                assessment = completion.choices[0].message.content
-            elif isinstance(client, anthropic.Anthropic):
-                # Generate assessment using Anthropic
-                msg = await client.messages.create(
-                    model=model,
-                    max_tokens=2000,
-                    messages=[{"role": "user", "content": prompt}],
-                )
-                assessment = msg.content[0].text
+            assessment = response.content
+            model = response.model
 
             # Parse assessment if needed
             assessment_data = (
@@ -12,6 +12,161 @@ class Settings(BaseSettings):
     OPENAI_MAX_RETRIES: int = 3
     OPENAI_TIMEOUT: float = 30.0
     OPENAI_DEFAULT_HEADERS: dict = {"X-Custom-Header": "nu-cron"}
+    OPENAI_BASE_URL: str = "https://api.helicone.ai/v1/openai"
+
+    # OpenAI-compatible provider endpoints
+    MISTRAL_BASE_URL: str = "https://api.mistral.ai/v1"
+    GROQ_BASE_URL: str = "https://api.groq.com/openai/v1"
+
+    # Shared LLM HTTP transport
+    LLM_HTTP2_ENABLED: bool = True
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Hedged requests across the fallback chain
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_DELAY: float = 2.0  # Used until enough samples exist
+    LLM_HEDGE_MIN_DELAY: float = 0.5
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_MAX_INFLIGHT: int = 2
+    LLM_LATENCY_WINDOW: int = 200
+
+    # Per-model circuit breaker
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_MIN_CALLS: int = 5
+    CIRCUIT_BREAKER_WINDOW: float = 60.0
+    CIRCUIT_BREAKER_COOLDOWN: float = 30.0
+    CIRCUIT_BREAKER_HALF_OPEN_PROBES: int = 1
+    CIRCUIT_BREAKER_SLOW_CALL: float = 25.0
+
+    # Local rate limiting ("memory" per worker or "redis" shared)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    # Fraction of each provider limit reserved per scheduler lane, so
+    # batch work cannot spend the interactive budget; {} shares one budget
+    RATE_LIMIT_LANE_SHARES: dict[str, float] = {
+        "interactive": 0.75,
+        "batch": 0.25,
+    }
+
+    # Provider call scheduling: concurrent calls per lane, shared fairly
+    # between users by weight (1.0 unless listed, e.g. {"user:1": 2.0})
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LANES: dict[str, int] = {"interactive": 32, "batch": 8}
+    SCHEDULER_TENANT_WEIGHTS: dict[str, float] = {}
+
+    # Admission control: requests in flight and queued per route class
+    # ("generation" for the AI routes; others share "default")
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_LIMITS: dict[str, int] = {"generation": 64, "default": 256}
+    ADMISSION_QUEUE_LIMITS: dict[str, int] = {
+        "generation": 64,
+        "default": 256,
+    }
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0  # Longest wait for a slot
+    ADMISSION_MAX_LOOP_LAG: float = 0.5  # Shed everything beyond this
+    ADMISSION_MAX_RETRY_AFTER: int = 60
+    ADMISSION_EXEMPT_PATHS: list[str] = [
+        "/health",
+        "/ready",
+        "/diagnostics/loop",
+        "/metrics",
+    ]
+
+    # Event loop lag sampling; diagnostics mode also logs the stack of
+    # code holding the loop past the threshold and counts blocked time
+    # per route
+    LOOP_MONITOR_INTERVAL: float = 0.1
+    LOOP_DIAGNOSTICS_ENABLED: bool = False
+    LOOP_BLOCKING_THRESHOLD: float = 0.1
+
+    # Coalescing of identical in-flight generations ("memory" or "redis")
+    SINGLE_FLIGHT_BACKEND: str = "memory"
+    SINGLE_FLIGHT_LOCK_TTL: float = 120.0
+    SINGLE_FLIGHT_WAIT_TIMEOUT: float = 120.0
+
+    # Shared asyncio Redis connection pool
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0  # Wait for a free connection
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+
+    # In-process tier in front of the Redis generation cache
+    GENERATION_CACHE_LOCAL_SIZE: int = 1024
+    GENERATION_CACHE_LOCAL_TTL: float = 300.0
+    # Spread expiries of entries written together (fraction of the TTL)
+    GENERATION_CACHE_TTL_JITTER: float = 0.1
+    # Seconds an expired entry is served while it is recomputed
+    GENERATION_CACHE_STALE_TTL: int = 600
+    # XFetch weight for early refresh, 0 disables it
+    GENERATION_CACHE_EARLY_REFRESH_BETA: float = 1.0
+
+    # Embedding-similarity cache for reworded requests (opt-in)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95  # Cosine similarity
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 2048  # Per language/model scope
+    SEMANTIC_CACHE_TTL: float = 3600.0
+
+    # Batch generation endpoints
+    BATCH_MAX_ITEMS: int = 100
+    BATCH_CONCURRENCY: int = 8  # Cache misses generated at once
+
+    # Offline bulk generation through provider batch APIs
+    BATCH_PROVIDER: str = "openai"  # openai or local
+    BATCH_LOCAL_DIR: str = "/tmp/nu-cron/batches"
+    BATCH_COMPLETION_WINDOW: str = "24h"
+    BATCH_POLL_INTERVAL: float = 60.0
+    BATCH_TIMEOUT: float = 86400.0
+
+    # Background job queue and workers
+    JOB_RESULT_TTL: int = 86400  # Seconds job records are kept
+    JOB_WORKER_CONCURRENCY: int = 4  # Jobs per worker process
+    JOB_POLL_TIMEOUT: float = 2.0  # Below REDIS_SOCKET_TIMEOUT
+    JOB_HEARTBEAT_INTERVAL: float = 30.0
+    JOB_STALL_TIMEOUT: float = 300.0  # Requeue after this without heartbeat
+    JOB_RECOVER_INTERVAL: float = 60.0  # Seconds between stalled job scans
+
+    # Write-behind AI log persistence
+    AI_LOG_ENABLED: bool = True
+    AI_LOG_MAX_PENDING: int = 10000  # Rows queued before callers wait
+    AI_LOG_BATCH_SIZE: int = 500  # Rows per INSERT
+    AI_LOG_FLUSH_INTERVAL: float = 2.0  # Longest a row waits
+    AI_LOG_PUT_TIMEOUT: float = 0.5  # Wait for room before dropping
+    # Bodies above this many bytes go to the content-addressed blob store
+    AI_LOG_BLOB_THRESHOLD: int = 4096
+    AI_LOG_BLOB_DIR: str = "/tmp/nu-cron/blobs"
+    # Monthly ai_logs partitions kept before the current month
+    AI_LOG_RETENTION_MONTHS: int = 6
+    AI_LOG_PARTITIONS_AHEAD: int = 2
+    # Parquet export of AI logs for analytics
+    AI_LOG_EXPORT_DIR: str = "/tmp/nu-cron/exports/ai_logs"
+    AI_LOG_EXPORT_BATCH_SIZE: int = 50000  # Rows per query and file
+    AI_LOG_EXPORT_SETTLE: float = 300.0  # Seconds before rows are exported
+
+    # USD per 1K tokens, for usage cost rollups
+    MODEL_PRICING: dict[str, dict[str, float]] = {
+        "gpt-4-turbo-preview": {"prompt": 0.01, "completion": 0.03},
+        "gpt-4-0125-preview": {"prompt": 0.01, "completion": 0.03},
+        "gpt-4": {"prompt": 0.03, "completion": 0.06},
+        "claude-3-opus-20240229": {"prompt": 0.015, "completion": 0.075},
+        "mistral-large-latest": {"prompt": 0.008, "completion": 0.024},
+        "mixtral-8x7b-32768": {"prompt": 0.00027, "completion": 0.00027},
+    }
+
+    # Generation cache encoding (packages missing here fall back to
+    # json and zlib)
+    CACHE_SERIALIZER: str = "orjson"  # json, orjson or msgpack
+    CACHE_COMPRESSION: str = "zstd"  # none, zlib or zstd
+    CACHE_COMPRESSION_LEVEL: int = 3
+    CACHE_COMPRESSION_MIN_SIZE: int = 512  # Bytes
+    CACHE_ZSTD_DICTIONARY_PATH: str = ""
+
+    # Token counting (tiktoken when installed, heuristic otherwise)
+    TOKEN_DEFAULT_ENCODING: str = "cl100k_base"
+    TOKEN_APPROX_THRESHOLD: int = 100000  # Characters before sampling
+    TOKEN_APPROX_SAMPLE: int = 8000
 
     # Helicone configuration
     HELICONE_API_KEY: str = ""  # Set via environment variable
@@ -20,34 +175,68 @@ class Settings(BaseSettings):
     HELICONE_RETRY_ENABLED: bool = True
     HELICONE_RATE_LIMIT_POLICY: str = "throttle"
 
+    # OpenAI model variants, tried in priority order
+    OPENAI_MODELS: dict[str, dict[str, Any]] = {
+        "gpt-4-turbo-preview": {
+            "name": "gpt-4-turbo-preview",
+            "max_tokens": 4096,
+            "temperature": 0.7,
+            "priority": 1,
+        },
+        "gpt-4-0125-preview": {
+            "name": "gpt-4-0125-preview",
+            "max_tokens": 4096,
+            "temperature": 0.7,
+            "priority": 2,
+        },
+        "gpt-4": {
+            "name": "gpt-4",
+            "max_tokens": 8192,
+            "temperature": 0.7,
+            "priority": 3,
+        },
+    }
+
     # Model configuration
     AI_MODELS: dict[str, dict[str, Any]] = {
         "openai": {
+            "provider": "openai",
             "name": "gpt-4-turbo-preview",
             "max_tokens": 4096,
             "temperature": 0.7,
             "priority": 1,
+            "rpm": 500,
+            "tpm": 300000,
             "fallback_chain": ["gpt-4-0125-preview", "gpt-4"],
         },
         "claude": {
+            "provider": "anthropic",
             "name": "claude-3-opus-20240229",
             "max_tokens": 4096,
             "temperature": 0.7,
             "priority": 2,
+            "rpm": 50,
+            "tpm": 40000,
             "fallback_chain": [],
         },
         "mistral": {
+            "provider": "mistral",
             "name": "mistral-large-latest",
             "max_tokens": 4096,
             "temperature": 0.7,
             "priority": 3,
+            "rpm": 300,
+            "tpm": 500000,
             "fallback_chain": [],
         },
         "groq": {
+            "provider": "groq",
             "name": "mixtral-8x7b-32768",
             "max_tokens": 4096,
             "temperature": 0.7,
             "priority": 4,
+            "rpm": 30,
+            "tpm": 6000,
             "fallback_chain": [],
         },
     }
@@ -64,6 +253,11 @@ class Settings(BaseSettings):
     TEST_ENV: str = "integration"
     TEST_DB_HOST: str = "test-db"
 
+    # Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR when
+    # running several workers
+    METRICS_ENABLED: bool = True
+    METRICS_REFRESH_INTERVAL: float = 5.0  # Gauge sampling per worker
+
     # Monitoring configuration
     PROMETHEUS_PORT: int = 9090
     GRAFANA_PORT: int = 3000
@@ -0,0 +1,252 @@
+"""Event loop lag sampling and blocking call diagnostics."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict
+from typing import Any, Dict, Optional
+from weakref import WeakKeyDictionary
+
+from application.src.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Route label for blocking outside any tracked request
+UNATTRIBUTED = "unattributed"
+
+
+class BlockingDetector:
+    """Reports code that holds the event loop for too long.
+
+    A watchdog thread checks that the loop monitor's sampler keeps
+    running. When the sampler is more than ``threshold`` late, whatever
+    runs on the loop is blocking it, so the watchdog logs the loop
+    thread's current stack, which points at the blocking call, and the
+    route whose request is running. Once the loop recovers, the stall is
+    added to that route's blocked time.
+
+    Requests are tracked by task through ``track``; tasks they create
+    inherit their route.
+    """
+
+    def __init__(self, threshold: float = 0.1):
+        """Initialize the detector.
+
+        Args:
+            threshold: Seconds the loop may be held before it is reported
+        """
+        self.threshold = threshold
+        self.blocked: Dict[str, float] = defaultdict(float)
+        self.stalls: Dict[str, int] = defaultdict(int)
+        self._scopes: "WeakKeyDictionary[asyncio.Task, Dict[str, Any]]" = (
+            WeakKeyDictionary()
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._previous_factory: Any = None
+        self._interval = 0.0
+        self._last_beat = 0.0
+        self._stall_route: Optional[str] = None
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop, interval: float) -> None:
+        """Watch a loop whose sampler beats every ``interval`` seconds.
+
+        Must be called from the loop's thread.
+        """
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._interval = interval
+        self._last_beat = time.monotonic()
+        self._previous_factory = loop.get_task_factory()
+        loop.set_task_factory(self._create_task)
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._loop is not None:
+            self._loop.set_task_factory(self._previous_factory)
+            self._loop = None
+
+    def track(self, scope: Dict[str, Any]) -> None:
+        """Attribute blocking in the current task to a request."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._scopes[task] = scope
+
+    def beat(self) -> None:
+        """Signal that the loop is running; called by the sampler."""
+        self._last_beat = time.monotonic()
+
+    def record(self, lag: float) -> None:
+        """Charge a lag sample to the route that caused it, if slow."""
+        if lag < self.threshold:
+            return
+        route, self._stall_route = self._stall_route or UNATTRIBUTED, None
+        self.blocked[route] += lag
+        self.stalls[route] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Blocked seconds and stall counts by route."""
+        return {
+            "blocked_seconds": dict(self.blocked),
+            "stalls": dict(self.stalls),
+        }
+
+    def route(self, task: Optional[asyncio.Task]) -> str:
+        """Label of the request a task runs for."""
+        scope = self._scopes.get(task) if task is not None else None
+        if scope is None:
+            return UNATTRIBUTED
+        route = scope.get("route")
+        if route is None:
+            # Not routed yet, or no route matched
+            return UNATTRIBUTED
+        return f"{scope['method']} {route.path}"
+
+    def _create_task(self, loop, coro, **kwargs) -> asyncio.Task:
+        """Task factory passing the parent task's request on."""
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        parent = asyncio.current_task(loop)
+        scope = self._scopes.get(parent) if parent is not None else None
+        if scope is not None:
+            self._scopes[task] = scope
+        return task
+
+    def _watch(self) -> None:
+        """Watchdog thread body."""
+        reported = False
+        while not self._stopping.wait(self.threshold / 2):
+            late = time.monotonic() - self._last_beat - self._interval
+            if late < self.threshold:
+                reported = False
+            elif not reported:
+                reported = True
+                self._report(late)
+
+    def _report(self, late: float) -> None:
+        """Log what the loop thread is running."""
+        # Reading another thread's current task is safe under the GIL
+        route = self.route(asyncio.current_task(self._loop))
+        self._stall_route = route
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+        logger.warning(
+            f"Event loop blocked for over {late:.3f}s in {route}:\n{stack}"
+        )
+
+
+class LoopMonitor:
+    """Measures how late the event loop runs a periodic timer.
+
+    A loop busy with too many callbacks, or blocked by one, wakes the
+    sampler late; the delay is the time any ready request waits before
+    it can run. ``lag`` jumps to each new peak and decays between
+    samples, so a burst is seen at once and forgotten gradually.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        decay: float = 0.8,
+        detector: Optional[BlockingDetector] = None,
+    ):
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between samples
+            decay: Fraction of the previous lag kept per sample
+            detector: Blocking call diagnostics fed by the samples
+        """
+        self.interval = interval
+        self.decay = decay
+        self.detector = detector
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start sampling on the running loop."""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        if self.detector is not None:
+            self.detector.start(loop, self.interval)
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.lag = 0.0
+        if self.detector is not None:
+            self.detector.stop()
+
+    def record(self, lag: float) -> None:
+        """Fold one sample into ``lag``."""
+        self.lag = max(lag, self.lag * self.decay)
+        if self.detector is not None:
+            self.detector.record(lag)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            if self.detector is not None:
+                self.detector.beat()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - started - self.interval))
+
+
+class LoopDiagnosticsMiddleware:
+    """ASGI middleware attributing event loop blocking to routes."""
+
+    def __init__(self, app: Any, detector: BlockingDetector):
+        self.app = app
+        self.detector = detector
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http":
+            self.detector.track(scope)
+        await self.app(scope, receive, send)
+
+
+_loop_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """Return the process-wide event loop monitor."""
+    global _loop_monitor
+    if _loop_monitor is None:
+        settings = Settings()
+        detector = None
+        if settings.LOOP_DIAGNOSTICS_ENABLED:
+            detector = BlockingDetector(settings.LOOP_BLOCKING_THRESHOLD)
+        _loop_monitor = LoopMonitor(
+            settings.LOOP_MONITOR_INTERVAL, detector=detector
+        )
+    return _loop_monitor
@@ -0,0 +1,284 @@
+"""Prometheus metrics for the API, LLM calls, caches and queues.
+
+With several uvicorn workers, set ``PROMETHEUS_MULTIPROC_DIR`` to an
+empty directory shared by the workers before they start; each worker
+then writes its samples there and ``/metrics`` on any worker reports
+all of them.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+# Route label for requests that matched no route
+UNMATCHED = "unmatched"
+
+HTTP_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to the end of the response body",
+    ["method", "route"],
+    buckets=HTTP_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being served",
+    multiprocess_mode="livesum",
+)
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "Provider calls by outcome",
+    ["provider", "model", "outcome"],
+)
+LLM_DURATION = Histogram(
+    "llm_request_duration_seconds",
+    "Duration of successful provider calls",
+    ["provider", "model"],
+    buckets=LLM_BUCKETS,
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time until a streamed completion's first text",
+    ["provider", "model"],
+    buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens sent and received",
+    ["provider", "model", "kind"],
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by result (hit, stale or miss)",
+    ["cache", "result"],
+)
+
+JOB_QUEUE_DEPTH = Gauge(
+    "job_queue_depth",
+    "Background jobs waiting or running",
+    ["state"],
+    multiprocess_mode="mostrecent",
+)
+SCHEDULER_WAITING = Gauge(
+    "llm_scheduler_waiting",
+    "Provider calls waiting for a lane slot",
+    ["lane"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Admitted requests by route class",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_WAITING = Gauge(
+    "admission_waiting",
+    "Requests queued for admission by route class",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "Recent event loop lag",
+    multiprocess_mode="livemax",
+)
+EVENT_LOOP_BLOCKED = Counter(
+    "event_loop_blocked_seconds_total",
+    "Time the event loop was blocked, by route (diagnostics mode)",
+    ["route"],
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Database pool connections by state",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+_db_engine: Any = None
+# Blocked seconds already exported, by route
+_blocked_exported: Dict[str, float] = {}
+
+
+def multiprocess_mode() -> bool:
+    """Whether samples are shared between worker processes."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def observe_llm(
+    provider: str,
+    model: str,
+    latency: float,
+    usage: Any,
+    first_token: Optional[float] = None,
+) -> None:
+    """Record a successful provider call.
+
+    Args:
+        provider: Provider name
+        model: Model name
+        latency: Seconds until the completion was done
+        usage: Token usage with prompt and completion counts
+        first_token: Seconds until the first streamed text
+    """
+    LLM_REQUESTS.labels(provider, model, "success").inc()
+    LLM_DURATION.labels(provider, model).observe(latency)
+    if first_token is not None:
+        LLM_TIME_TO_FIRST_TOKEN.labels(provider, model).observe(first_token)
+    LLM_TOKENS.labels(provider, model, "prompt").inc(usage.prompt_tokens)
+    LLM_TOKENS.labels(provider, model, "completion").inc(
+        usage.completion_tokens
+    )
+
+
+def count_llm_failure(provider: str, model: str) -> None:
+    """Record a failed provider call."""
+    LLM_REQUESTS.labels(provider, model, "error").inc()
+
+
+def count_cache(cache: str, result: str, amount: int = 1) -> None:
+    """Record cache lookups, e.g. ``count_cache("generation", "hit")``."""
+    if amount:
+        CACHE_REQUESTS.labels(cache, result).inc(amount)
+
+
+def watch_db_pool(engine: Any) -> None:
+    """Report the connection pool of a SQLAlchemy engine."""
+    global _db_engine
+    _db_engine = engine
+
+
+def refresh_process_metrics() -> None:
+    """Sample this process's queues, loop and pool into their gauges."""
+    from application.src.core.admission import get_admission_controller
+    from application.src.core.loop_monitor import get_loop_monitor
+    from application.src.services.ai.scheduler import get_scheduler
+
+    monitor = get_loop_monitor()
+    EVENT_LOOP_LAG.set(monitor.lag)
+    if monitor.detector is not None:
+        for route, seconds in monitor.detector.blocked.items():
+            exported = _blocked_exported.get(route, 0.0)
+            EVENT_LOOP_BLOCKED.labels(route).inc(seconds - exported)
+            _blocked_exported[route] = seconds
+
+    for name, state in get_admission_controller().classes.items():
+        ADMISSION_IN_FLIGHT.labels(name).set(state.in_flight)
+        ADMISSION_WAITING.labels(name).set(state.waiting)
+
+    scheduler = get_scheduler()
+    for lane in scheduler.lanes:
+        SCHEDULER_WAITING.labels(lane).set(scheduler.waiting(lane))
+
+    pool = getattr(_db_engine, "pool", None)
+    if pool is not None and hasattr(pool, "checkedout"):
+        in_use = pool.checkedout()
+        DB_POOL_CONNECTIONS.labels("in_use").set(in_use)
+        DB_POOL_CONNECTIONS.labels("idle").set(pool.checkedin())
+        DB_POOL_CONNECTIONS.labels("overflow").set(max(0, pool.overflow()))
+
+
+async def refresh_queue_metrics() -> None:
+    """Sample the shared job queue's depth."""
+    from application.src.services.jobs.queue import get_job_queue
+
+    queue = get_job_queue()
+    try:
+        pending = await queue.redis_client.llen(queue.pending_key)
+        running = await queue.redis_client.llen(queue.processing_key)
+    except Exception as e:
+        logger.warning(f"Could not read job queue depth: {e}")
+        return
+    JOB_QUEUE_DEPTH.labels("pending").set(pending)
+    JOB_QUEUE_DEPTH.labels("processing").set(running)
+
+
+async def render_metrics() -> bytes:
+    """Refresh sampled metrics and render all in the text format."""
+    refresh_process_metrics()
+    await refresh_queue_metrics()
+    if multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+async def refresh_periodically(interval: float) -> None:
+    """Keep this process's gauges current between scrapes.
+
+    Needed in multiprocess mode, where a scrape reaches only one worker
+    but reports the last samples of all.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            refresh_process_metrics()
+        except Exception as e:
+            logger.warning(f"Metrics refresh failed: {e}")
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges when it exits."""
+    if multiprocess_mode():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and durations.
+
+    The route label is the matched route's template, so paths with ids
+    do not create a series each.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            route = scope.get("route")
+            label = route.path if route is not None else UNMATCHED
+            method = scope["method"]
+            HTTP_DURATION.labels(method, label).observe(
+                time.perf_counter() - started
+            )
+            HTTP_REQUESTS.labels(method, label, str(status)).inc()
@@ -1,16 +1,28 @@
 """FastAPI application entry point."""
 
+import asyncio
 import os
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 
+from .core import metrics
+from .core.admission import AdmissionMiddleware, get_admission_controller
 from .core.config import Settings
+from .core.loop_monitor import LoopDiagnosticsMiddleware, get_loop_monitor
 from .models.database import init_db
+from .services.ai.clients import close_client_pool
+from .services.ai.log_retention import prepare_partitions
+from .services.ai.usage_log import start_ai_log_writer, stop_ai_log_writer
+from .services.cache import close_redis
 from .services.code_generation import code_generation_router
 from .services.environment.routes import router as environment_router
+from .services.jobs import jobs_router
 from .services.requirements import requirements_router
 from .services.testing import testing_router
+from .services.usage import usage_router
 
 settings = Settings()
 
@@ -22,6 +34,24 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
 )
 
+api_prefix = settings.API_V1_STR
+
+# Shed load before it piles up; added first so CORS headers still apply
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        route_classes={
+            f"{api_prefix}/{path}": "generation"
+            for path in ("code", "requirements", "testing")
+        },
+        exempt_paths=settings.ADMISSION_EXEMPT_PATHS,
+    )
+
+# Attribute event loop stalls to the routes causing them
+if get_loop_monitor().detector is not None:
+    app.add_middleware(
+        LoopDiagnosticsMiddleware, detector=get_loop_monitor().detector
+    )
 
 # CORS middleware configuration
 app.add_middleware(
@@ -32,15 +62,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so requests shed by admission control are counted too
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include API routes
 # Include API routes with appropriate prefixes
-api_prefix = settings.API_V1_STR
 # Route configuration
 routes = [
     (code_generation_router, "code"),
     (requirements_router, "requirements"),
     (testing_router, "testing"),
     (environment_router, "environment", ["environment"]),
+    (jobs_router, "jobs", ["jobs"]),
+    (usage_router, "usage", ["usage"]),
 ]
 
 # Register routes with appropriate prefixes
@@ -60,7 +95,28 @@ async def startup_event():
     database_url = os.getenv("DATABASE_URL")
     if not database_url:
         raise RuntimeError("DATABASE_URL environment variable is not set")
-    init_db(database_url)
+    engine = init_db(database_url)
+    metrics.watch_db_pool(engine)
+    prepare_partitions(engine, settings.AI_LOG_PARTITIONS_AHEAD)
+    start_ai_log_writer(engine)
+    get_loop_monitor().start()
+    if settings.METRICS_ENABLED and metrics.multiprocess_mode():
+        app.state.metrics_refresh = asyncio.create_task(
+            metrics.refresh_periodically(settings.METRICS_REFRESH_INTERVAL)
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared AI provider and Redis connections on shutdown."""
+    await get_loop_monitor().stop()
+    await stop_ai_log_writer()
+    refresh = getattr(app.state, "metrics_refresh", None)
+    if refresh is not None:
+        refresh.cancel()
+    metrics.mark_process_dead()
+    await close_client_pool()
+    await close_redis()
 
 
 # Health check endpoint
@@ -70,6 +126,35 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Report whether this instance should receive traffic."""
+    controller = get_admission_controller()
+    if controller.overloaded:
+        return JSONResponse(
+            {"status": "overloaded", **controller.snapshot()}, 503
+        )
+    return {"status": "ready", **controller.snapshot()}
+
+
+@app.get("/diagnostics/loop")
+async def loop_diagnostics():
+    """Report event loop lag and, in diagnostics mode, blocked time."""
+    monitor = get_loop_monitor()
+    report = {"lag": monitor.lag, "diagnostics": monitor.detector is not None}
+    if monitor.detector is not None:
+        report.update(monitor.detector.snapshot())
+    return report
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Expose metrics in the Prometheus text format."""
+    return Response(
+        await metrics.render_metrics(), media_type=CONTENT_TYPE_LATEST
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,44 @@
+"""Add provider, token split, latency and tenant to ai_logs
+
+Revision ID: 3f1c2a9d7b10
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3f1c2a9d7b10"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    sa.Column("provider", sa.String(), nullable=True),
+    sa.Column("prompt_tokens", sa.Integer(), nullable=True),
+    sa.Column("completion_tokens", sa.Integer(), nullable=True),
+    sa.Column("latency", sa.Float(), nullable=True),
+    sa.Column("tenant", sa.String(), nullable=True),
+]
+
+
+def upgrade() -> None:
+    # Tables are created by init_db, which may already have added these
+    inspector = sa.inspect(op.get_bind())
+    existing = {c["name"] for c in inspector.get_columns("ai_logs")}
+    for column in COLUMNS:
+        if column.name not in existing:
+            op.add_column("ai_logs", column)
+    indexes = {i["name"] for i in inspector.get_indexes("ai_logs")}
+    for name in ("tenant", "created_at"):
+        index = f"ix_ai_logs_{name}"
+        if index not in indexes:
+            op.create_index(index, "ai_logs", [name])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_logs_created_at", table_name="ai_logs")
+    op.drop_index("ix_ai_logs_tenant", table_name="ai_logs")
+    for column in reversed(COLUMNS):
+        op.drop_column("ai_logs", column.name)
@@ -0,0 +1,40 @@
+"""Add hourly usage rollups
+
+Revision ID: 8b4e6d2c1a57
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8b4e6d2c1a57"
+down_revision = "3f1c2a9d7b10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Tables are created by init_db, which may already have done this
+    if sa.inspect(op.get_bind()).has_table("usage_rollups"):
+        return
+    op.create_table(
+        "usage_rollups",
+        sa.Column("hour", sa.DateTime(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("tenant", sa.String(), nullable=False),
+        sa.Column("provider", sa.String(), nullable=True),
+        sa.Column("requests", sa.Integer(), nullable=True),
+        sa.Column("prompt_tokens", sa.BigInteger(), nullable=True),
+        sa.Column("completion_tokens", sa.BigInteger(), nullable=True),
+        sa.Column("total_tokens", sa.BigInteger(), nullable=True),
+        sa.Column("cost", sa.Float(), nullable=True),
+        sa.Column("latency", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("hour", "model", "project_id", "tenant"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("usage_rollups")
@@ -0,0 +1,133 @@
+"""Partition ai_logs by month and reference offloaded bodies by hash
+
+Revision ID: c7d91e4f3b28
+Revises: 8b4e6d2c1a57
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+from application.src.models import partitions
+
+# revision identifiers, used by Alembic.
+revision = "c7d91e4f3b28"
+down_revision = "8b4e6d2c1a57"
+branch_labels = None
+depends_on = None
+
+BLOB_COLUMNS = ("prompt_blob", "response_blob")
+
+COLUMNS = """
+    id BIGINT NOT NULL DEFAULT nextval('ai_logs_id_seq'),
+    model VARCHAR,
+    provider VARCHAR,
+    prompt VARCHAR,
+    response VARCHAR,
+    prompt_blob VARCHAR(64),
+    response_blob VARCHAR(64),
+    tokens_used INTEGER,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    latency DOUBLE PRECISION,
+    tenant VARCHAR,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    project_id INTEGER REFERENCES projects (id)
+"""
+
+COPIED = (
+    "id, model, provider, prompt, response, tokens_used, prompt_tokens, "
+    "completion_tokens, latency, tenant, created_at, project_id"
+)
+
+INDEXES = ("id", "tenant", "created_at")
+
+
+def _rename_indexes(suffix_from: str, suffix_to: str) -> None:
+    op.execute(
+        f"ALTER INDEX IF EXISTS ai_logs{suffix_from}_pkey "
+        f"RENAME TO ai_logs{suffix_to}_pkey"
+    )
+    for column in INDEXES:
+        op.execute(
+            f"ALTER INDEX IF EXISTS ix_ai_logs{suffix_from}_{column} "
+            f"RENAME TO ix_ai_logs{suffix_to}_{column}"
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        # Only PostgreSQL is partitioned; elsewhere add the hash columns
+        existing = {c["name"] for c in sa.inspect(bind).get_columns("ai_logs")}
+        for name in BLOB_COLUMNS:
+            if name not in existing:
+                op.add_column("ai_logs", sa.Column(name, sa.String(64)))
+        return
+    if partitions.is_partitioned(bind):
+        return
+
+    # Keep the id sequence when the old table is dropped
+    op.execute("ALTER SEQUENCE ai_logs_id_seq AS BIGINT OWNED BY NONE")
+    op.execute("ALTER TABLE ai_logs RENAME TO ai_logs_unpartitioned")
+    _rename_indexes("", "_unpartitioned")
+
+    op.execute(
+        f"CREATE TABLE ai_logs ({COLUMNS}, PRIMARY KEY (id, created_at)) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    for column in INDEXES:
+        op.execute(f"CREATE INDEX ix_ai_logs_{column} ON ai_logs ({column})")
+    op.execute(
+        f"CREATE TABLE {partitions.DEFAULT_PARTITION} "
+        "PARTITION OF ai_logs DEFAULT"
+    )
+    oldest = bind.execute(
+        sa.text("SELECT min(created_at) FROM ai_logs_unpartitioned")
+    ).scalar()
+    partitions.ensure_partitions(
+        bind, (oldest or datetime.utcnow()).date(), months_ahead=2
+    )
+
+    # created_at is part of the key now, so it cannot be NULL
+    selected = COPIED.replace("created_at", "COALESCE(created_at, now())")
+    op.execute(
+        f"INSERT INTO ai_logs ({COPIED}) "
+        f"SELECT {selected} FROM ai_logs_unpartitioned"
+    )
+    op.execute("DROP TABLE ai_logs_unpartitioned")
+    op.execute("ALTER SEQUENCE ai_logs_id_seq OWNED BY ai_logs.id")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        for name in BLOB_COLUMNS:
+            op.drop_column("ai_logs", name)
+        return
+    if not partitions.is_partitioned(bind):
+        return
+
+    # Offloaded bodies stay in the blob store, referenced by nothing
+    op.execute("ALTER SEQUENCE ai_logs_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE ai_logs RENAME TO ai_logs_partitioned")
+    _rename_indexes("", "_partitioned")
+    columns = ",\n".join(
+        line.rstrip(",")
+        for line in COLUMNS.strip().splitlines()
+        if "_blob" not in line
+    )
+    columns = columns.replace("BIGINT", "INTEGER", 1).replace(
+        " NOT NULL,", ","
+    )
+    op.execute(f"CREATE TABLE ai_logs ({columns}, PRIMARY KEY (id))")
+    for column in INDEXES:
+        op.execute(f"CREATE INDEX ix_ai_logs_{column} ON ai_logs ({column})")
+    op.execute(
+        f"INSERT INTO ai_logs ({COPIED}) "
+        f"SELECT {COPIED} FROM ai_logs_partitioned"
+    )
+    op.execute("DROP TABLE ai_logs_partitioned")
+    op.execute("ALTER SEQUENCE ai_logs_id_seq AS INTEGER OWNED BY ai_logs.id")
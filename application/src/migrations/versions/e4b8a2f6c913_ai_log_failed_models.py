@@ -0,0 +1,29 @@
+"""Record the models that failed before each AI log's completion
+
+Revision ID: e4b8a2f6c913
+Revises: c7d91e4f3b28
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4b8a2f6c913"
+down_revision = "c7d91e4f3b28"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Tables are created by init_db, which may already have added it;
+    # on PostgreSQL the partitions inherit the column
+    existing = {
+        c["name"] for c in sa.inspect(op.get_bind()).get_columns("ai_logs")
+    }
+    if "failed_models" not in existing:
+        op.add_column("ai_logs", sa.Column("failed_models", sa.JSON()))
+
+
+def downgrade() -> None:
+    op.drop_column("ai_logs", "failed_models")
@@ -4,9 +4,11 @@ from datetime import datetime
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Integer,
     String,
@@ -52,14 +54,41 @@ class AILog(Base):
     __tablename__ = "ai_logs"
     id = Column(Integer, primary_key=True, index=True)
     model = Column(String)  # GPT-4, Claude, Mistral
+    provider = Column(String)
     prompt = Column(String)
     response = Column(String)
+    # Blob store hashes of bodies too large to keep inline
+    prompt_blob = Column(String(64))
+    response_blob = Column(String(64))
     tokens_used = Column(Integer)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
+    latency = Column(Float)  # Seconds
+    # Models that failed before this one answered, in the order tried
+    failed_models = Column(JSON)
+    tenant = Column(String, index=True)  # Fair-share identity, e.g. user:42
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
     project = relationship("Project")
 
 
+class UsageRollup(Base):
+    """Hourly token usage and cost per model, project and user."""
+
+    __tablename__ = "usage_rollups"
+    hour = Column(DateTime, primary_key=True)  # Start of the hour, UTC
+    model = Column(String, primary_key=True)
+    project_id = Column(Integer, primary_key=True, default=0)  # 0 if none
+    tenant = Column(String, primary_key=True)  # e.g. user:42
+    provider = Column(String)
+    requests = Column(Integer, default=0)
+    prompt_tokens = Column(BigInteger, default=0)
+    completion_tokens = Column(BigInteger, default=0)
+    total_tokens = Column(BigInteger, default=0)
+    cost = Column(Float, default=0.0)  # USD
+    latency = Column(Float, default=0.0)  # Summed seconds
+
+
 class VectorStore(Base):
     """Model for storing vector embeddings and associated metadata."""
 
@@ -99,6 +128,16 @@ def init_db(database_url: str):
     Returns:
         SQLAlchemy engine instance
     """
+    global _engine
     engine = create_engine(database_url)
     Base.metadata.create_all(bind=engine)
+    _engine = engine
     return engine
+
+
+_engine = None
+
+
+def get_engine():
+    """Return the engine created by ``init_db``, or None before it ran."""
+    return _engine
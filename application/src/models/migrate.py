@@ -0,0 +1,50 @@
+"""Schema migrations, run once per deploy before the app and workers start.
+
+``init_db`` only creates missing tables, so changes to existing ones,
+such as partitioning ``ai_logs`` by month, need the Alembic revisions
+too. Run ``python -m application.src.models.migrate``; it creates the
+tables and then applies ``alembic upgrade head`` to DATABASE_URL.
+"""
+
+import logging
+import os
+
+from alembic import command
+from alembic.config import Config
+
+from application.src.models.database import init_db
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_LOCATION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations"
+)
+
+
+def upgrade(database_url: str, revision: str = "head") -> None:
+    """Create missing tables and apply migrations up to ``revision``.
+
+    Args:
+        database_url: SQLAlchemy database URL
+        revision: Alembic revision to upgrade to
+    """
+    # The revisions alter tables init_db creates, so it has to run first
+    init_db(database_url)
+    config = Config()
+    config.set_main_option("script_location", SCRIPT_LOCATION)
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    command.upgrade(config, revision)
+    logger.info(f"Database migrated to {revision}")
+
+
+def main() -> None:
+    """Migrate the database in DATABASE_URL."""
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise RuntimeError("DATABASE_URL environment variable is not set")
+    upgrade(database_url)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,103 @@
+"""Monthly range partitions of the ``ai_logs`` table (PostgreSQL)."""
+
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+TABLE = "ai_logs"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def month_start(moment: date) -> date:
+    """First day of the month containing ``moment``."""
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month ``count`` months from ``month``."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding a month, e.g. ai_logs_y2026m01."""
+    return f"{TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """Whether ``ai_logs`` is a partitioned table."""
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table"
+            ),
+            {"table": TABLE},
+        ).scalar()
+    )
+
+
+def partitions(connection: Connection) -> List[str]:
+    """Names of the monthly partitions, oldest first."""
+    names = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": TABLE},
+    ).scalars()
+    return sorted(name for name in names if name != DEFAULT_PARTITION)
+
+
+def ensure_partitions(
+    connection: Connection, start: date, months_ahead: int
+) -> List[str]:
+    """Create missing partitions from ``start``'s month onwards.
+
+    Args:
+        connection: Connection in a transaction
+        start: Earliest month needed
+        months_ahead: Months after the current one to create in advance
+
+    Returns:
+        Names of the partitions created
+    """
+    created = []
+    existing = set(partitions(connection))
+    month = month_start(start)
+    last = add_months(month_start(datetime.utcnow().date()), months_ahead)
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            connection.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                    f"FOR VALUES FROM ('{month}') "
+                    f"TO ('{add_months(month, 1)}')"
+                )
+            )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def drop_partitions_before(connection: Connection, cutoff: date) -> List[str]:
+    """Drop partitions whose month ends on or before ``cutoff``.
+
+    Returns:
+        Names of the partitions dropped
+    """
+    dropped = []
+    for name in partitions(connection):
+        year, month = int(name[-7:-3]), int(name[-2:])
+        if add_months(date(year, month, 1), 1) <= cutoff:
+            connection.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
@@ -0,0 +1,391 @@
+"""Offline bulk completions through provider batch APIs."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from application.src.core.config import Settings
+from application.src.services.ai.model_selector import (
+    CompletionResponse,
+    ModelSelector,
+    TokenUsage,
+)
+from application.src.services.cache import GenerationCache
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+# Batch states after which a provider does no more work
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass
+class BatchRequest:
+    """One chat completion in a batch."""
+
+    custom_id: str
+    model: str
+    messages: List[Dict[str, str]]
+    max_tokens: int = 2000
+    temperature: float = 0.7
+
+    def to_line(self) -> str:
+        """Encode as a line of a batch input file."""
+        return json.dumps(
+            {
+                "custom_id": self.custom_id,
+                "method": "POST",
+                "url": CHAT_COMPLETIONS_URL,
+                "body": {
+                    "model": self.model,
+                    "messages": self.messages,
+                    "max_tokens": self.max_tokens,
+                    "temperature": self.temperature,
+                },
+            }
+        )
+
+
+@dataclass
+class BatchJob:
+    """Provider-side state of a submitted batch."""
+
+    id: str
+    status: str
+    output_file: Optional[str] = None
+    error_file: Optional[str] = None
+    # Batch-level errors, e.g. an input file that failed validation
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+
+# A completion, or the error message for a failed request
+BatchOutcome = Union[CompletionResponse, str]
+
+
+def encode_jsonl(requests: List[BatchRequest]) -> bytes:
+    """Build a batch input file."""
+    return "".join(f"{r.to_line()}\n" for r in requests).encode("utf-8")
+
+
+def parse_output(text: str, provider: str) -> Dict[str, BatchOutcome]:
+    """Read a batch output file into outcomes by custom id.
+
+    Args:
+        text: JSONL output in the OpenAI batch format
+        provider: Provider recorded on the completions
+
+    Returns:
+        Completion or error message for each request in the file
+    """
+    outcomes: Dict[str, BatchOutcome] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or body.get("error") or {}
+            outcomes[record["custom_id"]] = error.get(
+                "message", "Batch request failed"
+            )
+            continue
+        usage = body.get("usage") or {}
+        outcomes[record["custom_id"]] = CompletionResponse(
+            content=body["choices"][0]["message"]["content"],
+            model=body.get("model", ""),
+            provider=provider,
+            usage=TokenUsage(
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+                total_tokens=usage.get("total_tokens", 0),
+            ),
+            latency=0.0,
+        )
+    return outcomes
+
+
+class BatchProvider(ABC):
+    """Submits batch input files and collects their output."""
+
+    name = "batch"
+
+    @abstractmethod
+    async def submit(self, requests: List[BatchRequest]) -> BatchJob:
+        """Upload the requests as JSONL and start a batch."""
+
+    @abstractmethod
+    async def poll(self, job: BatchJob) -> BatchJob:
+        """Return the batch's current state."""
+
+    @abstractmethod
+    async def read_output(self, job: BatchJob) -> str:
+        """Return the finished batch's JSONL output, failures included."""
+
+
+class OpenAIBatchProvider(BatchProvider):
+    """OpenAI Batch API: half-price completions within 24 hours."""
+
+    name = "openai"
+
+    def __init__(self, client: Any, completion_window: str = "24h"):
+        """Initialize the provider.
+
+        Args:
+            client: Async OpenAI client
+            completion_window: Deadline for the batch
+        """
+        self.client = client
+        self.completion_window = completion_window
+
+    async def submit(self, requests: List[BatchRequest]) -> BatchJob:
+        input_file = await self.client.files.create(
+            file=("batch.jsonl", encode_jsonl(requests)), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_COMPLETIONS_URL,
+            completion_window=self.completion_window,
+        )
+        return BatchJob(batch.id, batch.status)
+
+    async def poll(self, job: BatchJob) -> BatchJob:
+        batch = await self.client.batches.retrieve(job.id)
+        errors = batch.errors.data if batch.errors else []
+        return BatchJob(
+            batch.id,
+            batch.status,
+            batch.output_file_id,
+            batch.error_file_id,
+            [error.message for error in errors],
+        )
+
+    async def read_output(self, job: BatchJob) -> str:
+        # Failed requests are written to a separate error file
+        texts = []
+        for file_id in (job.output_file, job.error_file):
+            if file_id:
+                content = await self.client.files.content(file_id)
+                texts.append(content.text.rstrip("\n"))
+        return "\n".join(texts)
+
+
+class LocalBatchProvider(BatchProvider):
+    """File-based stand-in that runs batches in-process.
+
+    Input and output files are written under ``directory`` in the same
+    format as the OpenAI Batch API, and each request is answered by
+    ``respond``, e.g. the model gateway.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        directory: str,
+        respond: Callable[[Dict[str, Any]], Awaitable[CompletionResponse]],
+    ):
+        """Initialize the provider.
+
+        Args:
+            directory: Where batch files are kept
+            respond: Answers one request body
+        """
+        self.directory = directory
+        self.respond = respond
+
+    async def submit(self, requests: List[BatchRequest]) -> BatchJob:
+        job = BatchJob(f"batch_{uuid.uuid4().hex}", "in_progress")
+        path = os.path.join(self.directory, job.id)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "input.jsonl"), "wb") as f:
+            f.write(encode_jsonl(requests))
+        return job
+
+    async def poll(self, job: BatchJob) -> BatchJob:
+        path = os.path.join(self.directory, job.id)
+        output_file = os.path.join(path, "output.jsonl")
+        if not os.path.exists(output_file):
+            with open(os.path.join(path, "input.jsonl")) as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            records = [await self._run(line) for line in lines]
+            with open(output_file, "w") as f:
+                f.writelines(f"{json.dumps(r)}\n" for r in records)
+        return BatchJob(job.id, "completed", output_file)
+
+    async def read_output(self, job: BatchJob) -> str:
+        with open(job.output_file) as f:
+            return f.read()
+
+    async def _run(self, line: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one input line with an output record."""
+        record = {"id": uuid.uuid4().hex, "custom_id": line["custom_id"]}
+        try:
+            response = await self.respond(line["body"])
+        except Exception as e:
+            record["response"] = None
+            record["error"] = {"message": str(e)}
+            return record
+        record["response"] = {
+            "status_code": 200,
+            "body": {
+                "model": response.model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {
+                            "role": "assistant",
+                            "content": response.content,
+                        },
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": response.usage.prompt_tokens,
+                    "completion_tokens": response.usage.completion_tokens,
+                    "total_tokens": response.usage.total_tokens,
+                },
+            },
+        }
+        record["error"] = None
+        return record
+
+
+async def run_batch(
+    provider: BatchProvider,
+    requests: List[BatchRequest],
+    poll_interval: float = 30.0,
+    timeout: float = 86400.0,
+) -> Dict[str, BatchOutcome]:
+    """Submit requests as one batch and wait for the outcomes.
+
+    Args:
+        provider: Batch provider
+        requests: Requests with unique custom ids
+        poll_interval: Seconds between status checks
+        timeout: Longest to wait for the batch
+
+    Returns:
+        Completion or error message by custom id; requests the provider
+        did not answer, e.g. in an expired batch, are reported as errors
+    """
+    if not requests:
+        return {}
+    job = await provider.submit(requests)
+    logger.info(f"Submitted batch {job.id} with {len(requests)} requests")
+    deadline = time.monotonic() + timeout
+    while not job.done:
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Batch {job.id} did not finish in time")
+        await asyncio.sleep(poll_interval)
+        job = await provider.poll(job)
+    logger.info(f"Batch {job.id} finished as {job.status}")
+
+    outcomes = parse_output(await provider.read_output(job), provider.name)
+    reason = f"Not processed: batch {job.status}"
+    if job.errors:
+        reason = f"{reason}: {'; '.join(job.errors)}"
+    for request in requests:
+        outcomes.setdefault(request.custom_id, reason)
+    return outcomes
+
+
+@dataclass
+class BulkItem:
+    """One cacheable request in a bulk generation run."""
+
+    key: str
+    request: BatchRequest
+    build_result: Callable[[CompletionResponse], Dict[str, Any]]
+
+
+async def generate_bulk(
+    cache: GenerationCache,
+    provider: BatchProvider,
+    items: List[BulkItem],
+    poll_interval: float = 30.0,
+    timeout: float = 86400.0,
+) -> List[Dict[str, Any]]:
+    """Generate uncached results in one provider batch and cache them.
+
+    Args:
+        cache: Cache read before submitting and filled with the results
+        provider: Batch provider
+        items: Requests keyed by their generation cache key
+        poll_interval: Seconds between status checks
+        timeout: Longest to wait for the batch
+
+    Returns:
+        One result per item, in order; failed items have status 'error'
+    """
+    unique = {item.key: item for item in items}
+    results: Dict[str, Any] = await cache.get_many(list(unique))
+    missing = [key for key, value in results.items() if value is None]
+    # Cache keys are too long for custom ids, so number the requests
+    keys = {f"request-{n}": key for n, key in enumerate(missing)}
+    outcomes = await run_batch(
+        provider,
+        [
+            replace(unique[key].request, custom_id=custom_id)
+            for custom_id, key in keys.items()
+        ],
+        poll_interval=poll_interval,
+        timeout=timeout,
+    )
+
+    generated = {}
+    for custom_id, key in keys.items():
+        outcome = outcomes[custom_id]
+        if isinstance(outcome, CompletionResponse):
+            generated[key] = results[key] = unique[key].build_result(outcome)
+        else:
+            results[key] = {"status": "error", "error": outcome}
+    await cache.set_many(generated)
+    return [results[item.key] for item in items]
+
+
+def gateway_responder(
+    model_selector: ModelSelector,
+) -> Callable[[Dict[str, Any]], Awaitable[CompletionResponse]]:
+    """Answer batch request bodies through the model gateway."""
+
+    async def respond(body: Dict[str, Any]) -> CompletionResponse:
+        system = [m for m in body["messages"] if m["role"] == "system"]
+        return await model_selector.generate_completion(
+            body["messages"][-1]["content"],
+            model=body["model"],
+            system_prompt=system[0]["content"] if system else None,
+            temperature=body.get("temperature"),
+            max_tokens=body.get("max_tokens"),
+        )
+
+    return respond
+
+
+def get_batch_provider(
+    model_selector: ModelSelector, openai_client: Any
+) -> BatchProvider:
+    """Build the configured batch provider.
+
+    Args:
+        model_selector: Gateway answering requests for the local provider
+        openai_client: Async OpenAI client for the OpenAI provider
+    """
+    settings = Settings()
+    if settings.BATCH_PROVIDER == "local":
+        return LocalBatchProvider(
+            settings.BATCH_LOCAL_DIR, gateway_responder(model_selector)
+        )
+    return OpenAIBatchProvider(
+        openai_client, completion_window=settings.BATCH_COMPLETION_WINDOW
+    )
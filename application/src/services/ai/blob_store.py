@@ -0,0 +1,130 @@
+"""Content-addressed storage for large AI log bodies."""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from application.src.core.config import Settings
+from application.src.services.cache.codecs import Codec
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore(ABC):
+    """Stores texts compressed under the SHA-256 of their content.
+
+    Identical texts, e.g. a system prompt repeated across requests, are
+    stored once.
+    """
+
+    def __init__(self, codec: Optional[Codec] = None):
+        """Initialize the store.
+
+        Args:
+            codec: Compresses stored texts, json with the configured
+                compression if omitted
+        """
+        self.codec = codec or Codec(
+            "json", Settings().CACHE_COMPRESSION, min_size=0
+        )
+
+    @staticmethod
+    def digest(text: str) -> str:
+        """Address of a text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def put(self, text: str) -> str:
+        """Store a text unless already present; return its address."""
+        digest = self.digest(text)
+        self._write(digest, self.codec.encode(text))
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """Return the text at an address, or None if it is gone."""
+        payload = self._read(digest)
+        return None if payload is None else self.codec.decode(payload)
+
+    @abstractmethod
+    def _write(self, digest: str, payload: bytes) -> None:
+        """Store a payload, or mark an existing one as referenced."""
+
+    @abstractmethod
+    def _read(self, digest: str) -> Optional[bytes]:
+        """Return a stored payload."""
+
+    @abstractmethod
+    def sweep(self, older_than: float) -> int:
+        """Delete blobs unreferenced for ``older_than`` seconds.
+
+        Returns:
+            Number of blobs deleted
+        """
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under ``root``, fanned out by hash prefix.
+
+    Also stands in for an object store: each blob is written once,
+    atomically, and never modified. A blob's modification time is its
+    last reference, so ``sweep`` can drop blobs no retained log uses.
+    """
+
+    def __init__(self, root: str, codec: Optional[Codec] = None):
+        super().__init__(codec)
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _write(self, digest: str, payload: bytes) -> None:
+        path = self._path(digest)
+        if os.path.exists(path):
+            os.utime(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def sweep(self, older_than: float) -> int:
+        cutoff = time.time() - older_than
+        deleted = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.unlink(path)
+                        deleted += 1
+                except FileNotFoundError:
+                    continue
+        if deleted:
+            logger.info(f"Deleted {deleted} unreferenced blobs")
+        return deleted
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store."""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = LocalBlobStore(Settings().AI_LOG_BLOB_DIR)
+    return _blob_store
@@ -0,0 +1,142 @@
+"""Per-model circuit breaker for AI provider calls."""
+
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """States of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when every candidate model has an open circuit."""
+
+
+class CircuitBreaker:
+    """Tracks rolling error rates and latencies for one model.
+
+    The circuit opens when the share of failed or slow calls in the
+    rolling window reaches the threshold. After the cool-down it becomes
+    half-open and lets a limited number of probe calls through; a
+    successful probe closes it again, a failed probe re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window_seconds: float = 60.0,
+        cooldown_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        slow_call_seconds: float = 25.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the breaker.
+
+        Args:
+            name: Model name, used for logging
+            failure_rate: Failed or slow call share that opens the circuit
+            min_calls: Calls required in the window before it can open
+            window_seconds: Length of the rolling window
+            cooldown_seconds: Time the circuit stays open before probing
+            half_open_probes: Concurrent probe calls allowed when half-open
+            slow_call_seconds: Latency above which a call counts as failed
+            clock: Monotonic time source
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_probes = half_open_probes
+        self.slow_call_seconds = slow_call_seconds
+        self._clock = clock
+        self._calls: Deque[Tuple[float, bool]] = deque()
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open after cool-down."""
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.cooldown_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def is_available(self) -> bool:
+        """Whether the model may currently receive traffic."""
+        return self.state != CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        """Reserve permission for one call.
+
+        Returns:
+            True if the call may proceed; half-open circuits count it as
+            a probe until its outcome is recorded
+        """
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN:
+            if self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+        return False
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful call and its latency in seconds."""
+        if latency >= self.slow_call_seconds:
+            self.record_failure()
+            return
+        if self.state == CircuitState.HALF_OPEN:
+            logger.info(f"Circuit for {self.name} closed")
+            self._state = CircuitState.CLOSED
+            self._calls.clear()
+        self._add_call(failed=False)
+
+    def record_failure(self) -> None:
+        """Record a failed or slow call."""
+        if self.state == CircuitState.HALF_OPEN:
+            self._open()
+            return
+        self._add_call(failed=True)
+        failures = sum(1 for _, failed in self._calls if failed)
+        if (
+            len(self._calls) >= self.min_calls
+            and failures / len(self._calls) >= self.failure_rate
+        ):
+            self._open()
+
+    def release(self) -> None:
+        """Release a reserved call that ended without an outcome."""
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def _add_call(self, failed: bool) -> None:
+        """Append a call outcome and drop those outside the window."""
+        now = self._clock()
+        self._calls.append((now, failed))
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _open(self) -> None:
+        """Open the circuit and start the cool-down."""
+        logger.warning(f"Circuit for {self.name} opened")
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._probes_in_flight = 0
+        self._calls.clear()
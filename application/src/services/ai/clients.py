@@ -0,0 +1,193 @@
+"""Shared async LLM provider clients for the AI services."""
+
+import logging
+import os
+from importlib.util import find_spec
+from typing import Any, Dict, Optional
+
+import anthropic
+import httpx
+import openai
+
+from application.src.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs ``h2``; fall back to keep-alive HTTP/1.1 where it is missing
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+class LLMClientPool:
+    """Process-wide async provider clients on one keep-alive transport.
+
+    Every provider SDK client is created lazily on first use and shares a
+    single ``httpx.AsyncClient`` so connections are pooled across
+    CodeGenerator, TestGenerator and AIAssistant instead of per service.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        clients: Optional[Dict[str, Any]] = None,
+    ):
+        """Initialize the pool.
+
+        Args:
+            settings: Application settings, loaded from env if omitted
+            clients: Pre-built provider clients keyed by provider name
+        """
+        self.settings = settings or Settings()
+        self._clients: Dict[str, Any] = dict(clients or {})
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Shared HTTP transport used by every provider client."""
+        if self._http_client is None or self._http_client.is_closed:
+            http2 = self.settings.LLM_HTTP2_ENABLED and HTTP2_AVAILABLE
+            if self.settings.LLM_HTTP2_ENABLED and not HTTP2_AVAILABLE:
+                logger.warning("h2 not installed, using HTTP/1.1 keep-alive")
+            self._http_client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=self.settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=(
+                        self.settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+                    ),
+                    keepalive_expiry=self.settings.LLM_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(self.settings.OPENAI_TIMEOUT),
+            )
+        return self._http_client
+
+    def get_client(self, provider: str) -> Any:
+        """Return the shared client for a provider, creating it on demand.
+
+        Args:
+            provider: Provider name ('openai', 'anthropic', 'mistral',
+                'groq')
+
+        Returns:
+            Async SDK client for the provider
+        """
+        if provider not in self._clients:
+            builders = {
+                "openai": self._build_openai,
+                "anthropic": self._build_anthropic,
+                "mistral": self._build_mistral,
+                "groq": self._build_groq,
+            }
+            if provider not in builders:
+                raise ValueError(f"Unsupported provider: {provider}")
+            self._clients[provider] = builders[provider]()
+        return self._clients[provider]
+
+    def _build_openai(self) -> openai.AsyncOpenAI:
+        """Create the async OpenAI client with Helicone integration."""
+        openai_key = os.getenv("OPENAI_API_KEY")
+        if not openai_key:
+            raise ValueError("OPENAI_API_KEY environment variable is required")
+
+        helicone_key = self.settings.HELICONE_API_KEY
+        if not helicone_key:
+            raise ValueError(
+                "HELICONE_API_KEY environment variable is required"
+            )
+
+        settings = self.settings
+        return openai.AsyncOpenAI(
+            api_key=openai_key,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            timeout=settings.OPENAI_TIMEOUT,
+            default_headers={
+                **settings.OPENAI_DEFAULT_HEADERS,
+                "Helicone-Auth": f"Bearer {helicone_key}",
+                "Helicone-Cache-Enabled": str(
+                    settings.HELICONE_CACHE_ENABLED
+                ).lower(),
+                "Helicone-Cache-TTL": str(settings.HELICONE_CACHE_TTL),
+                "Helicone-Retry-Enabled": str(
+                    settings.HELICONE_RETRY_ENABLED
+                ).lower(),
+                "Helicone-Rate-Limit-Policy": (
+                    settings.HELICONE_RATE_LIMIT_POLICY
+                ),
+            },
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=self.http_client,
+        )
+
+    def _build_anthropic(self) -> Any:
+        """Create the async Anthropic client."""
+        anthropic_key = os.getenv("ANTHROPIC_API_KEY")
+        if not anthropic_key:
+            raise ValueError(
+                "ANTHROPIC_API_KEY environment variable is required"
+            )
+        return anthropic.AsyncAnthropic(
+            api_key=anthropic_key,
+            max_retries=self.settings.OPENAI_MAX_RETRIES,
+            timeout=self.settings.OPENAI_TIMEOUT,
+            http_client=self.http_client,
+        )
+
+    def _build_mistral(self) -> openai.AsyncOpenAI:
+        """Create an async client for Mistral's OpenAI-compatible API."""
+        return self._build_compatible(
+            "MISTRAL_API_KEY", self.settings.MISTRAL_BASE_URL
+        )
+
+    def _build_groq(self) -> openai.AsyncOpenAI:
+        """Create an async client for Groq's OpenAI-compatible API."""
+        return self._build_compatible(
+            "GROQ_API_KEY", self.settings.GROQ_BASE_URL
+        )
+
+    def _build_compatible(
+        self, key_name: str, base_url: str
+    ) -> openai.AsyncOpenAI:
+        """Create an async OpenAI-compatible client for another provider.
+
+        Args:
+            key_name: Environment variable holding the provider API key
+            base_url: Provider endpoint implementing the OpenAI API
+
+        Returns:
+            Async client sharing the pool's HTTP transport
+        """
+        api_key = os.getenv(key_name)
+        if not api_key:
+            raise ValueError(f"{key_name} environment variable is required")
+        return openai.AsyncOpenAI(
+            api_key=api_key,
+            max_retries=self.settings.OPENAI_MAX_RETRIES,
+            timeout=self.settings.OPENAI_TIMEOUT,
+            base_url=base_url,
+            http_client=self.http_client,
+        )
+
+    async def aclose(self) -> None:
+        """Close the shared transport and drop cached clients."""
+        self._clients.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+_client_pool: Optional[LLMClientPool] = None
+
+
+def get_client_pool() -> LLMClientPool:
+    """Return the process-wide client pool, creating it on first use."""
+    global _client_pool
+    if _client_pool is None:
+        _client_pool = LLMClientPool()
+    return _client_pool
+
+
+async def close_client_pool() -> None:
+    """Close the process-wide client pool if it was created."""
+    global _client_pool
+    if _client_pool is not None:
+        await _client_pool.aclose()
+        _client_pool = None
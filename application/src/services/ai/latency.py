@@ -0,0 +1,39 @@
+"""Rolling latency tracking for AI model calls."""
+
+import math
+from collections import deque
+from typing import Deque, Optional
+
+
+class LatencyWindow:
+    """Keeps the most recent latency samples for one model."""
+
+    def __init__(self, size: int = 200):
+        """Initialize the window.
+
+        Args:
+            size: Maximum number of samples retained
+        """
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add a latency sample in seconds."""
+        self._samples.append(seconds)
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """Return the nearest-rank percentile of the retained samples.
+
+        Args:
+            quantile: Percentile as a fraction, e.g. 0.95
+
+        Returns:
+            Latency in seconds, or None when no samples exist
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(math.ceil(quantile * len(ordered)), 1)
+        return ordered[min(rank, len(ordered)) - 1]
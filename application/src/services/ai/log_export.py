@@ -0,0 +1,265 @@
+"""Incremental Parquet export of AI logs for analytics.
+
+Pages through ``ai_logs`` by id and writes Hive-style partitioned
+Parquet files, ``date=YYYY-MM-DD/part-<first id>.parquet``, so the data
+team can query logs without touching the production database. Run it
+periodically, e.g. from a cron job, and before log retention drops a
+month, with ``python -m application.src.services.ai.log_export``.
+Requires ``pyarrow``, from the ``analytics`` extra
+(``poetry install -E analytics``).
+"""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from application.src.core.config import Settings
+from application.src.models.database import AILog, init_db
+from application.src.services.ai.blob_store import BlobStore, get_blob_store
+
+logger = logging.getLogger(__name__)
+
+PYARROW_AVAILABLE = find_spec("pyarrow") is not None
+
+# Readers of Hive-style datasets skip files starting with an underscore
+WATERMARK_FILE = "_watermark.json"
+
+# Repeated values, stored once per row group
+DICTIONARY_COLUMNS = ("model", "provider", "tenant")
+
+COLUMNS = (
+    "id",
+    "created_at",
+    "model",
+    "provider",
+    "tenant",
+    "project_id",
+    "tokens_used",
+    "prompt_tokens",
+    "completion_tokens",
+    "latency",
+    "failed_models",
+    "prompt",
+    "response",
+    "prompt_blob",
+    "response_blob",
+)
+
+
+def _schema():
+    """Arrow schema of exported rows."""
+    import pyarrow as pa
+
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("created_at", pa.timestamp("us")),
+            ("model", text),
+            ("provider", text),
+            ("tenant", text),
+            ("project_id", pa.int32()),
+            ("tokens_used", pa.int32()),
+            ("prompt_tokens", pa.int32()),
+            ("completion_tokens", pa.int32()),
+            ("latency", pa.float64()),
+            ("failed_models", pa.list_(pa.string())),
+            ("prompt", pa.string()),
+            ("response", pa.string()),
+            ("prompt_bytes", pa.int32()),
+            ("response_bytes", pa.int32()),
+            ("prompt_blob", pa.string()),
+            ("response_blob", pa.string()),
+        ]
+    )
+
+
+class LogExporter:
+    """Exports AI logs written since the last run to Parquet.
+
+    The highest exported id is kept in ``_watermark.json`` under
+    ``root`` and only advanced once a page's files are in place, so an
+    interrupted run resumes where it stopped and rewrites, rather than
+    duplicates, any files of the unfinished page.
+
+    Ids are assigned before rows commit, so recent rows may still be
+    joined by lower ids. Each run therefore stops at the first row
+    younger than ``settle``.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        root: str,
+        blob_store: Optional[BlobStore] = None,
+        batch_size: int = 50000,
+        settle: float = 300.0,
+        compression: str = "zstd",
+    ):
+        """Initialize the exporter.
+
+        Args:
+            engine: Database holding ``ai_logs``
+            root: Directory of the Parquet dataset
+            blob_store: Resolves offloaded bodies; exported as hashes only
+                if omitted
+            batch_size: Rows read per query and written per file at most
+            settle: Seconds after which no lower id can still commit
+            compression: Parquet codec, e.g. 'zstd' or 'snappy'
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required to export AI logs")
+        self.engine = engine
+        self.root = root
+        self.blob_store = blob_store
+        self.batch_size = batch_size
+        self.settle = settle
+        self.compression = compression
+
+    @property
+    def watermark(self) -> int:
+        """Highest exported id, 0 before the first run."""
+        try:
+            with open(os.path.join(self.root, WATERMARK_FILE)) as f:
+                return json.load(f)["id"]
+        except FileNotFoundError:
+            return 0
+
+    def _save_watermark(self, last_id: int) -> None:
+        self._replace(
+            os.path.join(self.root, WATERMARK_FILE),
+            lambda path: _write_json(path, {"id": last_id}),
+        )
+
+    def run(self) -> int:
+        """Export rows past the watermark.
+
+        Returns:
+            Number of rows exported
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.settle)
+        last_id = self.watermark
+        exported = 0
+        while True:
+            rows = self._page(last_id)
+            settled = []
+            for row in rows:
+                created_at = row["created_at"]
+                if created_at is not None and created_at >= cutoff:
+                    break
+                settled.append(row)
+            if settled:
+                self._write(settled)
+                last_id = settled[-1]["id"]
+                self._save_watermark(last_id)
+                exported += len(settled)
+            if len(settled) < self.batch_size:
+                break
+        logger.info(f"Exported {exported} AI logs up to id {last_id}")
+        return exported
+
+    def _page(self, after: int) -> List[Dict[str, Any]]:
+        """Next rows by id; a range scan of the id index, never an OFFSET."""
+        table = AILog.__table__
+        statement = (
+            select(*[table.c[column] for column in COLUMNS])
+            .where(table.c.id > after)
+            .order_by(table.c.id)
+            .limit(self.batch_size)
+        )
+        with self.engine.connect() as connection:
+            return [
+                dict(row)
+                for row in connection.execute(statement).mappings().all()
+            ]
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        """Write one file per day of ``rows``."""
+        days: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            self._resolve(row)
+            created_at = row["created_at"] or datetime(1970, 1, 1)
+            row["created_at"] = created_at
+            days.setdefault(created_at.date().isoformat(), []).append(row)
+        for day, day_rows in days.items():
+            path = os.path.join(
+                self.root,
+                f"date={day}",
+                f"part-{day_rows[0]['id']:012d}.parquet",
+            )
+            self._replace(
+                path, lambda temporary: self._parquet(day_rows, temporary)
+            )
+
+    def _resolve(self, row: Dict[str, Any]) -> None:
+        """Fill in offloaded bodies and record body sizes, in place."""
+        for field in ("prompt", "response"):
+            digest = row[f"{field}_blob"]
+            if row[field] is None and digest and self.blob_store:
+                try:
+                    row[field] = self.blob_store.get(digest)
+                except OSError as e:
+                    logger.warning(f"Cannot read AI log {field} {digest}: {e}")
+            body = row[field]
+            row[f"{field}_bytes"] = (
+                None if body is None else len(body.encode("utf-8"))
+            )
+
+    def _parquet(self, rows: List[Dict[str, Any]], path: str) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist(rows, schema=_schema())
+        pq.write_table(
+            table,
+            path,
+            compression=self.compression,
+            use_dictionary=list(DICTIONARY_COLUMNS),
+        )
+
+    @staticmethod
+    def _replace(path: str, write) -> None:
+        """Write a file through a temporary, so readers never see a part."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix="_", suffix=".tmp"
+        )
+        os.close(fd)
+        try:
+            write(temporary)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+def _write_json(path: str, value: Any) -> None:
+    with open(path, "w") as f:
+        json.dump(value, f)
+
+
+def main() -> None:
+    """Export new AI logs from the database in DATABASE_URL."""
+    settings = Settings()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise RuntimeError("DATABASE_URL environment variable is not set")
+    LogExporter(
+        init_db(database_url),
+        settings.AI_LOG_EXPORT_DIR,
+        blob_store=get_blob_store(),
+        batch_size=settings.AI_LOG_EXPORT_BATCH_SIZE,
+        settle=settings.AI_LOG_EXPORT_SETTLE,
+    ).run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,110 @@
+"""Retention of AI logs: monthly partitions and their offloaded bodies.
+
+Run daily, e.g. from a cron job, with
+``python -m application.src.services.ai.log_retention``. Hourly usage
+rollups are kept; only raw logs expire.
+"""
+
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy.engine import Engine
+
+from application.src.core.config import Settings
+from application.src.models import partitions
+from application.src.models.database import init_db
+from application.src.services.ai.blob_store import BlobStore, get_blob_store
+
+logger = logging.getLogger(__name__)
+
+# Average month, for the blob sweep
+SECONDS_PER_MONTH = 30.44 * 86400
+
+
+# The Alembic revisions partition ai_logs, on PostgreSQL only
+NOT_MIGRATED = (
+    "ai_logs is not partitioned; run "
+    "`python -m application.src.models.migrate` before starting the app"
+)
+
+
+def prepare_partitions(engine: Engine, months_ahead: int) -> None:
+    """Create the current and upcoming monthly partitions, if partitioned.
+
+    Called at startup so inserts never wait on a missing partition.
+    """
+    with engine.begin() as connection:
+        if not partitions.is_partitioned(connection):
+            if connection.dialect.name == "postgresql":
+                logger.error(NOT_MIGRATED)
+            return
+        created = partitions.ensure_partitions(
+            connection, datetime.utcnow().date(), months_ahead
+        )
+    if created:
+        logger.info(f"Created AI log partitions: {', '.join(created)}")
+
+
+def run_retention(
+    engine: Engine,
+    blob_store: BlobStore,
+    retention_months: int,
+    months_ahead: int = 2,
+) -> Dict[str, Any]:
+    """Drop expired AI log partitions and unreferenced blobs.
+
+    Args:
+        engine: Database holding ``ai_logs``
+        blob_store: Store of offloaded prompt and response bodies
+        retention_months: Whole months of logs kept before the current
+        months_ahead: Upcoming partitions to create
+
+    Returns:
+        Partitions created and dropped and blobs deleted
+
+    Raises:
+        RuntimeError: If ``ai_logs`` on PostgreSQL is not partitioned, so
+            expired logs would silently be kept
+    """
+    today = datetime.utcnow().date()
+    cutoff = partitions.add_months(
+        partitions.month_start(today), -retention_months
+    )
+    created, dropped = [], []
+    with engine.begin() as connection:
+        if partitions.is_partitioned(connection):
+            created = partitions.ensure_partitions(
+                connection, today, months_ahead
+            )
+            dropped = partitions.drop_partitions_before(connection, cutoff)
+        elif connection.dialect.name == "postgresql":
+            raise RuntimeError(NOT_MIGRATED)
+        else:
+            logger.warning("ai_logs is not partitioned, nothing to drop")
+    # Blobs are touched whenever a new log references them, and the
+    # oldest retained log is up to a month older than the cutoff
+    swept = blob_store.sweep((retention_months + 1) * SECONDS_PER_MONTH)
+    report = {"created": created, "dropped": dropped, "blobs_deleted": swept}
+    logger.info(f"AI log retention: {report}")
+    return report
+
+
+def main() -> None:
+    """Apply retention to the database in DATABASE_URL."""
+    settings = Settings()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise RuntimeError("DATABASE_URL environment variable is not set")
+    run_retention(
+        init_db(database_url),
+        get_blob_store(),
+        settings.AI_LOG_RETENTION_MONTHS,
+        settings.AI_LOG_PARTITIONS_AHEAD,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,21 +1,279 @@
 """Model selection service for AI operations."""
 
+import asyncio
 import logging
-from typing import Dict, Optional
+import time
+from asyncio import FIRST_COMPLETED
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
+from application.src.core import metrics
 from application.src.core.config import Settings
+from application.src.services.ai.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from application.src.services.ai.clients import LLMClientPool, get_client_pool
+from application.src.services.ai.latency import LatencyWindow
+from application.src.services.ai.rate_limiter import (
+    RateLimiter,
+    get_rate_limiter,
+)
+from application.src.services.ai.routing import RoutingIndex
+from application.src.services.ai.scheduler import (
+    FairScheduler,
+    current_project,
+    current_tenant,
+    get_scheduler,
+)
+from application.src.services.ai.token_counter import get_token_counter
+from application.src.services.ai.usage_log import (
+    AILogWriter,
+    get_ai_log_writer,
+)
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class TokenUsage:
+    """Token counts reported by a provider for one or more completions."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+    def add(self, other: "TokenUsage") -> None:
+        """Accumulate another usage record into this one."""
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.total_tokens += other.total_tokens
+
+
+@dataclass
+class CompletionResponse:
+    """Provider-independent completion result."""
+
+    content: str
+    model: str
+    provider: str
+    usage: TokenUsage
+    latency: float
+    failed_models: List[str] = field(default_factory=list)
+
+
+class CompletionStream:
+    """Async iterator over completion text as it is generated.
+
+    Falls back to the next model only while nothing has been emitted;
+    once text has reached the caller an error ends the stream. After the
+    stream is exhausted, ``response`` holds the assembled completion.
+    """
+
+    def __init__(
+        self,
+        selector: "ModelSelector",
+        attempts: List[Dict[str, Any]],
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        prompt_tokens: int,
+    ):
+        """Initialize the stream; no request is sent until iteration."""
+        self._selector = selector
+        self._attempts = attempts
+        self._messages = messages
+        self._system_prompt = system_prompt
+        self._temperature = temperature
+        self._max_tokens = max_tokens
+        self._prompt_tokens = prompt_tokens
+        self.response: Optional[CompletionResponse] = None
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._stream()
+
+    async def _stream(self) -> AsyncIterator[str]:
+        """Yield text deltas from the first model that starts answering."""
+        selector = self._selector
+        failed_models: List[str] = []
+        skipped_models: List[str] = []
+        last_error: Optional[Exception] = None
+
+        for attempt in self._attempts:
+            breaker = selector.breaker(attempt["name"])
+            if not breaker.allow_request():
+                skipped_models.append(attempt["name"])
+                continue
+
+            usage = TokenUsage()
+            parts: List[str] = []
+            first_token: Optional[float] = None
+            started = time.monotonic()
+
+            def start_clock() -> None:
+                # Queueing for a slot or quota is not the model's latency
+                nonlocal started
+                started = time.monotonic()
+
+            try:
+                async for delta in selector._stream_model(
+                    attempt,
+                    self._messages,
+                    self._system_prompt,
+                    self._temperature,
+                    self._max_tokens,
+                    self._prompt_tokens,
+                    usage,
+                    start_clock,
+                ):
+                    if first_token is None:
+                        first_token = time.monotonic() - started
+                    parts.append(delta)
+                    yield delta
+            except Exception as error:
+                breaker.record_failure()
+                metrics.count_llm_failure(attempt["provider"], attempt["name"])
+                if parts:
+                    raise
+                logger.warning(f"Model {attempt['name']} failed: {error}")
+                failed_models.append(attempt["name"])
+                last_error = error
+                continue
+            except BaseException:
+                # Client went away or the task was cancelled
+                breaker.release()
+                raise
+
+            latency = time.monotonic() - started
+            breaker.record_success(
+                latency if first_token is None else first_token
+            )
+            content = "".join(parts)
+            if not usage.completion_tokens:
+                usage.completion_tokens = get_token_counter().count(
+                    content, attempt["name"]
+                )
+            usage.prompt_tokens = usage.prompt_tokens or self._prompt_tokens
+            usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+            self.response = CompletionResponse(
+                content=content,
+                model=attempt["name"],
+                provider=attempt["provider"],
+                usage=usage,
+                latency=latency,
+                failed_models=failed_models,
+            )
+            selector.token_usage.setdefault(attempt["name"], TokenUsage()).add(
+                usage
+            )
+            metrics.observe_llm(
+                attempt["provider"],
+                attempt["name"],
+                latency,
+                usage,
+                first_token,
+            )
+            await selector._log_completion(self._messages, self.response)
+            return
+
+        if last_error is None and skipped_models:
+            names = ", ".join(skipped_models)
+            raise CircuitOpenError(f"Circuit open for all models: {names}")
+        raise last_error or ValueError("No models available")
+
+
 class ModelSelector:
     """Handles dynamic model selection and fallback strategies."""
 
-    def __init__(self, settings: Settings):
-        """Initialize model selector with configuration."""
+    def __init__(
+        self,
+        settings: Settings,
+        client_pool: Optional[LLMClientPool] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        scheduler: Optional[FairScheduler] = None,
+        usage_log: Optional[AILogWriter] = None,
+    ):
+        """Initialize model selector with configuration.
+
+        Args:
+            settings: Application settings with model configuration
+            client_pool: Async provider clients, process-wide pool if omitted
+            rate_limiter: Provider rate limiter, process-wide if omitted
+            scheduler: Lane and fair-share scheduler, process-wide if
+                omitted
+            usage_log: Writer persisting completions as AI logs, the
+                process-wide one (if started) if omitted
+        """
         self.settings = settings
         self.models = settings.OPENAI_MODELS
+        self.providers = settings.AI_MODELS
         self._validate_models()
+        self._index = RoutingIndex.build(self.models)
+        self._client_pool = client_pool
+        self._rate_limiter = rate_limiter
+        self._scheduler = scheduler
+        self._usage_log = usage_log
+        self.token_usage: Dict[str, TokenUsage] = {}
+        self.latencies: Dict[str, LatencyWindow] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    @property
+    def client_pool(self) -> LLMClientPool:
+        """Provider clients used by the completion gateway."""
+        if self._client_pool is None:
+            self._client_pool = get_client_pool()
+        return self._client_pool
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Token-bucket limiter applied before each provider call."""
+        if self._rate_limiter is None:
+            self._rate_limiter = get_rate_limiter()
+        return self._rate_limiter
+
+    @property
+    def scheduler(self) -> FairScheduler:
+        """Lane and fair-share scheduler each provider call waits on."""
+        if self._scheduler is None:
+            self._scheduler = get_scheduler()
+        return self._scheduler
+
+    @property
+    def usage_log(self) -> Optional[AILogWriter]:
+        """Writer completions are logged to, None when logging is off."""
+        return self._usage_log or get_ai_log_writer()
+
+    def _slot(self, cost: int):
+        """Scheduler slot for one provider call, if scheduling is on."""
+        if not self.settings.SCHEDULER_ENABLED:
+            return nullcontext()
+        return self.scheduler.slot(cost)
+
+    def reload(self, settings: Optional[Settings] = None) -> None:
+        """Rebuild the routing index after a model configuration change.
+
+        Args:
+            settings: New settings, the current ones re-read if omitted
+        """
+        settings = settings or self.settings
+        models = settings.OPENAI_MODELS
+        if not models:
+            raise ValueError("No models configured")
+        self.settings = settings
+        self.models = models
+        self.providers = settings.AI_MODELS
+        self._validate_models()
+        self._index = RoutingIndex.build(models)
 
     def _validate_models(self) -> None:
         """Validate model configuration."""
@@ -44,25 +302,44 @@ class ModelSelector:
         Returns:
             Dict containing model configuration
         """
-        models = self.models.items()
-        available_models = sorted(models, key=lambda x: x[1]["priority"])
+        index = self._index
+        best = index.best_for(token_estimate)
+        if best is None:
+            logger.warning("No models meet requirements")
+            return index.largest
+        if self.is_available(best["name"]):
+            return best
 
-        # Filter models by token limit
-        if token_estimate:
-            available_models = [
-                m
-                for m in available_models
-                if m[1]["max_tokens"] >= token_estimate
-            ]
+        # Skip models with an open circuit unless none are healthy
+        healthy = [
+            c for c in index.by_priority if self.is_available(c["name"])
+        ]
+        candidates = healthy or index.by_priority
+        for config in candidates:
+            if not token_estimate or config["max_tokens"] >= token_estimate:
+                return config
 
         # Use model with highest max_tokens if no models meet requirements
-        if not available_models:
-            logger.warning("No models meet requirements")
-            models = self.models.items()
-            return max(models, key=lambda x: x[1]["max_tokens"])[1]
+        logger.warning("No models meet requirements")
+        return index.largest
+
+    def primary_model(
+        self, task_type: str, token_estimate: Optional[int] = None
+    ) -> Dict:
+        """Model a task is routed to while every circuit is closed.
+
+        Unlike ``select_model`` this ignores model health, so keys built
+        from it, such as cache keys, stay stable during an incident.
 
-        # Return the highest priority model that meets requirements
-        return available_models[0][1]
+        Args:
+            task_type: Type of task (e.g., 'code_generation')
+            token_estimate: Estimated tokens needed
+
+        Returns:
+            Dict containing model configuration
+        """
+        index = self._index
+        return index.best_for(token_estimate) or index.largest
 
     def get_fallback_model(self, current_model: str) -> Optional[Dict]:
         """
@@ -74,25 +351,498 @@ class ModelSelector:
         Returns:
             Next model configuration or None if no fallbacks available
         """
-        current_priority = None
-        for model_id, config in self.models.items():
-            if config["name"] == current_model:
-                current_priority = config["priority"]
-                break
-
-        if current_priority is None:
+        index = self._index
+        start = index.fallback_start.get(current_model)
+        if start is None:
             logger.warning(f"Unknown model: {current_model}")
             return None
 
-        # Find next model with higher priority number
-        fallback_models = [
-            config
-            for config in self.models.values()
-            if config["priority"] > current_priority
-        ]
+        # Next healthy model with a higher priority number
+        for position in range(start, len(index.by_priority)):
+            config = index.by_priority[position]
+            if self.is_available(config["name"]):
+                return config
 
-        if not fallback_models:
-            logger.warning("No fallback models available")
-            return None
+        logger.warning("No fallback models available")
+        return None
+
+    async def generate_completion(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        task_type: str = "completion",
+        system_prompt: Optional[str] = None,
+        token_estimate: Optional[int] = None,
+        context: Optional[Dict] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        fallback_providers: Optional[List[str]] = None,
+        hedge: Optional[bool] = None,
+    ) -> CompletionResponse:
+        """Generate a completion, walking the fallback order on failure.
+
+        With hedging, the next model in the order is also fired when the
+        in-flight one has not answered within its hedge delay, and the
+        first successful answer wins while the others are cancelled.
+
+        Args:
+            prompt: User prompt to complete
+            model: Provider key from AI_MODELS (walks its fallback_chain)
+                or a model name; selected by task when omitted
+            task_type: Type of task used for model selection
+            system_prompt: Optional system instructions
+            token_estimate: Estimated tokens needed, used for selection
+            context: Additional context for selection
+            temperature: Override for the configured model temperature
+            max_tokens: Override for the configured completion limit
+            fallback_providers: AI_MODELS keys tried after the chain
+            hedge: Enable hedged requests, LLM_HEDGING_ENABLED if omitted
+
+        Returns:
+            Normalized completion with content, model and token usage
+
+        Raises:
+            Exception: The last provider error if every model fails
+        """
+        attempts = self._build_attempts(
+            model, task_type, token_estimate, context, fallback_providers
+        )
+        messages = [{"role": "user", "content": prompt}]
+        prompt_tokens = _count_prompt_tokens(messages, system_prompt)
+        if hedge is None:
+            hedge = self.settings.LLM_HEDGING_ENABLED
+        max_inflight = self.settings.LLM_HEDGE_MAX_INFLIGHT if hedge else 1
+
+        queue = list(attempts)
+        pending: Dict[asyncio.Task, Tuple[Dict[str, Any], CircuitBreaker]] = {}
+        failed_models: List[str] = []
+        skipped_models: List[str] = []
+        last_error: Optional[Exception] = None
+        response: Optional[CompletionResponse] = None
+
+        def launch() -> bool:
+            # Start the next model whose circuit lets the call through
+            while queue:
+                attempt = queue.pop(0)
+                breaker = self.breaker(attempt["name"])
+                if not breaker.allow_request():
+                    skipped_models.append(attempt["name"])
+                    continue
+                task = asyncio.create_task(
+                    self._call_model(
+                        attempt,
+                        messages,
+                        system_prompt,
+                        temperature,
+                        max_tokens,
+                        prompt_tokens,
+                    )
+                )
+                pending[task] = (attempt, breaker)
+                return True
+            return False
+
+        try:
+            launch()
+            while pending and response is None:
+                timeout = None
+                if queue and len(pending) < max_inflight:
+                    newest, _ = list(pending.values())[-1]
+                    timeout = self.hedge_delay(newest["name"])
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info(f"Hedging slow model {newest['name']}")
+                    launch()
+                    continue
+
+                # Record every finished call, even past the first success
+                failures = 0
+                for task in done:
+                    attempt, breaker = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        result = task.result()
+                        breaker.record_success(result.latency)
+                        response = response or result
+                        continue
+                    breaker.record_failure()
+                    metrics.count_llm_failure(
+                        attempt["provider"], attempt["name"]
+                    )
+                    logger.warning(f"Model {attempt['name']} failed: {error}")
+                    failed_models.append(attempt["name"])
+                    last_error = error
+                    failures += 1
+                if response is None:
+                    for _ in range(failures):
+                        launch()
+        finally:
+            # Cancel hedges that lost the race
+            for task, (_, breaker) in pending.items():
+                task.cancel()
+                breaker.release()
+
+        if response is not None:
+            # Logging may wait for room in the writer's queue, so it runs
+            # once the losing hedges are no longer holding slots
+            response.failed_models = failed_models
+            self._record_usage(response)
+            await self._log_completion(messages, response)
+            return response
+        if last_error is None and skipped_models:
+            names = ", ".join(skipped_models)
+            raise CircuitOpenError(f"Circuit open for all models: {names}")
+        raise last_error or ValueError("No models available")
+
+    def stream_completion(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        task_type: str = "completion",
+        system_prompt: Optional[str] = None,
+        token_estimate: Optional[int] = None,
+        context: Optional[Dict] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        fallback_providers: Optional[List[str]] = None,
+    ) -> CompletionStream:
+        """Stream a completion, walking the fallback order until one starts.
+
+        Takes the same arguments as ``generate_completion`` except for
+        hedging, which does not apply to streams.
+
+        Returns:
+            Stream of text deltas; its ``response`` is set once exhausted
+        """
+        attempts = self._build_attempts(
+            model, task_type, token_estimate, context, fallback_providers
+        )
+        messages = [{"role": "user", "content": prompt}]
+        return CompletionStream(
+            self,
+            attempts,
+            messages,
+            system_prompt,
+            temperature,
+            max_tokens,
+            _count_prompt_tokens(messages, system_prompt),
+        )
+
+    def breaker(self, model_name: str) -> CircuitBreaker:
+        """Return the circuit breaker tracking a model."""
+        if model_name not in self.breakers:
+            settings = self.settings
+            self.breakers[model_name] = CircuitBreaker(
+                model_name,
+                failure_rate=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+                min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+                window_seconds=settings.CIRCUIT_BREAKER_WINDOW,
+                cooldown_seconds=settings.CIRCUIT_BREAKER_COOLDOWN,
+                half_open_probes=settings.CIRCUIT_BREAKER_HALF_OPEN_PROBES,
+                slow_call_seconds=settings.CIRCUIT_BREAKER_SLOW_CALL,
+            )
+        return self.breakers[model_name]
+
+    def is_available(self, model_name: str) -> bool:
+        """Whether a model's circuit currently accepts traffic."""
+        breaker = self.breakers.get(model_name)
+        return breaker is None or breaker.is_available()
+
+    def hedge_delay(self, model_name: str) -> float:
+        """Delay before hedging a request that is still in flight.
+
+        Derived from the configured latency percentile of recent calls to
+        the model, falling back to LLM_HEDGE_DELAY until enough samples
+        have been observed.
+
+        Args:
+            model_name: Name of the in-flight model
+
+        Returns:
+            Delay in seconds
+        """
+        settings = self.settings
+        window = self.latencies.get(model_name)
+        if window is None or len(window) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return settings.LLM_HEDGE_DELAY
+        delay = window.percentile(settings.LLM_HEDGE_PERCENTILE)
+        return max(delay, settings.LLM_HEDGE_MIN_DELAY)
+
+    def _build_attempts(
+        self,
+        model: Optional[str],
+        task_type: str,
+        token_estimate: Optional[int],
+        context: Optional[Dict],
+        fallback_providers: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        """Resolve the ordered list of models to try for a request."""
+        attempts: List[Dict[str, Any]] = []
+
+        if model in self.providers:
+            attempts.extend(self._provider_attempts(model))
+        else:
+            config = self._find_model(model) if model else None
+            if config is None:
+                config = self.select_model(task_type, token_estimate, context)
+            while config is not None:
+                attempts.append({"provider": "openai", **config})
+                config = self.get_fallback_model(config["name"])
+
+        for provider_key in fallback_providers or []:
+            attempts.extend(self._provider_attempts(provider_key))
+
+        # Keep the first occurrence of each model
+        unique: Dict[str, Dict[str, Any]] = {}
+        for attempt in attempts:
+            unique.setdefault(attempt["name"], attempt)
+        return list(unique.values())
+
+    def _provider_attempts(self, provider_key: str) -> List[Dict[str, Any]]:
+        """Expand an AI_MODELS entry into its primary and fallback models."""
+        config = self.providers[provider_key]
+        names = [config["name"], *config.get("fallback_chain", [])]
+        attempts = []
+        for name in names:
+            variant = self._find_model(name) or config
+            attempts.append(
+                {
+                    "provider": config.get("provider", provider_key),
+                    "name": name,
+                    "max_tokens": variant["max_tokens"],
+                    "temperature": variant["temperature"],
+                }
+            )
+        return attempts
+
+    def _find_model(self, name: str) -> Optional[Dict]:
+        """Look up an OpenAI model variant by model name."""
+        return self._index.by_name.get(name)
+
+    async def _call_model(
+        self,
+        attempt: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        prompt_tokens: int = 0,
+    ) -> CompletionResponse:
+        """Send one completion request to the attempt's provider."""
+        provider = attempt["provider"]
+        client = self.client_pool.get_client(provider)
+        temperature = (
+            attempt["temperature"] if temperature is None else temperature
+        )
+        max_tokens = max_tokens or attempt["max_tokens"]
+
+        async with self._slot(prompt_tokens + max_tokens):
+            # Queue for provider quota before the latency clock starts
+            if self.settings.RATE_LIMIT_ENABLED:
+                await self.rate_limiter.acquire(
+                    provider, attempt["name"], prompt_tokens + max_tokens
+                )
+
+            started = time.monotonic()
+            if provider == "anthropic":
+                kwargs = {"system": system_prompt} if system_prompt else {}
+                response = await client.messages.create(
+                    model=attempt["name"],
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **kwargs,
+                )
+                content = response.content[0].text
+                usage = TokenUsage(
+                    prompt_tokens=_usage_value(response, "input_tokens"),
+                    completion_tokens=_usage_value(response, "output_tokens"),
+                )
+                usage.total_tokens = (
+                    usage.prompt_tokens + usage.completion_tokens
+                )
+            else:
+                if system_prompt:
+                    messages = [
+                        {"role": "system", "content": system_prompt},
+                        *messages,
+                    ]
+                response = await client.chat.completions.create(
+                    model=attempt["name"],
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                message = response.choices[0].message
+                content = (
+                    message["content"]
+                    if isinstance(message, dict)
+                    else message.content
+                )
+                usage = TokenUsage(
+                    prompt_tokens=_usage_value(response, "prompt_tokens"),
+                    completion_tokens=_usage_value(
+                        response, "completion_tokens"
+                    ),
+                    total_tokens=_usage_value(response, "total_tokens"),
+                )
+
+            return CompletionResponse(
+                content=content,
+                model=attempt["name"],
+                provider=provider,
+                usage=usage,
+                latency=time.monotonic() - started,
+            )
+
+    async def _stream_model(
+        self,
+        attempt: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        prompt_tokens: int,
+        usage: TokenUsage,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> AsyncIterator[str]:
+        """Stream one completion, filling in usage as it is reported.
+
+        ``on_start`` is called once the scheduler slot and provider quota
+        are held, just before the request is sent.
+        """
+        provider = attempt["provider"]
+        client = self.client_pool.get_client(provider)
+        temperature = (
+            attempt["temperature"] if temperature is None else temperature
+        )
+        max_tokens = max_tokens or attempt["max_tokens"]
+
+        async with self._slot(prompt_tokens + max_tokens):
+            if self.settings.RATE_LIMIT_ENABLED:
+                await self.rate_limiter.acquire(
+                    provider, attempt["name"], prompt_tokens + max_tokens
+                )
+            if on_start is not None:
+                on_start()
+
+            if provider == "anthropic":
+                kwargs = {"system": system_prompt} if system_prompt else {}
+                events = await client.messages.create(
+                    model=attempt["name"],
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    **kwargs,
+                )
+                async for event in events:
+                    if event.type == "message_start":
+                        usage.prompt_tokens = _usage_value(
+                            event.message, "input_tokens"
+                        )
+                    elif event.type == "content_block_delta":
+                        text = getattr(event.delta, "text", None)
+                        if text:
+                            yield text
+                    elif event.type == "message_delta":
+                        usage.completion_tokens = _usage_value(
+                            event, "output_tokens"
+                        )
+                return
+
+            if system_prompt:
+                messages = [
+                    {"role": "system", "content": system_prompt},
+                    *messages,
+                ]
+            kwargs = {}
+            if provider == "openai":
+                kwargs["stream_options"] = {"include_usage": True}
+            chunks = await client.chat.completions.create(
+                model=attempt["name"],
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **kwargs,
+            )
+            async for chunk in chunks:
+                if getattr(chunk, "usage", None):
+                    usage.prompt_tokens = _usage_value(chunk, "prompt_tokens")
+                    usage.completion_tokens = _usage_value(
+                        chunk, "completion_tokens"
+                    )
+                if chunk.choices:
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        yield text
+
+    async def _log_completion(
+        self, messages: List[Dict[str, str]], response: CompletionResponse
+    ) -> None:
+        """Queue a completion for the AI log, if logging is on."""
+        usage_log = self.usage_log
+        if usage_log is None:
+            return
+        await usage_log.record(
+            model=response.model,
+            provider=response.provider,
+            prompt=messages[-1]["content"],
+            response=response.content,
+            tokens_used=response.usage.total_tokens,
+            prompt_tokens=response.usage.prompt_tokens,
+            completion_tokens=response.usage.completion_tokens,
+            latency=response.latency,
+            failed_models=list(response.failed_models),
+            tenant=current_tenant.get(),
+            project_id=current_project.get(),
+        )
+
+    def _record_usage(self, response: CompletionResponse) -> None:
+        """Accumulate token usage and latency per model."""
+        window = self.latencies.setdefault(
+            response.model, LatencyWindow(self.settings.LLM_LATENCY_WINDOW)
+        )
+        window.record(response.latency)
+        totals = self.token_usage.setdefault(response.model, TokenUsage())
+        totals.add(response.usage)
+        metrics.observe_llm(
+            response.provider, response.model, response.latency, response.usage
+        )
+
+
+def _count_prompt_tokens(
+    messages: List[Dict[str, str]], system_prompt: Optional[str]
+) -> int:
+    """Count the tokens a chat request sends, including the system prompt."""
+    if system_prompt:
+        messages = [{"role": "system", "content": system_prompt}, *messages]
+    return get_token_counter().count_messages(messages)
+
+
+def _usage_value(response: Any, key: str) -> int:
+    """Read a token count from a provider response's usage block."""
+    usage = getattr(response, "usage", None)
+    if isinstance(usage, dict):
+        value = usage.get(key)
+    else:
+        value = getattr(usage, key, None)
+    return value if isinstance(value, int) else 0
+
+
+_model_selector: Optional[ModelSelector] = None
+
+
+def get_model_selector() -> ModelSelector:
+    """Return the process-wide model selector, creating it on first use.
 
-        return min(fallback_models, key=lambda x: x["priority"])
+    Sharing one selector keeps circuit breakers, latency windows and the
+    routing index common to every service in the worker.
+    """
+    global _model_selector
+    if _model_selector is None:
+        _model_selector = ModelSelector(Settings())
+    return _model_selector
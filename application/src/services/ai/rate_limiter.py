@@ -0,0 +1,236 @@
+"""Token-bucket rate limiting for AI provider requests."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from application.src.core.config import Settings
+from application.src.services.ai.scheduler import INTERACTIVE, current_lane
+from application.src.services.cache.redis_pool import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Atomically refill a bucket and reserve tokens, returning the wait in ms.
+# Reservations may drive the balance negative so later callers queue
+# behind earlier ones in arrival order.
+RESERVE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local amount = math.min(tonumber(ARGV[3]), capacity)
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) / 1000 * rate)
+tokens = tokens - amount
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 2000))
+if tokens >= 0 then
+    return 0
+end
+return math.ceil(-tokens / rate * 1000)
+"""
+
+
+class TokenBucket:
+    """In-process token bucket with FIFO reservations."""
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a full bucket.
+
+        Args:
+            capacity: Maximum tokens the bucket holds
+            refill_per_second: Tokens added per second
+            clock: Monotonic time source
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def reserve(self, amount: float) -> float:
+        """Take tokens now and return how long the caller must wait.
+
+        Args:
+            amount: Tokens to take, capped at the bucket capacity
+
+        Returns:
+            Seconds until the reservation is covered
+        """
+        now = self._clock()
+        elapsed = now - self._updated
+        self._tokens = min(
+            self.capacity, self._tokens + elapsed * self.refill_per_second
+        )
+        self._updated = now
+        self._tokens -= min(amount, self.capacity)
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.refill_per_second
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits per provider.
+
+    Limits in a provider's AI_MODELS entry are the provider's quota and
+    are shared by all of its models; ``rpm`` and ``tpm`` in an
+    OPENAI_MODELS entry further limit that model alone. Providers and
+    models without them are unlimited. Callers are admitted in arrival
+    order and wait rather than fail.
+
+    Each scheduler lane draws on its own share of every limit, per
+    RATE_LIMIT_LANE_SHARES, so a batch run that exhausts its budget
+    queues behind itself and never pushes interactive calls back.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize the limiter.
+
+        Args:
+            settings: Application settings with model limits
+        """
+        self.settings = settings
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def acquire(
+        self,
+        provider: str,
+        model: str,
+        tokens: int,
+        lane: Optional[str] = None,
+    ) -> float:
+        """Wait until a request for the model fits within its limits.
+
+        Args:
+            provider: Provider name, e.g. 'openai'
+            model: Model name
+            tokens: Estimated prompt plus completion tokens
+            lane: Scheduler lane, the current request's if omitted
+
+        Returns:
+            Seconds spent waiting
+        """
+        budget, share = self._lane_budget(lane or current_lane.get())
+        waits = []
+        for scope, limits in self.limits_for(provider, model).items():
+            if budget:
+                scope = f"{scope}:{budget}"
+            for kind, amount in (("rpm", 1), ("tpm", tokens)):
+                if limits.get(kind):
+                    waits.append(
+                        await self._reserve(
+                            f"{scope}:{kind}", limits[kind] * share, amount
+                        )
+                    )
+
+        wait = max(waits, default=0.0)
+        if wait > 0:
+            logger.info(f"Rate limit queued {model} request for {wait:.2f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+    def limits_for(
+        self, provider: str, model: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Resolve the per-minute limits a model request counts against.
+
+        Args:
+            provider: Provider name
+            model: Model name
+
+        Returns:
+            Bucket scope, ``provider`` or ``provider:model``, -> dict with
+            optional ``rpm`` and ``tpm`` entries
+        """
+        scopes: Dict[str, Dict[str, Any]] = {}
+        for config in self.settings.AI_MODELS.values():
+            if config.get("provider") == provider:
+                limits = {k: config[k] for k in ("rpm", "tpm") if k in config}
+                if limits:
+                    scopes[provider] = limits
+                break
+        for config in self.settings.OPENAI_MODELS.values():
+            if provider == "openai" and config["name"] == model:
+                limits = {k: config[k] for k in ("rpm", "tpm") if k in config}
+                if limits:
+                    scopes[f"{provider}:{model}"] = limits
+        return scopes
+
+    def _lane_budget(self, lane: str) -> Tuple[Optional[str], float]:
+        """Budget a lane draws on and its share of each limit.
+
+        Lanes without a share use the interactive lane's; without any
+        shares every lane draws on the whole limit.
+        """
+        shares = self.settings.RATE_LIMIT_LANE_SHARES
+        if not shares:
+            return None, 1.0
+        if lane not in shares:
+            lane = INTERACTIVE
+        return lane, shares.get(lane, 1.0)
+
+    async def _reserve(
+        self, key: str, per_minute: float, amount: int
+    ) -> float:
+        """Reserve from a local bucket, returning the wait in seconds."""
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(per_minute, per_minute / 60)
+        return self._buckets[key].reserve(amount)
+
+
+class RedisRateLimiter(RateLimiter):
+    """Rate limiter whose buckets are shared across workers via Redis."""
+
+    def __init__(self, settings: Settings, redis_client: Any):
+        """Initialize the limiter.
+
+        Args:
+            settings: Application settings with model limits
+            redis_client: ``redis.asyncio`` client holding bucket state
+        """
+        super().__init__(settings)
+        self.redis_client = redis_client
+        self._script = redis_client.register_script(RESERVE_SCRIPT)
+
+    async def _reserve(
+        self, key: str, per_minute: float, amount: int
+    ) -> float:
+        """Reserve from the shared bucket, returning the wait in seconds.
+
+        Falls back to this process's bucket while Redis is unavailable,
+        so an outage is not counted as a failure of the model.
+        """
+        try:
+            wait_ms = await self._script(
+                keys=[f"ratelimit:{key}"],
+                args=[per_minute, per_minute / 60, amount],
+            )
+        except RedisError as e:
+            logger.warning(f"Shared rate limit unavailable for {key}: {e}")
+            return await super()._reserve(key, per_minute, amount)
+        return int(wait_ms) / 1000
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter, creating it on first use."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        settings = Settings()
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            _rate_limiter = RedisRateLimiter(settings, get_redis())
+        else:
+            _rate_limiter = RateLimiter(settings)
+    return _rate_limiter
@@ -0,0 +1,106 @@
+"""Precomputed routing tables for model selection."""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class RoutingIndex:
+    """Immutable lookup tables built from the model variant config.
+
+    Built once per configuration so that selection never sorts or scans
+    the full model table on the request path.
+
+    Attributes:
+        by_priority: Model configs ordered by priority
+        by_name: Model name to config
+        fallback_start: Model name to the position in ``by_priority`` of
+            the first model with a strictly higher priority number
+        capacities: Distinct ``max_tokens`` values in ascending order
+        best_fit: For each capacity, the highest-priority model whose
+            ``max_tokens`` is at least that large
+        largest: Model with the highest ``max_tokens``
+    """
+
+    by_priority: Tuple[Dict, ...]
+    by_name: Mapping[str, Dict]
+    fallback_start: Mapping[str, int]
+    capacities: Tuple[int, ...]
+    best_fit: Tuple[Dict, ...]
+    largest: Dict
+
+    @classmethod
+    def build(cls, models: Dict[str, Dict]) -> "RoutingIndex":
+        """Build the index from an OPENAI_MODELS style mapping.
+
+        Args:
+            models: Model id to config with 'name', 'max_tokens' and
+                'priority'
+
+        Returns:
+            Routing index over copies of the configs
+        """
+        configs = [dict(config) for config in models.values()]
+        by_priority = tuple(sorted(configs, key=lambda c: c["priority"]))
+
+        by_name: Dict[str, Dict] = {}
+        for config in configs:
+            by_name.setdefault(config["name"], config)
+
+        fallback_start: Dict[str, int] = {}
+        position = 0
+        for config in by_priority:
+            while (
+                position < len(by_priority)
+                and by_priority[position]["priority"] <= config["priority"]
+            ):
+                position += 1
+            fallback_start.setdefault(config["name"], position)
+
+        # Suffix minimum of priority rank over models sorted by capacity
+        capacities = sorted({config["max_tokens"] for config in configs})
+        by_capacity = sorted(
+            range(len(by_priority)),
+            key=lambda i: by_priority[i]["max_tokens"],
+            reverse=True,
+        )
+        best_fit = []
+        best_rank = len(by_priority)
+        position = 0
+        for capacity in reversed(capacities):
+            while (
+                position < len(by_capacity)
+                and by_priority[by_capacity[position]]["max_tokens"]
+                >= capacity
+            ):
+                best_rank = min(best_rank, by_capacity[position])
+                position += 1
+            best_fit.append(by_priority[best_rank])
+        best_fit.reverse()
+
+        return cls(
+            by_priority=by_priority,
+            by_name=MappingProxyType(by_name),
+            fallback_start=MappingProxyType(fallback_start),
+            capacities=tuple(capacities),
+            best_fit=tuple(best_fit),
+            largest=max(configs, key=lambda c: c["max_tokens"]),
+        )
+
+    def best_for(self, token_estimate: Optional[int]) -> Optional[Dict]:
+        """Highest-priority model that fits the token estimate.
+
+        Args:
+            token_estimate: Tokens needed, any model fits if omitted
+
+        Returns:
+            Model config, or None if no model is large enough
+        """
+        if not token_estimate:
+            return self.by_priority[0]
+        position = bisect_left(self.capacities, token_estimate)
+        if position == len(self.capacities):
+            return None
+        return self.best_fit[position]
@@ -0,0 +1,163 @@
+"""Priority lanes and per-tenant fair queuing for provider calls."""
+
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from application.src.core.config import Settings
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Set per request (or job) and read when a provider call is scheduled
+current_lane: ContextVar[str] = ContextVar("llm_lane", default=INTERACTIVE)
+current_tenant: ContextVar[str] = ContextVar("llm_tenant", default="anonymous")
+# Project the calls are made for, recorded on their AI logs for usage
+current_project: ContextVar[Optional[int]] = ContextVar(
+    "llm_project", default=None
+)
+
+
+@contextmanager
+def scheduling(
+    lane: Optional[str] = None,
+    tenant: Optional[str] = None,
+    project_id: Optional[int] = None,
+) -> Iterator[None]:
+    """Run a block's provider calls in a lane, for a tenant or project.
+
+    Args:
+        lane: Lane name, e.g. 'batch'
+        tenant: Fair-share identity, e.g. 'user:42'
+        project_id: Project their usage is attributed to
+    """
+    tokens = []
+    if lane is not None:
+        tokens.append((current_lane, current_lane.set(lane)))
+    if tenant is not None:
+        tokens.append((current_tenant, current_tenant.set(tenant)))
+    if project_id is not None:
+        tokens.append((current_project, current_project.set(project_id)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class _Lane:
+    """Slots and start-time fair queue of one lane."""
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.active = 0
+        # Start tag of the request most recently admitted
+        self.virtual_time = 0.0
+        self.finish_tags: Dict[str, float] = {}
+        self.waiters: List[Tuple[float, int, asyncio.Future]] = []
+
+
+class FairScheduler:
+    """Caps concurrent provider calls per lane and shares them fairly.
+
+    Each lane, e.g. interactive and batch, has its own slots, so a batch
+    run saturating its lane never delays interactive requests. Within a
+    lane, waiting requests are admitted by start-time fair queuing: each
+    tenant's requests are tagged with their cumulative cost divided by
+    the tenant's weight, and the lowest tag goes first. A tenant sending
+    many requests therefore waits behind tenants that have sent few.
+    """
+
+    def __init__(
+        self,
+        lanes: Dict[str, int],
+        tenant_weights: Optional[Dict[str, float]] = None,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            lanes: Concurrent provider calls allowed per lane
+            tenant_weights: Relative shares, 1.0 for unlisted tenants
+        """
+        self.lanes = {name: _Lane(slots) for name, slots in lanes.items()}
+        self.tenant_weights = tenant_weights or {}
+        self._sequence = itertools.count()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        cost: float = 1.0,
+        lane: Optional[str] = None,
+        tenant: Optional[str] = None,
+    ) -> AsyncIterator[None]:
+        """Hold one of the lane's slots for the duration of a call.
+
+        Args:
+            cost: Work the call represents, e.g. its token budget
+            lane: Lane name, the current request's if omitted
+            tenant: Fair-share identity, the current request's if omitted
+        """
+        lane_name = lane or current_lane.get()
+        state = self.lanes.get(lane_name) or self.lanes[INTERACTIVE]
+        await self._acquire(state, tenant or current_tenant.get(), cost)
+        try:
+            yield
+        finally:
+            self._release(state)
+
+    def waiting(self, lane: str) -> int:
+        """Number of calls queued for a lane."""
+        return sum(not w[2].done() for w in self.lanes[lane].waiters)
+
+    async def _acquire(self, lane: _Lane, tenant: str, cost: float) -> None:
+        """Wait for a slot in turn."""
+        weight = self.tenant_weights.get(tenant, 1.0)
+        start = max(lane.virtual_time, lane.finish_tags.get(tenant, 0.0))
+        lane.finish_tags[tenant] = start + max(cost, 1.0) / weight
+
+        if lane.active < lane.slots and not lane.waiters:
+            lane.active += 1
+            lane.virtual_time = start
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(lane.waiters, (start, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller gave up; pass the slot on
+                self._release(lane)
+            raise
+
+    def _release(self, lane: _Lane) -> None:
+        """Free a slot and admit the next waiter, if any."""
+        lane.active -= 1
+        while lane.waiters and lane.active < lane.slots:
+            start, _, future = heapq.heappop(lane.waiters)
+            if future.done():
+                continue
+            lane.active += 1
+            lane.virtual_time = start
+            future.set_result(None)
+        if lane.active == 0 and not lane.waiters:
+            # Idle: forget history so tags stay small
+            lane.virtual_time = 0.0
+            lane.finish_tags.clear()
+
+
+_scheduler: Optional[FairScheduler] = None
+
+
+def get_scheduler() -> FairScheduler:
+    """Return the process-wide provider call scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        settings = Settings()
+        _scheduler = FairScheduler(
+            settings.SCHEDULER_LANES, settings.SCHEDULER_TENANT_WEIGHTS
+        )
+    return _scheduler
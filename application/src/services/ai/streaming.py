@@ -0,0 +1,69 @@
+"""Server-sent event helpers for streaming AI completions."""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi.responses import StreamingResponse
+
+from application.src.services.ai.model_selector import (
+    CompletionResponse,
+    CompletionStream,
+)
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    # Stop nginx from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one server-sent event.
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+
+    Returns:
+        Event text including the terminating blank line
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def completion_events(
+    stream: CompletionStream,
+    build_result: Callable[[CompletionResponse], Dict[str, Any]],
+    on_result: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+) -> AsyncIterator[str]:
+    """Relay a completion stream as ``token`` events and a final ``result``.
+
+    Args:
+        stream: Completion stream to relay
+        build_result: Builds the endpoint's result from the completion
+        on_result: Optional hook given the result, e.g. to cache it
+
+    Yields:
+        Encoded server-sent events; errors end the stream with ``error``
+    """
+    try:
+        async for delta in stream:
+            yield format_sse("token", {"text": delta})
+        result = build_result(stream.response)
+        if on_result:
+            await on_result(result)
+    except Exception as e:
+        logger.error(f"Streaming completion failed: {e}")
+        yield format_sse("error", {"detail": str(e)})
+        return
+    yield format_sse("result", result)
+
+
+def event_stream_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap encoded events in a ``text/event-stream`` response."""
+    return StreamingResponse(
+        events, media_type="text/event-stream", headers=SSE_HEADERS
+    )
@@ -0,0 +1,133 @@
+"""Token counting for AI model prompts."""
+
+import logging
+import math
+import threading
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional
+
+from application.src.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+TIKTOKEN_AVAILABLE = find_spec("tiktoken") is not None
+
+# Average characters per token for English text and code
+CHARS_PER_TOKEN = 4
+# Chat formatting overhead per message and for priming the reply
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+
+class TokenCounter:
+    """Counts tokens with per-model BPE encoders.
+
+    Encoders are loaded on first use and shared for the life of the
+    counter. Models tiktoken does not know, such as Claude or Mistral,
+    use the default encoding as a close approximation. Inputs longer
+    than the approximate threshold are counted by encoding a sample and
+    extrapolating, and without tiktoken every count is a heuristic.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        """Initialize the counter.
+
+        Args:
+            settings: Application settings, defaults loaded if omitted
+        """
+        self.settings = settings or Settings()
+        self._encoders: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def encoder_for(self, model: Optional[str] = None) -> Optional[Any]:
+        """Return the cached encoder for a model.
+
+        Args:
+            model: Model name, default encoding if omitted
+
+        Returns:
+            tiktoken encoding, or None when tiktoken is not installed
+        """
+        if not TIKTOKEN_AVAILABLE:
+            return None
+        key = model or self.settings.TOKEN_DEFAULT_ENCODING
+        encoder = self._encoders.get(key)
+        if encoder is None:
+            with self._lock:
+                encoder = self._encoders.get(key)
+                if encoder is None:
+                    encoder = self._load_encoder(model)
+                    self._encoders[key] = encoder
+        return encoder
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """Count the tokens in a piece of text.
+
+        Args:
+            text: Text to count
+            model: Model whose tokenizer to use
+
+        Returns:
+            Number of tokens, approximate for very large inputs
+        """
+        if not text:
+            return 0
+        encoder = self.encoder_for(model)
+        if encoder is None:
+            return math.ceil(len(text) / CHARS_PER_TOKEN)
+        if len(text) > self.settings.TOKEN_APPROX_THRESHOLD:
+            return self._approximate(text, encoder)
+        return len(encoder.encode(text, disallowed_special=()))
+
+    def count_messages(
+        self, messages: List[Dict[str, str]], model: Optional[str] = None
+    ) -> int:
+        """Count the prompt tokens of a chat request.
+
+        Args:
+            messages: Chat messages with 'role' and 'content'
+            model: Model whose tokenizer to use
+
+        Returns:
+            Number of prompt tokens including formatting overhead
+        """
+        total = TOKENS_PER_REPLY
+        for message in messages:
+            total += TOKENS_PER_MESSAGE
+            total += self.count(message.get("content") or "", model)
+        return total
+
+    def _approximate(self, text: str, encoder: Any) -> int:
+        """Extrapolate a token count from an evenly spread sample."""
+        sample_size = self.settings.TOKEN_APPROX_SAMPLE
+        chunk = max(sample_size // 4, 1)
+        step = math.ceil(len(text) / 4)
+        pieces = []
+        for start in range(0, len(text), step):
+            end = start + chunk
+            pieces.append(text[start:end])
+        sample = "".join(pieces)
+        tokens = len(encoder.encode(sample, disallowed_special=()))
+        return math.ceil(tokens * len(text) / len(sample))
+
+    def _load_encoder(self, model: Optional[str]) -> Any:
+        """Load the tiktoken encoding for a model."""
+        import tiktoken
+
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                logger.debug(f"No tokenizer for {model}, using default")
+        return tiktoken.get_encoding(self.settings.TOKEN_DEFAULT_ENCODING)
+
+
+_token_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Return the process-wide token counter, creating it on first use."""
+    global _token_counter
+    if _token_counter is None:
+        _token_counter = TokenCounter()
+    return _token_counter
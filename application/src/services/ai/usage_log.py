@@ -0,0 +1,228 @@
+"""Write-behind persistence of AI interaction logs."""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.engine import Engine
+
+from application.src.core.config import Settings
+from application.src.models.database import AILog
+from application.src.services.ai.blob_store import BlobStore, get_blob_store
+from application.src.services.usage.rollups import apply_rollups
+
+logger = logging.getLogger(__name__)
+
+
+class AILogWriter:
+    """Buffers ``AILog`` rows and inserts them in batches.
+
+    ``record`` only queues a row, so completions do not wait on the
+    database. A background task writes the queue with one bulk INSERT
+    per ``batch_size`` rows, or every ``flush_interval`` seconds,
+    whichever comes first. When the database falls behind and the queue
+    is full, ``record`` waits up to ``put_timeout`` for room and then
+    drops the row, slowing producers without failing their requests.
+
+    Each batch also updates the hourly usage rollups in the same
+    transaction, so they never disagree with the log. Prompts and
+    responses longer than ``blob_threshold`` bytes are moved to the blob
+    store and referenced by hash, keeping the table's rows small.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_pending: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        put_timeout: float = 0.5,
+        pricing: Optional[Dict[str, Dict[str, float]]] = None,
+        blob_store: Optional[BlobStore] = None,
+        blob_threshold: int = 4096,
+    ):
+        """Initialize the writer.
+
+        Args:
+            engine: Database the rows are written to
+            max_pending: Rows queued before ``record`` waits
+            batch_size: Most rows per INSERT
+            flush_interval: Longest a queued row waits to be written
+            put_timeout: Longest ``record`` waits for room
+            pricing: USD per 1K prompt and completion tokens by model,
+                for the rollups
+            blob_store: Where large bodies go; kept inline if omitted
+            blob_threshold: Bytes above which a body is offloaded
+        """
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.pricing = pricing or {}
+        self.blob_store = blob_store
+        self.blob_threshold = blob_threshold
+        self.dropped = 0
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(
+            max_pending
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start writing in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Write every queued row, then stop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while not self._queue.empty():
+            await self._flush(self._take(self.batch_size))
+
+    async def record(self, **fields: Any) -> bool:
+        """Queue one ``AILog`` row.
+
+        Args:
+            fields: Column values; ``created_at`` defaults to now
+
+        Returns:
+            False if the row was dropped because the queue stayed full
+        """
+        fields.setdefault("created_at", datetime.utcnow())
+        try:
+            self._queue.put_nowait(fields)
+            return True
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self._queue.put(fields), self.put_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            logger.warning(
+                f"AI log queue full, dropped a row ({self.dropped} so far)"
+            )
+            return False
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        """Dequeue up to ``limit`` rows without waiting."""
+        rows = []
+        while len(rows) < limit and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        rows: List[Dict[str, Any]] = []
+        try:
+            while True:
+                rows.append(await self._queue.get())
+                deadline = loop.time() + self.flush_interval
+                while len(rows) < self.batch_size:
+                    rows.extend(self._take(self.batch_size - len(rows)))
+                    remaining = deadline - loop.time()
+                    if len(rows) >= self.batch_size or remaining <= 0:
+                        break
+                    try:
+                        rows.append(
+                            await asyncio.wait_for(
+                                self._queue.get(), remaining
+                            )
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                batch, rows = rows, []
+                await self._flush(batch)
+        except asyncio.CancelledError:
+            # Rows already taken off the queue are written on the way out
+            await self._flush(rows)
+            raise
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows off the event loop; failed batches are dropped."""
+        if not rows:
+            return
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(self._insert, rows)
+        except Exception as e:
+            self.dropped += len(rows)
+            logger.error(f"Could not write {len(rows)} AI log rows: {e}")
+            return
+        logger.debug(
+            f"Wrote {len(rows)} AI log rows in "
+            f"{time.monotonic() - started:.3f}s"
+        )
+
+    def _offload(self, rows: List[Dict[str, Any]]) -> None:
+        """Move large bodies to the blob store, in place."""
+        for row in rows:
+            for field in ("prompt", "response"):
+                # executemany needs the same columns in every row
+                row.setdefault(f"{field}_blob", None)
+                body = row.get(field)
+                if self.blob_store is None or not body:
+                    continue
+                if len(body.encode("utf-8")) <= self.blob_threshold:
+                    continue
+                try:
+                    row[f"{field}_blob"] = self.blob_store.put(body)
+                except OSError as e:
+                    logger.warning(f"Keeping AI log {field} inline: {e}")
+                    continue
+                row[field] = None
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        self._offload(rows)
+        # executemany; batched into multi-row INSERTs by SQLAlchemy
+        with self.engine.begin() as connection:
+            connection.execute(AILog.__table__.insert(), rows)
+            apply_rollups(connection, rows, self.pricing)
+
+
+_ai_log_writer: Optional[AILogWriter] = None
+
+
+def get_ai_log_writer() -> Optional[AILogWriter]:
+    """Return the running process-wide writer, if any."""
+    return _ai_log_writer
+
+
+def start_ai_log_writer(engine: Engine) -> Optional[AILogWriter]:
+    """Start the process-wide writer unless AI logging is disabled."""
+    global _ai_log_writer
+    settings = Settings()
+    if not settings.AI_LOG_ENABLED:
+        return None
+    if _ai_log_writer is None:
+        _ai_log_writer = AILogWriter(
+            engine,
+            max_pending=settings.AI_LOG_MAX_PENDING,
+            batch_size=settings.AI_LOG_BATCH_SIZE,
+            flush_interval=settings.AI_LOG_FLUSH_INTERVAL,
+            put_timeout=settings.AI_LOG_PUT_TIMEOUT,
+            pricing=settings.MODEL_PRICING,
+            blob_store=get_blob_store(),
+            blob_threshold=settings.AI_LOG_BLOB_THRESHOLD,
+        )
+    _ai_log_writer.start()
+    return _ai_log_writer
+
+
+async def stop_ai_log_writer() -> None:
+    """Drain and stop the process-wide writer."""
+    global _ai_log_writer
+    if _ai_log_writer is not None:
+        await _ai_log_writer.close()
+        _ai_log_writer = None
@@ -9,6 +9,7 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
 from ..models.database import User
+from .ai.scheduler import current_tenant
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -67,4 +68,6 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
 
     if user is None:
         raise credentials_exception
+    # Provider calls made for this request are shared fairly per user
+    current_tenant.set(f"user:{user.id}")
     return user
@@ -0,0 +1,23 @@
+from .codecs import Codec, CodecError, get_codec
+from .generation_cache import GenerationCache, LRUCache
+from .keys import canonical_json, canonical_key
+from .redis_pool import close_redis, get_redis
+from .semantic_cache import SemanticCache, SemanticHit, get_semantic_cache
+from .single_flight import SingleFlight, get_single_flight
+
+__all__ = [
+    "Codec",
+    "CodecError",
+    "GenerationCache",
+    "LRUCache",
+    "SemanticCache",
+    "SemanticHit",
+    "SingleFlight",
+    "canonical_json",
+    "canonical_key",
+    "close_redis",
+    "get_codec",
+    "get_redis",
+    "get_semantic_cache",
+    "get_single_flight",
+]
@@ -0,0 +1,239 @@
+"""Compact serialization for cached generation results."""
+
+import json
+import logging
+import zlib
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional, Tuple
+
+from application.src.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+ORJSON_AVAILABLE = find_spec("orjson") is not None
+MSGPACK_AVAILABLE = find_spec("msgpack") is not None
+ZSTD_AVAILABLE = find_spec("zstandard") is not None
+
+# 0xC1 is unused in msgpack and invalid in UTF-8, so it never starts a
+# legacy plain-JSON entry
+MAGIC = b"\xc1"
+FORMAT_VERSION = 1
+HEADER_SIZE = 4
+
+SERIALIZERS = {"json": 0, "orjson": 1, "msgpack": 2}
+COMPRESSORS = {"none": 0, "zlib": 1, "zstd": 2}
+
+
+class CodecError(Exception):
+    """Raised when a cached payload cannot be decoded."""
+
+
+class Codec:
+    """Encodes cache values as a versioned header plus compressed body.
+
+    The four-byte header records the format version, serializer and
+    compressor, so entries written with other settings, and legacy
+    plain-JSON entries, remain readable. Serializers and compressors
+    whose packages are not installed fall back to ``json`` and ``zlib``.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "orjson",
+        compression: str = "zstd",
+        level: int = 3,
+        min_size: int = 512,
+        dictionary: Optional[bytes] = None,
+    ):
+        """Initialize the codec.
+
+        Args:
+            serializer: 'json', 'orjson' or 'msgpack'
+            compression: 'none', 'zlib' or 'zstd'
+            level: Compression level
+            min_size: Smallest serialized size worth compressing
+            dictionary: Trained zstd dictionary for small similar entries
+        """
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unsupported serializer: {serializer}")
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if not _serializer_available(serializer):
+            logger.warning(f"{serializer} not installed, using json")
+            serializer = "json"
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed, using zlib")
+            compression = "zlib"
+
+        self.serializer = serializer
+        self.compression = compression
+        self.level = level
+        self.min_size = min_size
+        self.dictionary = dictionary
+        self._zstd: Optional[Tuple[Any, Any]] = None
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize and, above the size threshold, compress a value.
+
+        Args:
+            value: Result to store
+
+        Returns:
+            Header followed by the encoded body
+        """
+        body = _dumps(self.serializer, value)
+        compression = self.compression
+        if len(body) < self.min_size:
+            compression = "none"
+        elif compression == "zstd":
+            body = self._zstd_codec()[0].compress(body)
+        elif compression == "zlib":
+            body = zlib.compress(body, self.level)
+        header = MAGIC + bytes(
+            [
+                FORMAT_VERSION,
+                SERIALIZERS[self.serializer],
+                COMPRESSORS[compression],
+            ]
+        )
+        return header + body
+
+    def decode(self, payload: Any) -> Any:
+        """Decode a payload written by any codec version.
+
+        Args:
+            payload: Stored bytes or legacy JSON text
+
+        Returns:
+            The original value
+
+        Raises:
+            CodecError: If the payload is corrupt or needs a missing
+                package
+        """
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        if not payload.startswith(MAGIC):
+            try:
+                return json.loads(payload)
+            except ValueError as e:
+                raise CodecError(f"Invalid legacy entry: {e}") from e
+        if len(payload) < HEADER_SIZE or payload[1] != FORMAT_VERSION:
+            raise CodecError("Unsupported cache entry format")
+
+        serializer = _name_for(SERIALIZERS, payload[2])
+        compression = _name_for(COMPRESSORS, payload[3])
+        body = payload[HEADER_SIZE:]
+        try:
+            if compression == "zstd":
+                if not ZSTD_AVAILABLE:
+                    raise CodecError("zstandard is required to read entry")
+                body = self._zstd_codec()[1].decompress(body)
+            elif compression == "zlib":
+                body = zlib.decompress(body)
+            return _loads(serializer, body)
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Corrupt cache entry: {e}") from e
+
+    def _zstd_codec(self) -> Tuple[Any, Any]:
+        """Return the zstd compressor and decompressor, built on first use."""
+        if self._zstd is None:
+            import zstandard
+
+            kwargs = {}
+            if self.dictionary:
+                kwargs["dict_data"] = zstandard.ZstdCompressionDict(
+                    self.dictionary
+                )
+            self._zstd = (
+                zstandard.ZstdCompressor(level=self.level, **kwargs),
+                zstandard.ZstdDecompressor(**kwargs),
+            )
+        return self._zstd
+
+
+def train_dictionary(values: List[Any], size: int = 112640) -> bytes:
+    """Train a zstd dictionary from sample cache values.
+
+    Args:
+        values: Representative results, serialized the way the cache does
+        size: Dictionary size in bytes
+
+    Returns:
+        Dictionary bytes for CACHE_ZSTD_DICTIONARY_PATH
+    """
+    import zstandard
+
+    serializer = "orjson" if ORJSON_AVAILABLE else "json"
+    samples = [_dumps(serializer, value) for value in values]
+    return zstandard.train_dictionary(size, samples).as_bytes()
+
+
+def _serializer_available(name: str) -> bool:
+    """Whether a serializer's package is installed."""
+    if name == "orjson":
+        return ORJSON_AVAILABLE
+    if name == "msgpack":
+        return MSGPACK_AVAILABLE
+    return True
+
+
+def _name_for(table: Dict[str, int], code: int) -> str:
+    """Reverse-look up a header code."""
+    for name, value in table.items():
+        if value == code:
+            return name
+    raise CodecError(f"Unknown header code: {code}")
+
+
+def _dumps(serializer: str, value: Any) -> bytes:
+    """Serialize with the named serializer."""
+    if serializer == "orjson":
+        import orjson
+
+        return orjson.dumps(value)
+    if serializer == "msgpack":
+        import msgpack
+
+        return msgpack.packb(value, use_bin_type=True)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(serializer: str, body: bytes) -> Any:
+    """Deserialize with the named serializer."""
+    if serializer == "msgpack":
+        if not MSGPACK_AVAILABLE:
+            raise CodecError("msgpack is required to read entry")
+        import msgpack
+
+        return msgpack.unpackb(body, raw=False)
+    if serializer == "orjson" and ORJSON_AVAILABLE:
+        import orjson
+
+        return orjson.loads(body)
+    # orjson output is plain JSON, so json can read it when missing
+    return json.loads(body)
+
+
+_codec: Optional[Codec] = None
+
+
+def get_codec() -> Codec:
+    """Return the process-wide cache codec built from settings."""
+    global _codec
+    if _codec is None:
+        settings = Settings()
+        dictionary = None
+        if settings.CACHE_ZSTD_DICTIONARY_PATH:
+            with open(settings.CACHE_ZSTD_DICTIONARY_PATH, "rb") as f:
+                dictionary = f.read()
+        _codec = Codec(
+            serializer=settings.CACHE_SERIALIZER,
+            compression=settings.CACHE_COMPRESSION,
+            level=settings.CACHE_COMPRESSION_LEVEL,
+            min_size=settings.CACHE_COMPRESSION_MIN_SIZE,
+            dictionary=dictionary,
+        )
+    return _codec
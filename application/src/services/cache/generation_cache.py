@@ -0,0 +1,435 @@
+"""Two-tier cache for AI generation results."""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from redis.exceptions import RedisError
+
+from application.src.core.metrics import count_cache
+from application.src.services.cache.codecs import (
+    Codec,
+    CodecError,
+    get_codec,
+)
+from application.src.services.cache.keys import canonical_key
+from application.src.services.cache.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Bounded in-process cache with per-entry expiry."""
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_size: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays valid
+            clock: Monotonic time source
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live entry and mark it recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store an entry, evicting the least recently used if full."""
+        ttl = self.ttl if ttl is None else ttl
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        self._entries.pop(key, None)
+
+
+@dataclass
+class CacheEntry:
+    """A cached result with what is needed to refresh it early."""
+
+    value: Dict[str, Any]
+    # Seconds the result took to compute
+    delta: float
+    # Wall-clock time after which the result is stale
+    refresh_at: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "value": self.value,
+            "delta": self.delta,
+            "refresh_at": self.refresh_at,
+        }
+
+    @classmethod
+    def from_stored(cls, stored: Any) -> "CacheEntry":
+        """Build an entry from Redis, treating bare results as fresh."""
+        if isinstance(stored, dict) and stored.keys() == {
+            "value",
+            "delta",
+            "refresh_at",
+        }:
+            return cls(**stored)
+        return cls(stored, 0.0, math.inf)
+
+
+class GenerationCache:
+    """Generation results cached in-process and shared through Redis.
+
+    Keys are SHA-256 digests of the canonical JSON of every request
+    input, the model and the prompt template version, so they are equal
+    across workers and change whenever a prompt template does. Hot keys
+    are served from the in-process LRU without a Redis round trip.
+
+    To keep popular entries from expiring together, TTLs are jittered
+    and ``get_or_compute`` refreshes entries early with probability
+    rising towards expiry (XFetch), weighted by how long the result took
+    to compute. Entries stay in Redis for ``stale_ttl`` seconds past
+    expiry and are served stale while one background task recomputes
+    them.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        namespace: str,
+        ttl: int = 3600,
+        template_version: str = "1",
+        local_size: int = 1024,
+        local_ttl: float = 300.0,
+        codec: Optional[Codec] = None,
+        ttl_jitter: float = 0.0,
+        stale_ttl: int = 0,
+        early_refresh_beta: float = 1.0,
+        single_flight: Optional[SingleFlight] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the cache.
+
+        Args:
+            redis_client: ``redis.asyncio`` client holding shared entries
+            namespace: Key prefix, e.g. 'code_gen'
+            ttl: Seconds entries are kept in Redis
+            template_version: Prompt template version included in keys
+            local_size: In-process LRU capacity
+            local_ttl: Seconds entries are kept in-process
+            codec: Redis value codec, the configured one if omitted
+            ttl_jitter: Fraction by which each entry's TTL is randomized
+            stale_ttl: Seconds an expired entry may still be served while
+                it is recomputed
+            early_refresh_beta: XFetch weight, 0 disables early refresh
+            single_flight: Group joining concurrent recomputations
+            clock: Wall-clock time source shared across processes
+        """
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.template_version = template_version
+        self.local = LRUCache(local_size, min(local_ttl, ttl))
+        self.codec = codec or get_codec()
+        self.ttl_jitter = ttl_jitter
+        self.stale_ttl = stale_ttl
+        self.early_refresh_beta = early_refresh_beta
+        self.single_flight = single_flight
+        self._clock = clock
+        self._refreshes: Dict[str, asyncio.Task] = {}
+
+    def key(self, *inputs: Any, model: Optional[str] = None) -> str:
+        """Build the cache key for a request.
+
+        Args:
+            inputs: Every input that shapes the prompt
+            model: Model the request is routed to
+
+        Returns:
+            Content-addressed key
+        """
+        prefix = f"{self.namespace}:v{self.template_version}"
+        return canonical_key(prefix, model, *inputs)
+
+    async def get(
+        self,
+        key: str,
+        refresh: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Look a result up locally, then in Redis.
+
+        Args:
+            key: Key from ``key()``
+            refresh: Recomputes the result; when given, stale and nearly
+                expired entries are returned while it runs in the
+                background
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        entry = await self._read(key)
+        now = self._clock()
+        if entry is None or (refresh is None and now >= entry.refresh_at):
+            count_cache("generation", "miss")
+            return None
+        count_cache("generation", "hit" if now < entry.refresh_at else "stale")
+        if refresh is not None and self._should_refresh(entry, now):
+            self._revalidate(key, refresh)
+        return entry.value
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return the cached result, computing and storing it on a miss.
+
+        Args:
+            key: Key from ``key()``
+            compute: Produces the result
+
+        Returns:
+            Cached or freshly computed result
+        """
+        value = await self.get(key, refresh=compute)
+        if value is not None:
+            return value
+        return await self._load(key, compute, recheck=True)
+
+    async def get_or_compute_many(
+        self,
+        requests: Sequence[
+            Tuple[str, Callable[[], Awaitable[Dict[str, Any]]]]
+        ],
+        concurrency: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """Resolve several requests, computing misses with bounded fan-out.
+
+        Duplicate keys are resolved once, hits are fetched with one
+        pipelined round trip, and at most ``concurrency`` misses are
+        computed at a time. A failed request yields an error result
+        rather than failing the others.
+
+        Args:
+            requests: (key, compute) pairs
+            concurrency: Most misses computed at once
+
+        Returns:
+            Each request's result in order, ``{"status": "error", ...}``
+            for failures
+        """
+        computes = dict(requests)
+        results: Dict[str, Any] = await self.get_many(list(computes))
+        missing = [key for key, value in results.items() if value is None]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load(key: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._load(key, computes[key], recheck=False)
+
+        loaded = await asyncio.gather(
+            *[load(key) for key in missing], return_exceptions=True
+        )
+        for key, value in zip(missing, loaded):
+            if isinstance(value, Exception):
+                logger.warning(f"Batch item {key} failed: {value}")
+                # HTTPException carries its message in detail
+                detail = getattr(value, "detail", None) or str(value)
+                value = {"status": "error", "error": detail}
+            results[key] = value
+        return [results[key] for key, _ in requests]
+
+    async def set(
+        self, key: str, value: Dict[str, Any], delta: float = 0.0
+    ) -> None:
+        """Store a result in both tiers.
+
+        Args:
+            key: Key from ``key()``
+            value: JSON-serializable result
+            delta: Seconds the result took to compute
+        """
+        entry, ttl = self._entry(value, delta)
+        self.local.set(key, entry)
+        try:
+            await self.redis_client.setex(
+                key, ttl, self.codec.encode(entry.to_dict())
+            )
+        except RedisError as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+
+    async def get_many(
+        self, keys: List[str]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Look several results up with at most one Redis round trip.
+
+        Args:
+            keys: Keys from ``key()``
+
+        Returns:
+            Mapping of every key to its result, or None on a miss
+        """
+        entries = {key: self.local.get(key) for key in keys}
+        missing = [key for key, entry in entries.items() if entry is None]
+        if missing:
+            try:
+                async with self.redis_client.pipeline(
+                    transaction=False
+                ) as pipe:
+                    for key in missing:
+                        pipe.get(key)
+                    payloads = await pipe.execute()
+            except RedisError as e:
+                logger.warning(f"Cache bulk read failed: {e}")
+                payloads = []
+            for key, payload in zip(missing, payloads):
+                if payload:
+                    entries[key] = self._decode(key, payload)
+                    if entries[key] is not None:
+                        self.local.set(key, entries[key])
+        now = self._clock()
+        results = {
+            key: entry.value if entry and now < entry.refresh_at else None
+            for key, entry in entries.items()
+        }
+        misses = sum(value is None for value in results.values())
+        count_cache("generation", "hit", len(results) - misses)
+        count_cache("generation", "miss", misses)
+        return results
+
+    async def set_many(self, values: Dict[str, Dict[str, Any]]) -> None:
+        """Store several results with one Redis round trip.
+
+        Args:
+            values: Mapping of key to JSON-serializable result
+        """
+        if not values:
+            return
+        writes = {}
+        for key, value in values.items():
+            writes[key] = self._entry(value, 0.0)
+            self.local.set(key, writes[key][0])
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, (entry, ttl) in writes.items():
+                    pipe.setex(key, ttl, self.codec.encode(entry.to_dict()))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Cache bulk write failed: {e}")
+
+    def _entry(
+        self, value: Dict[str, Any], delta: float
+    ) -> Tuple[CacheEntry, int]:
+        """Wrap a result with a jittered expiry; return it and its TTL."""
+        fresh_for = self.ttl * (
+            1 + random.uniform(-self.ttl_jitter, self.ttl_jitter)
+        )
+        entry = CacheEntry(value, delta, self._clock() + fresh_for)
+        return entry, max(1, int(fresh_for + self.stale_ttl))
+
+    async def _read(self, key: str) -> Optional[CacheEntry]:
+        """Fetch an entry, stale or not, from either tier."""
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry
+        try:
+            payload = await self.redis_client.get(key)
+        except RedisError as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+            return None
+        if not payload:
+            return None
+        entry = self._decode(key, payload)
+        if entry is not None:
+            self.local.set(key, entry)
+        return entry
+
+    def _decode(self, key: str, payload: bytes) -> Optional[CacheEntry]:
+        """Decode a Redis entry, treating unreadable ones as misses."""
+        try:
+            return CacheEntry.from_stored(self.codec.decode(payload))
+        except (CodecError, TypeError) as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            return None
+
+    def _should_refresh(self, entry: CacheEntry, now: float) -> bool:
+        """XFetch: refresh early with probability rising towards expiry."""
+        # 1 - random() lies in (0, 1], so the log is finite
+        gap = -entry.delta * self.early_refresh_beta
+        gap *= math.log(1.0 - random.random())
+        return now + gap >= entry.refresh_at
+
+    def _revalidate(
+        self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> None:
+        """Start one background recomputation of a key."""
+        if key in self._refreshes:
+            return
+        if self.single_flight and self.single_flight.in_flight(key):
+            return
+        task = asyncio.ensure_future(self._refresh(key, compute))
+        self._refreshes[key] = task
+        task.add_done_callback(lambda _: self._refreshes.pop(key, None))
+
+    async def _refresh(
+        self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> None:
+        """Recompute a key, keeping the stale entry if that fails."""
+        try:
+            await self._load(key, compute, recheck=False)
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {key}: {e}")
+
+    async def _load(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        recheck: bool,
+    ) -> Dict[str, Any]:
+        """Compute and store a result, once for concurrent callers."""
+
+        async def load() -> Dict[str, Any]:
+            if recheck:
+                # Another caller may have filled the key meanwhile
+                entry = await self._read(key)
+                if entry is not None and self._clock() < entry.refresh_at:
+                    return entry.value
+            started = time.monotonic()
+            value = await compute()
+            await self.set(key, value, delta=time.monotonic() - started)
+            return value
+
+        if self.single_flight is None:
+            return await load()
+        return await self.single_flight.do(key, load)
@@ -0,0 +1,43 @@
+"""Canonical cache and coalescing keys."""
+
+import hashlib
+import json
+from typing import Any
+
+
+def canonical_json(value: Any) -> str:
+    """Serialize a value to JSON that is identical for equal inputs.
+
+    Object keys are sorted and whitespace is removed so that logically
+    equal requests produce the same bytes regardless of key order.
+
+    Args:
+        value: JSON-compatible value; other objects are stringified
+
+    Returns:
+        Canonical JSON text
+    """
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+def canonical_key(namespace: str, *parts: Any) -> str:
+    """Build a stable key from a namespace and request inputs.
+
+    Unlike ``hash()``, the digest is the same in every process, so keys
+    can be shared through Redis.
+
+    Args:
+        namespace: Key prefix, e.g. 'code_gen'
+        parts: Inputs that identify the request
+
+    Returns:
+        Key of the form ``<namespace>:<sha256 hex digest>``
+    """
+    digest = hashlib.sha256(canonical_json(parts).encode("utf-8"))
+    return f"{namespace}:{digest.hexdigest()}"
@@ -0,0 +1,43 @@
+"""Shared asyncio Redis connection pool."""
+
+import os
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from application.src.core.config import Settings
+
+_redis: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the process-wide Redis client, creating it on first use.
+
+    All services share one blocking connection pool. Callers wait up to
+    REDIS_POOL_TIMEOUT for a free connection rather than opening more
+    than REDIS_MAX_CONNECTIONS. Idle connections are health-checked
+    before reuse.
+    """
+    global _redis
+    if _redis is None:
+        settings = Settings()
+        pool = aioredis.BlockingConnectionPool.from_url(
+            os.getenv("REDIS_URL", "redis://redis:6379/0"),
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_keepalive=True,
+        )
+        _redis = aioredis.Redis(connection_pool=pool)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client and its connections."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        await _redis.connection_pool.disconnect()
+        _redis = None
@@ -0,0 +1,210 @@
+"""Embedding-similarity cache for near-duplicate generation requests."""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from application.src.core.config import Settings
+from application.src.core.metrics import count_cache
+from application.src.services.ai.scheduler import current_tenant
+from application.src.services.cache.keys import canonical_json, canonical_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SemanticHit:
+    """A stored result for a similar request."""
+
+    value: Dict[str, Any]
+    score: float
+
+
+class VectorIndex:
+    """Fixed-capacity cosine index over unit vectors.
+
+    Vectors are kept in one preallocated matrix so a search is a single
+    matrix-vector product. When full, the oldest entry is overwritten.
+    """
+
+    def __init__(self, capacity: int, clock: Callable[[], float]):
+        """Initialize the index.
+
+        Args:
+            capacity: Entries kept before the oldest is replaced
+            clock: Wall-clock time source for expiry
+        """
+        self.capacity = capacity
+        self._clock = clock
+        self._vectors: Optional[np.ndarray] = None
+        self._expires_at = np.zeros(capacity)
+        self._values: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._ids: Dict[str, int] = {}
+        self._slot_ids: List[Optional[str]] = [None] * capacity
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        entry_id: str,
+        vector: np.ndarray,
+        value: Dict[str, Any],
+        ttl: float,
+    ) -> None:
+        """Store a vector, replacing any entry with the same id."""
+        if self._vectors is None:
+            self._vectors = np.zeros(
+                (self.capacity, vector.shape[0]), dtype=np.float32
+            )
+        slot = self._ids.get(entry_id)
+        if slot is None:
+            slot = self._next
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            old_id = self._slot_ids[slot]
+            if old_id is not None:
+                del self._ids[old_id]
+            self._ids[entry_id] = slot
+            self._slot_ids[slot] = entry_id
+        self._vectors[slot] = vector
+        self._values[slot] = value
+        self._expires_at[slot] = self._clock() + ttl
+
+    def search(
+        self, vector: np.ndarray, exclude: Optional[str] = None
+    ) -> Optional[SemanticHit]:
+        """Return the most similar live entry.
+
+        Args:
+            vector: Unit query vector
+            exclude: Entry id to skip
+
+        Returns:
+            Best match, or None if the index has no live entries
+        """
+        if self._vectors is None or self._size == 0:
+            return None
+        scores = self._vectors[: self._size] @ vector
+        scores[self._expires_at[: self._size] <= self._clock()] = -np.inf
+        slot = self._ids.get(exclude)
+        if slot is not None:
+            scores[slot] = -np.inf
+        best = int(np.argmax(scores))
+        if scores[best] == -np.inf:
+            return None
+        return SemanticHit(self._values[best], float(scores[best]))
+
+
+class SemanticCache:
+    """Serves results of earlier requests whose embeddings are close.
+
+    Requests are embedded from their canonical JSON and searched within a
+    scope, e.g. one language and model, of the calling tenant, so results
+    never cross scopes or reach another user.
+    Identical requests are left to the exact generation cache; only
+    near-duplicates at or above the cosine threshold are answered here,
+    with the score reported as ``semantic_similarity``.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Awaitable[List[float]]],
+        threshold: float = 0.95,
+        max_entries: int = 2048,
+        ttl: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the cache.
+
+        Args:
+            embed: Returns the embedding of a text
+            threshold: Lowest cosine similarity served from the cache
+            max_entries: Entries kept per scope
+            ttl: Seconds an entry may be served
+            clock: Wall-clock time source
+        """
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._indexes: Dict[str, VectorIndex] = {}
+
+    async def get_or_compute(
+        self,
+        scope: str,
+        request: Any,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Return a similar request's result, or compute and index one.
+
+        Args:
+            scope: Partition searched, e.g. 'code_gen:python:gpt-4';
+                kept apart per ``current_tenant``
+            request: Inputs that shape the prompt
+            compute: Produces the result on a miss
+
+        Returns:
+            The result, with ``semantic_similarity`` set on a hit
+        """
+        text = canonical_json(request)
+        entry_id = canonical_key("semantic", text)
+        try:
+            vector = self._normalize(await self.embed(text))
+        except Exception as e:
+            logger.warning(f"Embedding failed, skipping semantic cache: {e}")
+            return await compute()
+
+        scope = f"{current_tenant.get()}:{scope}"
+        index = self._indexes.get(scope)
+        hit = index.search(vector, exclude=entry_id) if index else None
+        if hit is not None and hit.score >= self.threshold:
+            count_cache("semantic", "hit")
+            return {**hit.value, "semantic_similarity": round(hit.score, 4)}
+
+        count_cache("semantic", "miss")
+        value = await compute()
+        if index is None:
+            index = self._indexes[scope] = VectorIndex(
+                self.max_entries, self._clock
+            )
+        index.add(entry_id, vector, value, self.ttl)
+        return value
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Scale an embedding to unit length for cosine search."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Return the process-wide semantic cache, or None when disabled."""
+    global _semantic_cache
+    settings = Settings()
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    if _semantic_cache is None:
+        from langchain.embeddings import OpenAIEmbeddings
+
+        embeddings = OpenAIEmbeddings(
+            openai_api_key=os.getenv("OPENAI_API_KEY")
+        )
+        _semantic_cache = SemanticCache(
+            embeddings.aembed_query,
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+            ttl=settings.SEMANTIC_CACHE_TTL,
+        )
+    return _semantic_cache
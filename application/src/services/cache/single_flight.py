@@ -0,0 +1,207 @@
+"""Single-flight coalescing of identical concurrent requests."""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from application.src.core.config import Settings
+from application.src.services.cache.redis_pool import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Delete the lock only if this caller still owns it
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_MISSING = object()
+
+
+class SingleFlight:
+    """Joins concurrent calls with the same key onto one execution.
+
+    Within a process, callers that arrive while a key is in flight await
+    the same task. With a Redis client, the first process to take the
+    key's lock runs the call and publishes its result. Other processes
+    subscribe and reuse that result. If the leader fails or its lock
+    expires, they fall back to running the call themselves. Results
+    shared across processes must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        lock_ttl: float = 120.0,
+        wait_timeout: float = 120.0,
+        poll_interval: float = 1.0,
+        prefix: str = "singleflight",
+    ):
+        """Initialize the coalescer.
+
+        Args:
+            redis_client: ``redis.asyncio`` client, in-process only if
+                omitted
+            lock_ttl: Seconds before an abandoned leader lock expires
+            wait_timeout: Longest a follower waits for another process
+            poll_interval: Seconds between checks that the leader is alive
+            prefix: Redis key prefix
+        """
+        self.redis_client = redis_client
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._release = (
+            redis_client.register_script(RELEASE_SCRIPT)
+            if redis_client is not None
+            else None
+        )
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Canonical request key
+            fn: Coroutine factory producing the result
+
+        Returns:
+            The shared result
+
+        Raises:
+            Exception: Whatever ``fn`` raised, for every joined caller
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(key, fn))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        # Shield so one cancelled caller does not cancel the others
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for the key is running in this process."""
+        return key in self._inflight
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished call."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the error retrieved when every caller has gone away
+            task.exception()
+
+    async def _execute(self, key: str, fn: Callable[[], Awaitable[Any]]):
+        """Run the call, coordinating with other processes when possible."""
+        if self.redis_client is None:
+            return await fn()
+
+        lock_key = f"{self.prefix}:lock:{key}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        token = uuid.uuid4().hex
+        while True:
+            try:
+                acquired = await self.redis_client.set(
+                    lock_key, token, nx=True, px=int(self.lock_ttl * 1000)
+                )
+            except RedisError as e:
+                logger.warning(f"Single-flight lock unavailable: {e}")
+                return await fn()
+
+            if acquired:
+                return await self._lead(key, lock_key, token, fn)
+
+            result = await self._follow(key, lock_key, deadline)
+            if result is not _MISSING:
+                return result
+            if loop.time() >= deadline:
+                logger.warning(f"Gave up waiting for leader of {key}")
+                return await fn()
+
+    async def _lead(
+        self,
+        key: str,
+        lock_key: str,
+        token: str,
+        fn: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Run the call and notify waiting processes of the outcome."""
+        message = {"ok": False}
+        try:
+            result = await fn()
+            message = {"ok": True, "result": result}
+            return result
+        finally:
+            try:
+                payload = json.dumps(message)
+                if message["ok"]:
+                    # Keep it briefly for followers still subscribing
+                    await self.redis_client.set(
+                        f"{self.prefix}:result:{key}", payload, px=5000
+                    )
+                await self.redis_client.publish(
+                    f"{self.prefix}:done:{key}", payload
+                )
+            except (RedisError, TypeError) as e:
+                logger.warning(f"Single-flight notify failed for {key}: {e}")
+            try:
+                await self._release(keys=[lock_key], args=[token])
+            except RedisError as e:
+                logger.warning(f"Single-flight unlock failed for {key}: {e}")
+
+    async def _follow(self, key: str, lock_key: str, deadline: float) -> Any:
+        """Wait for another process's result, or _MISSING if none came."""
+        loop = asyncio.get_running_loop()
+        pubsub = self.redis_client.pubsub()
+        try:
+            await pubsub.subscribe(f"{self.prefix}:done:{key}")
+            # The leader may have finished before we subscribed
+            payload = await self.redis_client.get(
+                f"{self.prefix}:result:{key}"
+            )
+            while payload is None and loop.time() < deadline:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=self.poll_interval,
+                )
+                if message is not None:
+                    payload = message["data"]
+                elif not await self.redis_client.exists(lock_key):
+                    break
+        except RedisError as e:
+            logger.warning(f"Single-flight wait failed for {key}: {e}")
+            return _MISSING
+        finally:
+            await pubsub.aclose()
+
+        if payload is None:
+            return _MISSING
+        message = json.loads(payload)
+        return message["result"] if message["ok"] else _MISSING
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight group."""
+    global _single_flight
+    if _single_flight is None:
+        settings = Settings()
+        redis_client = None
+        if settings.SINGLE_FLIGHT_BACKEND == "redis":
+            redis_client = get_redis()
+        _single_flight = SingleFlight(
+            redis_client,
+            lock_ttl=settings.SINGLE_FLIGHT_LOCK_TTL,
+            wait_timeout=settings.SINGLE_FLIGHT_WAIT_TIMEOUT,
+        )
+    return _single_flight
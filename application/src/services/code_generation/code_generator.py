@@ -1,45 +1,109 @@
 import json
 import os
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
 
-import openai
-import redis
 from fastapi import HTTPException
 
+from application.src.core.config import Settings
+from application.src.services.ai.batch import (
+    BatchRequest,
+    BulkItem,
+    generate_bulk,
+    get_batch_provider,
+)
+from application.src.services.ai.clients import LLMClientPool, get_client_pool
+from application.src.services.ai.model_selector import (
+    CompletionResponse,
+    ModelSelector,
+    get_model_selector,
+)
+from application.src.services.ai.streaming import (
+    completion_events,
+    format_sse,
+)
+from application.src.services.cache import (
+    GenerationCache,
+    get_redis,
+    get_semantic_cache,
+    get_single_flight,
+)
 
-class CodeGenerator:
-    def __init__(self):
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if not openai_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-
-        # Initialize Helicone configuration
-        helicone_key = os.getenv("HELICONE_API_KEY")
-        if not helicone_key:
-            raise ValueError(
-                "HELICONE_API_KEY environment variable is required"
-            )
+# Bump when a prompt template changes so cached results are not reused
+PROMPT_TEMPLATE_VERSION = "1"
 
-        # Configure OpenAI client with Helicone integration
-        self.openai_client = openai.OpenAI(
-            api_key=openai_key,
-            max_retries=3,
-            timeout=30.0,
-            default_headers={
-                "Helicone-Auth": f"Bearer {helicone_key}",
-                "Helicone-Cache-Enabled": "true",
-                "Helicone-Cache-TTL": "3600",
-                "Helicone-Retry-Enabled": "true",
-                "Helicone-Rate-Limit-Policy": "throttle",
-            },
-            base_url="https://api.helicone.ai/v1/openai",
-        )
-        self.redis_client = redis.Redis.from_url(
-            os.getenv("REDIS_URL", "redis://redis:6379/0")
+GENERATION_SYSTEM_PROMPT = (
+    "You are an expert software developer. Generate "
+    "high-quality, secure, and efficient code."
+)
+REVIEW_SYSTEM_PROMPT = (
+    "Expert code reviewer: analyze code for "
+    "quality, security, and performance."
+)
+OPTIMIZATION_SYSTEM_PROMPT = (
+    "Expert optimizer: improve code for better performance and efficiency."
+)
+
+
+class CodeGenerator:
+    def __init__(self, client_pool: Optional[LLMClientPool] = None):
+        # Share the process-wide async provider clients
+        self.client_pool = client_pool or get_client_pool()
+        self.openai_client = self.client_pool.get_client("openai")
+        self.model_selector = (
+            ModelSelector(Settings(), client_pool=client_pool)
+            if client_pool
+            else get_model_selector()
         )
+        self.redis_client = get_redis()
         # 1 hour default
         self.cache_ttl = int(os.getenv("CODE_GENERATION_CACHE_TTL", "3600"))
+        settings = Settings()
+        # Join identical concurrent requests onto one upstream call
+        self.single_flight = get_single_flight()
+        self.generation_cache = GenerationCache(
+            self.redis_client,
+            "code_gen",
+            ttl=self.cache_ttl,
+            template_version=PROMPT_TEMPLATE_VERSION,
+            local_size=settings.GENERATION_CACHE_LOCAL_SIZE,
+            local_ttl=settings.GENERATION_CACHE_LOCAL_TTL,
+            ttl_jitter=settings.GENERATION_CACHE_TTL_JITTER,
+            stale_ttl=settings.GENERATION_CACHE_STALE_TTL,
+            early_refresh_beta=settings.GENERATION_CACHE_EARLY_REFRESH_BETA,
+            single_flight=self.single_flight,
+        )
+        self.review_cache = GenerationCache(
+            self.redis_client,
+            "code_review",
+            ttl=self.cache_ttl,
+            template_version=PROMPT_TEMPLATE_VERSION,
+            local_size=settings.GENERATION_CACHE_LOCAL_SIZE,
+            local_ttl=settings.GENERATION_CACHE_LOCAL_TTL,
+            ttl_jitter=settings.GENERATION_CACHE_TTL_JITTER,
+            stale_ttl=settings.GENERATION_CACHE_STALE_TTL,
+            early_refresh_beta=settings.GENERATION_CACHE_EARLY_REFRESH_BETA,
+            single_flight=self.single_flight,
+        )
+        # Opt-in reuse of results for reworded requirements
+        self.semantic_cache = get_semantic_cache()
+        self.batch_concurrency = settings.BATCH_CONCURRENCY
+        # Offline bulk runs at batch pricing and rate limits
+        self.batch_provider = get_batch_provider(
+            self.model_selector, self.openai_client
+        )
+        self.batch_poll_interval = settings.BATCH_POLL_INTERVAL
+        self.batch_timeout = settings.BATCH_TIMEOUT
 
     async def generate_code(
         self,
@@ -50,49 +114,178 @@ class CodeGenerator:
         """
         Generate code based on requirements using GPT-4 Turbo
         """
-        cache_key = f"code_gen:{hash(json.dumps(requirements))}"
-        cached_result = self.redis_client.get(cache_key)
-        if cached_result:
-            return json.loads(cached_result)
+        model = self._model_for("code_generation")
+        cache_key = self.generation_cache.key(
+            requirements, language, context, model=model
+        )
+        return await self.generation_cache.get_or_compute(
+            cache_key,
+            self._with_semantic_cache(
+                f"code_gen:v{PROMPT_TEMPLATE_VERSION}:{model}:{language}",
+                [requirements, context],
+                lambda: self._generate_code(requirements, language, context),
+            ),
+        )
+
+    async def generate_code_bulk(
+        self, items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate code for many requirement sets through the batch API
 
+        Uncached items are submitted as one provider batch, which may take
+        hours, and the results are loaded into the generation cache.
+        Items are dicts with requirements, language and optional context.
+        """
+        model = self._model_for("code_generation")
+        bulk = [
+            BulkItem(
+                key=self.generation_cache.key(
+                    item["requirements"],
+                    item["language"],
+                    item.get("context"),
+                    model=model,
+                ),
+                request=BatchRequest(
+                    custom_id="",
+                    model=model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": GENERATION_SYSTEM_PROMPT,
+                        },
+                        {
+                            "role": "user",
+                            "content": self._create_code_generation_prompt(
+                                item["requirements"],
+                                item["language"],
+                                item.get("context"),
+                            ),
+                        },
+                    ],
+                    max_tokens=2000,
+                ),
+                build_result=partial(
+                    self._code_result, language=item["language"]
+                ),
+            )
+            for item in items
+        ]
+        return await generate_bulk(
+            self.generation_cache,
+            self.batch_provider,
+            bulk,
+            poll_interval=self.batch_poll_interval,
+            timeout=self.batch_timeout,
+        )
+
+    async def _generate_code(
+        self,
+        requirements: Dict[str, Any],
+        language: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Generate code with the routed model, bypassing the cache
+        """
         try:
             prompt = self._create_code_generation_prompt(
                 requirements, language, context
             )
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an expert software developer. Generate "
-                            "high-quality, secure, and efficient code."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
+            response = await self.model_selector.generate_completion(
+                prompt,
+                task_type="code_generation",
+                system_prompt=GENERATION_SYSTEM_PROMPT,
                 max_tokens=2000,
             )
+            return self._code_result(response, language)
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def generate_code_stream(
+        self,
+        requirements: Dict[str, Any],
+        language: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated code as server-sent events
+        """
+        cache_key = self.generation_cache.key(
+            requirements,
+            language,
+            context,
+            model=self._model_for("code_generation"),
+        )
+        cached_result = await self.generation_cache.get(
+            cache_key,
+            refresh=lambda: self._generate_code(
+                requirements, language, context
+            ),
+        )
+        if cached_result:
+            yield format_sse("result", cached_result)
+            return
+
+        started = time.monotonic()
 
-            generated_code = response.choices[0].message["content"]
-            result = {
-                "status": "success",
-                "code": generated_code,
-                "language": language,
-                "timestamp": datetime.utcnow().isoformat(),
-                "model_used": "gpt-4-turbo-preview",
-            }
-
-            # Cache the result
-            self.redis_client.setex(
-                cache_key, self.cache_ttl, json.dumps(result)
+        async def cache(result: Dict[str, Any]) -> None:
+            await self.generation_cache.set(
+                cache_key, result, delta=time.monotonic() - started
             )
 
-            return result
+        prompt = self._create_code_generation_prompt(
+            requirements, language, context
+        )
+        stream = self.model_selector.stream_completion(
+            prompt,
+            task_type="code_generation",
+            system_prompt=GENERATION_SYSTEM_PROMPT,
+            max_tokens=2000,
+        )
+        async for event in completion_events(
+            stream, lambda r: self._code_result(r, language), cache
+        ):
+            yield event
 
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    def _with_semantic_cache(
+        self,
+        scope: str,
+        request: Any,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Callable[[], Awaitable[Dict[str, Any]]]:
+        """
+        Answer near-duplicate requests from the semantic cache if enabled
+        """
+        if self.semantic_cache is None:
+            return compute
+        return lambda: self.semantic_cache.get_or_compute(
+            scope, request, compute
+        )
+
+    def _model_for(self, task_type: str) -> str:
+        """
+        Name of the model a task is routed to when all models are healthy
+
+        Cache keys use the configured route rather than the live selection,
+        so cached answers stay reachable while a model's circuit is open.
+        """
+        return self.model_selector.primary_model(task_type)["name"]
+
+    def _code_result(
+        self, response: CompletionResponse, language: str
+    ) -> Dict[str, Any]:
+        """
+        Build the generate endpoint result from a completion
+        """
+        return {
+            "status": "success",
+            "code": response.content,
+            "language": language,
+            "timestamp": datetime.utcnow().isoformat(),
+            "model_used": response.model,
+        }
 
     def _create_code_generation_prompt(
         self,
@@ -134,38 +327,116 @@ class CodeGenerator:
         """
         Review code using Claude 3 for better analysis
         """
+        cache_key = self.review_cache.key(
+            code, language, context, model=self._model_for("code_review")
+        )
+        return await self.review_cache.get_or_compute(
+            cache_key, lambda: self._review_code(code, language, context)
+        )
+
+    async def review_code_batch(
+        self, items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Review several snippets, generating cache misses concurrently
+        """
+        model = self._model_for("code_review")
+        requests = [
+            (
+                self.review_cache.key(
+                    item["code"],
+                    item["language"],
+                    item.get("context"),
+                    model=model,
+                ),
+                partial(
+                    self._review_code,
+                    item["code"],
+                    item["language"],
+                    item.get("context"),
+                ),
+            )
+            for item in items
+        ]
+        return await self.review_cache.get_or_compute_many(
+            requests, concurrency=self.batch_concurrency
+        )
+
+    async def _review_code(
+        self,
+        code: str,
+        language: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Review code with the routed model, bypassing the cache
+        """
         try:
             prompt = self._create_code_review_prompt(code, language, context)
-            # Note: Claude integration will be added here
-            # For now, using GPT-4 as a placeholder
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "Expert code reviewer: analyze code for "
-                            "quality, security, and performance."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
+            response = await self.model_selector.generate_completion(
+                prompt,
+                task_type="code_review",
+                system_prompt=REVIEW_SYSTEM_PROMPT,
                 max_tokens=2000,
             )
-
-            review_result = response.choices[0].message["content"]
-            return {
-                "status": "success",
-                "review": review_result,
-                "language": language,
-                "timestamp": datetime.utcnow().isoformat(),
-                "model_used": "gpt-4-turbo-preview",
-            }
+            return self._review_result(response, language)
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def review_code_stream(
+        self,
+        code: str,
+        language: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a code review as server-sent events
+        """
+        cache_key = self.review_cache.key(
+            code, language, context, model=self._model_for("code_review")
+        )
+        cached_result = await self.review_cache.get(
+            cache_key,
+            refresh=lambda: self._review_code(code, language, context),
+        )
+        if cached_result:
+            yield format_sse("result", cached_result)
+            return
+
+        started = time.monotonic()
+
+        async def cache(result: Dict[str, Any]) -> None:
+            await self.review_cache.set(
+                cache_key, result, delta=time.monotonic() - started
+            )
+
+        prompt = self._create_code_review_prompt(code, language, context)
+        stream = self.model_selector.stream_completion(
+            prompt,
+            task_type="code_review",
+            system_prompt=REVIEW_SYSTEM_PROMPT,
+            max_tokens=2000,
+        )
+        async for event in completion_events(
+            stream, lambda r: self._review_result(r, language), cache
+        ):
+            yield event
+
+    def _review_result(
+        self, response: CompletionResponse, language: str
+    ) -> Dict[str, Any]:
+        """
+        Build the review endpoint result from a completion
+        """
+        return {
+            "status": "success",
+            "review": response.content,
+            "language": language,
+            "timestamp": datetime.utcnow().isoformat(),
+            "model_used": response.model,
+        }
+
     def _create_code_review_prompt(
         self,
         code: str,
@@ -208,35 +479,63 @@ Additional Context:
             prompt = self._create_optimization_prompt(
                 code, language, optimization_goals
             )
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "Expert optimizer: improve code for "
-                            "better performance and efficiency."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
+            response = await self.model_selector.generate_completion(
+                prompt,
+                task_type="code_optimization",
+                system_prompt=OPTIMIZATION_SYSTEM_PROMPT,
                 max_tokens=2000,
             )
-
-            optimized_code = response.choices[0].message["content"]
-            return {
-                "status": "success",
-                "optimized_code": optimized_code,
-                "language": language,
-                "timestamp": datetime.utcnow().isoformat(),
-                "model_used": "gpt-4-turbo-preview",
-                "optimization_goals": optimization_goals,
-            }
+            return self._optimization_result(
+                response, language, optimization_goals
+            )
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def optimize_code_stream(
+        self,
+        code: str,
+        language: str,
+        optimization_goals: Optional[List[str]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream optimized code as server-sent events
+        """
+        prompt = self._create_optimization_prompt(
+            code, language, optimization_goals
+        )
+        stream = self.model_selector.stream_completion(
+            prompt,
+            task_type="code_optimization",
+            system_prompt=OPTIMIZATION_SYSTEM_PROMPT,
+            max_tokens=2000,
+        )
+        async for event in completion_events(
+            stream,
+            lambda r: self._optimization_result(
+                r, language, optimization_goals
+            ),
+        ):
+            yield event
+
+    def _optimization_result(
+        self,
+        response: CompletionResponse,
+        language: str,
+        optimization_goals: Optional[List[str]],
+    ) -> Dict[str, Any]:
+        """
+        Build the optimize endpoint result from a completion
+        """
+        return {
+            "status": "success",
+            "optimized_code": response.content,
+            "language": language,
+            "timestamp": datetime.utcnow().isoformat(),
+            "model_used": response.model,
+            "optimization_goals": optimization_goals,
+        }
+
     def _create_optimization_prompt(
         self,
         code: str,
@@ -3,8 +3,13 @@
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
+from application.src.core.config import Settings
 from application.src.models.database import User
+from application.src.services.ai.scheduler import BATCH, scheduling
+from application.src.services.ai.streaming import event_stream_response
 from application.src.services.auth_service import get_current_user
 
 from .code_generator import CodeGenerator
@@ -13,6 +18,20 @@ router = APIRouter()
 code_generator = None  # Initialize lazily
 
 
+class CodeReviewItem(BaseModel):
+    """One snippet to review."""
+
+    code: str
+    language: str
+    context: Optional[Dict[str, Any]] = None
+
+
+class CodeReviewBatch(BaseModel):
+    """Snippets to review in one request."""
+
+    items: List[CodeReviewItem]
+
+
 def get_code_generator():
     global code_generator
     if code_generator is None:
@@ -39,6 +58,23 @@ async def generate_code(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate/stream")
+async def generate_code_stream(
+    requirements: Dict[str, Any],
+    language: str,
+    context: Optional[Dict[str, Any]] = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream generated code as server-sent events
+    """
+    return event_stream_response(
+        get_code_generator().generate_code_stream(
+            requirements, language, context
+        )
+    )
+
+
 @router.post("/review")
 async def review_code(
     code: str,
@@ -58,6 +94,42 @@ async def review_code(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/review:batch")
+async def review_code_batch(
+    batch: CodeReviewBatch,
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Review several snippets; failed items do not fail the batch
+    """
+    max_items = Settings().BATCH_MAX_ITEMS
+    if len(batch.items) > max_items:
+        raise HTTPException(
+            status_code=413, detail=f"Batches are limited to {max_items}"
+        )
+    # Bulk CI traffic must not take slots from interactive requests
+    with scheduling(lane=BATCH):
+        results = await get_code_generator().review_code_batch(
+            [item.model_dump() for item in batch.items]
+        )
+    return {"status": "success", "results": results}
+
+
+@router.post("/review/stream")
+async def review_code_stream(
+    code: str,
+    language: str,
+    context: Optional[Dict[str, Any]] = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream a code review as server-sent events
+    """
+    return event_stream_response(
+        get_code_generator().review_code_stream(code, language, context)
+    )
+
+
 @router.post("/optimize")
 async def optimize_code(
     code: str,
@@ -75,3 +147,20 @@ async def optimize_code(
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/optimize/stream")
+async def optimize_code_stream(
+    code: str,
+    language: str,
+    optimization_goals: Optional[List[str]] = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream optimized code as server-sent events
+    """
+    return event_stream_response(
+        get_code_generator().optimize_code_stream(
+            code, language, optimization_goals
+        )
+    )
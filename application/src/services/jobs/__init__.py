@@ -0,0 +1,4 @@
+from .queue import JobQueue, get_job_queue
+from .routes import router as jobs_router
+
+__all__ = ["JobQueue", "get_job_queue", "jobs_router"]
@@ -0,0 +1,135 @@
+"""Job types the background worker can run."""
+
+from typing import Any, Awaitable, Callable, Dict, List
+
+from application.src.core.config import Settings
+
+# Reports the fraction of a job that is done
+Progress = Callable[[float], Awaitable[None]]
+Handler = Callable[[Dict[str, Any], Progress], Awaitable[Any]]
+
+
+def _code_generator():
+    from application.src.services.code_generation.routes import (
+        get_code_generator,
+    )
+
+    return get_code_generator()
+
+
+def _test_generator():
+    from application.src.services.testing.routes import get_test_generator
+
+    return get_test_generator()
+
+
+async def _in_chunks(
+    items: List[Dict[str, Any]],
+    run: Callable[[List[Dict[str, Any]]], Awaitable[List[Any]]],
+    progress: Progress,
+) -> List[Any]:
+    """Run a batch method chunk by chunk, reporting progress between."""
+    size = max(1, Settings().BATCH_CONCURRENCY)
+    results: List[Any] = []
+    for start in range(0, len(items), size):
+        end = start + size
+        results.extend(await run(items[start:end]))
+        await progress(len(results) / len(items))
+    return results
+
+
+async def generate_code(params: Dict[str, Any], progress: Progress) -> Any:
+    """Generate code from requirements."""
+    return await _code_generator().generate_code(
+        params["requirements"], params["language"], params.get("context")
+    )
+
+
+async def review_code(params: Dict[str, Any], progress: Progress) -> Any:
+    """Review one snippet."""
+    return await _code_generator().review_code(
+        params["code"], params["language"], params.get("context")
+    )
+
+
+async def review_code_batch(params: Dict[str, Any], progress: Progress):
+    """Review several snippets."""
+    return await _in_chunks(
+        params["items"], _code_generator().review_code_batch, progress
+    )
+
+
+async def generate_code_bulk(params: Dict[str, Any], progress: Progress):
+    """Generate code for many requirement sets through the batch API."""
+    return await _code_generator().generate_code_bulk(params["items"])
+
+
+async def optimize_code(params: Dict[str, Any], progress: Progress) -> Any:
+    """Optimize one snippet."""
+    return await _code_generator().optimize_code(
+        params["code"], params["language"], params.get("optimization_goals")
+    )
+
+
+async def generate_tests(params: Dict[str, Any], progress: Progress) -> Any:
+    """Generate tests for one file."""
+    return await _test_generator().generate_tests(
+        params["code"],
+        params["language"],
+        params["test_type"],
+        params.get("context"),
+    )
+
+
+async def generate_tests_batch(params: Dict[str, Any], progress: Progress):
+    """Generate tests for several files."""
+    return await _in_chunks(
+        params["items"], _test_generator().generate_tests_batch, progress
+    )
+
+
+async def generate_tests_bulk(params: Dict[str, Any], progress: Progress):
+    """Generate tests for many files through the batch API."""
+    return await _test_generator().generate_tests_bulk(params["items"])
+
+
+async def generate_performance_tests(
+    params: Dict[str, Any], progress: Progress
+) -> Any:
+    """Generate performance tests."""
+    return await _test_generator().generate_performance_tests(
+        params["code"], params["language"], params.get("performance_criteria")
+    )
+
+
+async def analyze_requirements(
+    params: Dict[str, Any], progress: Progress
+) -> Any:
+    """Analyze project requirements."""
+    from application.src.core.ai_assistant import AIAssistant
+
+    return await AIAssistant().analyze_requirements(params["project_data"])
+
+
+async def assess_risks(params: Dict[str, Any], progress: Progress) -> Any:
+    """Assess project risks."""
+    from application.src.core.ai_assistant import AIAssistant
+
+    return await AIAssistant().assess_project_risks(params["project_id"])
+
+
+# Job type -> handler; types mirror the synchronous routes, and the
+# bulk types run offline through the provider batch API, e.g. nightly
+HANDLERS: Dict[str, Handler] = {
+    "code.generate": generate_code,
+    "code.generate_bulk": generate_code_bulk,
+    "code.review": review_code,
+    "code.review_batch": review_code_batch,
+    "code.optimize": optimize_code,
+    "testing.generate": generate_tests,
+    "testing.generate_batch": generate_tests_batch,
+    "testing.generate_bulk": generate_tests_bulk,
+    "testing.performance": generate_performance_tests,
+    "requirements.analyze": analyze_requirements,
+    "requirements.risk_assessment": assess_risks,
+}
@@ -0,0 +1,240 @@
+"""Redis-backed queue of long-running AI jobs."""
+
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from application.src.core.config import Settings
+from application.src.services.ai.scheduler import (
+    current_project,
+    current_tenant,
+)
+from application.src.services.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueue:
+    """Jobs stored as Redis hashes and handed out through a list.
+
+    ``enqueue`` records the job and pushes its id. Workers move ids
+    atomically onto a processing list while they run them, so a job is
+    never handed to two workers, and ids left there by a crashed worker
+    are requeued by ``requeue_stalled``. Job records are kept for
+    ``result_ttl`` seconds after the last heartbeat or the outcome, for
+    clients to collect.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        prefix: str = "jobs",
+        result_ttl: int = 86400,
+    ):
+        """Initialize the queue.
+
+        Args:
+            redis_client: ``redis.asyncio`` client
+            prefix: Redis key prefix
+            result_ttl: Seconds job records are kept
+        """
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.result_ttl = result_ttl
+        self.pending_key = f"{prefix}:pending"
+        self.processing_key = f"{prefix}:processing"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    async def enqueue(self, job_type: str, params: Dict[str, Any]) -> str:
+        """Record a job and queue it for a worker.
+
+        Args:
+            job_type: Handler name, e.g. 'testing.generate'
+            params: JSON-serializable handler arguments
+
+        Returns:
+            The job id
+        """
+        job_id = uuid.uuid4().hex
+        key = self._job_key(job_id)
+        job = {
+            "id": job_id,
+            "type": job_type,
+            "params": json.dumps(params),
+            "status": QUEUED,
+            "progress": 0.0,
+            # Submitter's fair share, applied when the job runs
+            "tenant": current_tenant.get(),
+            "created_at": time.time(),
+        }
+        project_id = current_project.get()
+        if project_id is not None:
+            # Usage of the job's calls is attributed to the project
+            job["project_id"] = project_id
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=job)
+            pipe.expire(key, self.result_ttl)
+            pipe.lpush(self.pending_key, job_id)
+            await pipe.execute()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's status, progress and, once done, its outcome."""
+        fields = await self.redis_client.hgetall(self._job_key(job_id))
+        if not fields:
+            return None
+        job = {_text(k): _text(v) for k, v in fields.items()}
+        job["params"] = json.loads(job["params"])
+        job["progress"] = float(job["progress"])
+        if "project_id" in job:
+            job["project_id"] = int(job["project_id"])
+        if "result" in job:
+            job["result"] = json.loads(job["result"])
+        for field in (
+            "created_at",
+            "dequeued_at",
+            "started_at",
+            "heartbeat_at",
+            "finished_at",
+        ):
+            if field in job:
+                job[field] = float(job[field])
+        return job
+
+    async def dequeue(self, timeout: float) -> Optional[str]:
+        """Take the oldest queued job id, waiting up to ``timeout``."""
+        job_id = await self.redis_client.blmove(
+            self.pending_key, self.processing_key, timeout, "RIGHT", "LEFT"
+        )
+        if job_id is None:
+            return None
+        job_id = _text(job_id)
+        # Stalls are timed from here until the job starts heartbeating
+        await self.redis_client.hset(
+            self._job_key(job_id), "dequeued_at", time.time()
+        )
+        return job_id
+
+    async def start(self, job_id: str) -> None:
+        """Mark a job as running."""
+        now = time.time()
+        await self.redis_client.hset(
+            self._job_key(job_id),
+            mapping={
+                "status": RUNNING,
+                "started_at": now,
+                "heartbeat_at": now,
+            },
+        )
+
+    async def heartbeat(self, job_id: str) -> None:
+        """Record that the worker running a job is still alive."""
+        key = self._job_key(job_id)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, "heartbeat_at", time.time())
+            # Jobs may run for longer than records are kept
+            pipe.expire(key, self.result_ttl)
+            await pipe.execute()
+
+    async def set_progress(self, job_id: str, progress: float) -> None:
+        """Record how much of a job is done, from 0 to 1."""
+        await self.redis_client.hset(
+            self._job_key(job_id), "progress", min(max(progress, 0.0), 1.0)
+        )
+
+    async def finish(
+        self,
+        job_id: str,
+        result: Optional[Any] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Store a job's outcome and release it from processing.
+
+        Args:
+            job_id: Job to finish
+            result: JSON-serializable result on success
+            error: Error message on failure
+        """
+        fields: Dict[str, Any] = {"finished_at": time.time()}
+        if error is None:
+            fields.update(
+                status=SUCCEEDED, progress=1.0, result=json.dumps(result)
+            )
+        else:
+            fields.update(status=FAILED, error=error)
+        key = self._job_key(job_id)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, self.result_ttl)
+            pipe.lrem(self.processing_key, 1, job_id)
+            await pipe.execute()
+
+    async def requeue_stalled(self, older_than: float) -> int:
+        """Requeue taken jobs without sign of life for ``older_than``.
+
+        A job's last sign of life is its latest heartbeat or, if its
+        worker died before starting it, when it was dequeued, or failing
+        that enqueued. Ids whose record has expired are dropped.
+
+        Returns:
+            Number of jobs requeued
+        """
+        requeued = 0
+        cutoff = time.time() - older_than
+        for job_id in await self.redis_client.lrange(
+            self.processing_key, 0, -1
+        ):
+            job_id = _text(job_id)
+            stamps = await self.redis_client.hmget(
+                self._job_key(job_id),
+                ["heartbeat_at", "dequeued_at", "created_at"],
+            )
+            if all(stamp is None for stamp in stamps):
+                await self.redis_client.lrem(self.processing_key, 1, job_id)
+                continue
+            heartbeat_at, dequeued_at, created_at = stamps
+            # A requeued job keeps its old heartbeat until it restarts
+            latest = [
+                float(stamp)
+                for stamp in (heartbeat_at, dequeued_at)
+                if stamp is not None
+            ]
+            alive_at = max(latest) if latest else float(created_at)
+            if alive_at >= cutoff:
+                continue
+            if await self.redis_client.lrem(self.processing_key, 1, job_id):
+                await self.redis_client.hset(
+                    self._job_key(job_id), "status", QUEUED
+                )
+                await self.redis_client.lpush(self.pending_key, job_id)
+                requeued += 1
+        if requeued:
+            logger.warning(f"Requeued {requeued} stalled jobs")
+        return requeued
+
+
+def _text(value: Any) -> Any:
+    """Decode Redis bytes to text."""
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue on the shared Redis pool."""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            get_redis(), result_ttl=Settings().JOB_RESULT_TTL
+        )
+    return _job_queue
@@ -0,0 +1,61 @@
+"""Routes for submitting long-running AI jobs and polling their status."""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from application.src.models.database import User
+from application.src.services.ai.scheduler import scheduling
+from application.src.services.auth_service import get_current_user
+
+from .handlers import HANDLERS
+from .queue import get_job_queue
+
+router = APIRouter()
+
+# Roles that may see every user's jobs
+ALL_JOBS_ROLES = {"project_manager"}
+
+
+class JobRequest(BaseModel):
+    """A job to run in the background."""
+
+    type: str
+    params: Dict[str, Any] = {}
+    project_id: Optional[int] = None  # Project its usage is billed to
+
+
+@router.post("", status_code=202)
+async def submit_job(
+    job: JobRequest,
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Queue a job for a worker and return its id without waiting
+    """
+    if job.type not in HANDLERS:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown job type: {job.type}"
+        )
+    with scheduling(project_id=job.project_id):
+        job_id = await get_job_queue().enqueue(job.type, job.params)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Return a job's status and progress, and its result once finished;
+    other users' jobs are not found unless the caller may see them all
+    """
+    job = await get_job_queue().get(job_id)
+    if job is None or (
+        current_user.role not in ALL_JOBS_ROLES
+        and job.get("tenant") != f"user:{current_user.id}"
+    ):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
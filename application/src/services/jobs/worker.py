@@ -0,0 +1,180 @@
+"""Worker process running queued AI jobs.
+
+Run one or more with ``python -m application.src.services.jobs.worker``;
+generation capacity scales with the number of workers, independently of
+the API tier.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+from typing import Dict, Optional
+
+from application.src.core.config import Settings
+from application.src.models.database import init_db
+from application.src.services.ai.clients import close_client_pool
+from application.src.services.ai.scheduler import BATCH, scheduling
+from application.src.services.ai.usage_log import (
+    start_ai_log_writer,
+    stop_ai_log_writer,
+)
+from application.src.services.cache import close_redis
+from application.src.services.jobs.handlers import HANDLERS, Handler
+from application.src.services.jobs.queue import JobQueue, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """Pulls jobs off the queue and runs several at a time."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Optional[Dict[str, Handler]] = None,
+        concurrency: int = 4,
+        poll_timeout: float = 2.0,
+        heartbeat_interval: float = 30.0,
+        stall_timeout: float = 300.0,
+        recover_interval: float = 60.0,
+    ):
+        """Initialize the worker.
+
+        Args:
+            queue: Queue to pull from
+            handlers: Job type to handler, HANDLERS if omitted
+            concurrency: Jobs run at once
+            poll_timeout: Seconds each pull blocks waiting for a job
+            heartbeat_interval: Seconds between liveness updates of a job
+            stall_timeout: Seconds without a heartbeat before a running
+                job is requeued
+            recover_interval: Seconds between scans for stalled jobs
+        """
+        self.queue = queue
+        self.handlers = HANDLERS if handlers is None else handlers
+        self.concurrency = concurrency
+        self.poll_timeout = poll_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.stall_timeout = stall_timeout
+        self.recover_interval = recover_interval
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Finish running jobs and take no new ones."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Process jobs until stopped."""
+        await asyncio.gather(
+            self._recover(), *[self._loop() for _ in range(self.concurrency)]
+        )
+
+    async def _recover(self) -> None:
+        """Requeue jobs of crashed workers, now and every interval."""
+        while not self._stopping.is_set():
+            try:
+                await self.queue.requeue_stalled(self.stall_timeout)
+            except Exception as e:
+                logger.error(f"Could not requeue stalled jobs: {e}")
+            try:
+                await asyncio.wait_for(
+                    self._stopping.wait(), self.recover_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _loop(self) -> None:
+        """Pull and process jobs one after another."""
+        while not self._stopping.is_set():
+            try:
+                job_id = await self.queue.dequeue(self.poll_timeout)
+            except Exception as e:
+                logger.error(f"Job queue unavailable: {e}")
+                await asyncio.sleep(self.poll_timeout)
+                continue
+            if job_id is None:
+                continue
+            try:
+                await self.process(job_id)
+            except Exception as e:
+                logger.error(f"Could not record outcome of job {job_id}: {e}")
+
+    async def process(self, job_id: str) -> None:
+        """Run one job and record its outcome."""
+        job = await self.queue.get(job_id)
+        if job is None:
+            # Expired before a worker got to it
+            await self.queue.finish(job_id, error="Job record expired")
+            return
+        handler = self.handlers.get(job["type"])
+        if handler is None:
+            await self.queue.finish(
+                job_id, error=f"Unknown job type: {job['type']}"
+            )
+            return
+
+        await self.queue.start(job_id)
+        heartbeat = asyncio.ensure_future(self._heartbeat(job_id))
+
+        async def progress(fraction: float) -> None:
+            await self.queue.set_progress(job_id, fraction)
+
+        try:
+            # Background work runs in the batch lane for its submitter
+            with scheduling(
+                lane=BATCH,
+                tenant=job.get("tenant"),
+                project_id=job.get("project_id"),
+            ):
+                result = await handler(job["params"], progress)
+        except Exception as e:
+            logger.error(f"Job {job_id} ({job['type']}) failed: {e}")
+            # HTTPException carries its message in detail
+            await self.queue.finish(
+                job_id, error=getattr(e, "detail", None) or str(e)
+            )
+        else:
+            await self.queue.finish(job_id, result=result)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """Mark a job alive until cancelled."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.queue.heartbeat(job_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job_id}: {e}")
+
+
+async def main() -> None:
+    """Run a worker until SIGINT or SIGTERM."""
+    settings = Settings()
+    worker = JobWorker(
+        get_job_queue(),
+        concurrency=settings.JOB_WORKER_CONCURRENCY,
+        poll_timeout=settings.JOB_POLL_TIMEOUT,
+        heartbeat_interval=settings.JOB_HEARTBEAT_INTERVAL,
+        stall_timeout=settings.JOB_STALL_TIMEOUT,
+        recover_interval=settings.JOB_RECOVER_INTERVAL,
+    )
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        start_ai_log_writer(init_db(database_url))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    logger.info(f"Job worker started with concurrency {worker.concurrency}")
+    try:
+        await worker.run()
+    finally:
+        await stop_ai_log_writer()
+        await close_client_pool()
+        await close_redis()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
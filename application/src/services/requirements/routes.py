@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from application.src.core.ai_assistant import AIAssistant
 from application.src.models.database import User
+from application.src.services.ai.scheduler import scheduling
 from application.src.services.auth_service import get_current_user
 
 router = APIRouter()
@@ -27,8 +28,8 @@ async def analyze_requirements(
     """
     try:
         ai_assistant = AIAssistant()
-        analysis_result = await ai_assistant.analyze_requirements(project_data)
-        return analysis_result
+        with scheduling(project_id=project_data.get("id")):
+            return await ai_assistant.analyze_requirements(project_data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -48,7 +49,7 @@ async def assess_risks(
     """
     try:
         ai_assistant = AIAssistant()
-        risk_assessment = await ai_assistant.assess_project_risks(project_id)
-        return risk_assessment
+        with scheduling(project_id=project_id):
+            return await ai_assistant.assess_project_risks(project_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,10 +1,15 @@
 """Routes for test generation and validation using AI models."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
+from application.src.core.config import Settings
 from application.src.models.database import User
+from application.src.services.ai.scheduler import BATCH, scheduling
+from application.src.services.ai.streaming import event_stream_response
 from application.src.services.auth_service import get_current_user
 
 from .test_generator import TestGenerator
@@ -13,6 +18,21 @@ router = APIRouter()
 test_generator = None  # Initialize lazily
 
 
+class TestGenerationItem(BaseModel):
+    """One file to generate tests for."""
+
+    code: str
+    language: str
+    test_type: str
+    context: Optional[Dict[str, Any]] = None
+
+
+class TestGenerationBatch(BaseModel):
+    """Files to generate tests for in one request."""
+
+    items: List[TestGenerationItem]
+
+
 def get_test_generator():
     global test_generator
     if test_generator is None:
@@ -40,6 +60,45 @@ async def generate_tests(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate:batch")
+async def generate_tests_batch(
+    batch: TestGenerationBatch,
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Generate tests for several files; failed items do not fail the batch
+    """
+    max_items = Settings().BATCH_MAX_ITEMS
+    if len(batch.items) > max_items:
+        raise HTTPException(
+            status_code=413, detail=f"Batches are limited to {max_items}"
+        )
+    # Bulk CI traffic must not take slots from interactive requests
+    with scheduling(lane=BATCH):
+        results = await get_test_generator().generate_tests_batch(
+            [item.model_dump() for item in batch.items]
+        )
+    return {"status": "success", "results": results}
+
+
+@router.post("/generate/stream")
+async def generate_tests_stream(
+    code: str,
+    language: str,
+    test_type: str,
+    context: Optional[Dict[str, Any]] = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream generated tests as server-sent events
+    """
+    return event_stream_response(
+        get_test_generator().generate_tests_stream(
+            code, language, test_type, context
+        )
+    )
+
+
 @router.post("/validate")
 async def validate_tests(
     tests: str,
@@ -76,3 +135,20 @@ async def generate_performance_tests(
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/performance/stream")
+async def generate_performance_tests_stream(
+    code: str,
+    language: str,
+    performance_criteria: Optional[Dict[str, Any]] = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream generated performance tests as server-sent events
+    """
+    return event_stream_response(
+        get_test_generator().generate_performance_tests_stream(
+            code, language, performance_criteria
+        )
+    )
@@ -2,53 +2,85 @@
 
 import json
 import os
+import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-import openai
-import redis
 from fastapi import HTTPException
 
 from application.src.core.config import Settings
-from application.src.services.ai.model_selector import ModelSelector
+from application.src.services.ai.batch import (
+    BatchRequest,
+    BulkItem,
+    generate_bulk,
+    get_batch_provider,
+)
+from application.src.services.ai.clients import LLMClientPool, get_client_pool
+from application.src.services.ai.model_selector import (
+    CompletionResponse,
+    ModelSelector,
+    get_model_selector,
+)
+from application.src.services.ai.streaming import (
+    completion_events,
+    format_sse,
+)
+from application.src.services.ai.token_counter import get_token_counter
+from application.src.services.cache import (
+    GenerationCache,
+    get_redis,
+    get_single_flight,
+)
+
+# Bump when a prompt template changes so cached results are not reused
+PROMPT_TEMPLATE_VERSION = "1"
+
+TESTS_SYSTEM_PROMPT = "Generate tests for the code."
 
 
 class TestGenerator:
     """Test generation service using AI."""
 
-    def __init__(self):
-        """Initialize test generator with OpenAI client and Redis cache."""
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if not openai_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-
-        # Initialize Helicone configuration
-        helicone_key = os.getenv("HELICONE_API_KEY")
-        if not helicone_key:
-            raise ValueError(
-                "HELICONE_API_KEY environment variable is required"
-            )
+    def __init__(self, client_pool: Optional[LLMClientPool] = None):
+        """Initialize test generator with shared AI clients and Redis cache.
 
-        # Configure OpenAI client with Helicone integration
-        self.openai_client = openai.OpenAI(
-            api_key=openai_key,
-            max_retries=3,
-            timeout=30.0,
-            default_headers={
-                "Helicone-Auth": f"Bearer {helicone_key}",
-                "Helicone-Cache-Enabled": "true",
-                "Helicone-Cache-TTL": "3600",
-                "Helicone-Retry-Enabled": "true",
-                "Helicone-Rate-Limit-Policy": "throttle",
-            },
-            base_url="https://api.helicone.ai/v1/openai",
-        )
-        self.redis_client = redis.Redis.from_url(
-            os.getenv("REDIS_URL", "redis://redis:6379/0")
-        )
+        Args:
+            client_pool: Async provider clients, shared pool and selector
+                if omitted
+        """
+        self.client_pool = client_pool or get_client_pool()
+        self.openai_client = self.client_pool.get_client("openai")
+        self.redis_client = get_redis()
         # 1 hour default cache TTL
         self.cache_ttl = int(os.getenv("TEST_GENERATION_CACHE_TTL", "3600"))
-        self.model_selector = ModelSelector(Settings())
+        settings = Settings()
+        # Join identical concurrent requests onto one upstream call
+        self.single_flight = get_single_flight()
+        self.generation_cache = GenerationCache(
+            self.redis_client,
+            "test_gen",
+            ttl=self.cache_ttl,
+            template_version=PROMPT_TEMPLATE_VERSION,
+            local_size=settings.GENERATION_CACHE_LOCAL_SIZE,
+            local_ttl=settings.GENERATION_CACHE_LOCAL_TTL,
+            ttl_jitter=settings.GENERATION_CACHE_TTL_JITTER,
+            stale_ttl=settings.GENERATION_CACHE_STALE_TTL,
+            early_refresh_beta=settings.GENERATION_CACHE_EARLY_REFRESH_BETA,
+            single_flight=self.single_flight,
+        )
+        self.batch_concurrency = settings.BATCH_CONCURRENCY
+        self.model_selector = (
+            ModelSelector(Settings(), client_pool=client_pool)
+            if client_pool
+            else get_model_selector()
+        )
+        # Offline bulk runs at batch pricing and rate limits
+        self.batch_provider = get_batch_provider(
+            self.model_selector, self.openai_client
+        )
+        self.batch_poll_interval = settings.BATCH_POLL_INTERVAL
+        self.batch_timeout = settings.BATCH_TIMEOUT
 
     async def generate_tests(
         self,
@@ -68,81 +100,233 @@ class TestGenerator:
         Returns:
             Dict containing generated tests and metadata
         """
-        cache_key = f"test_gen:{hash(code + language + test_type)}"
-        cached_result = self.redis_client.get(cache_key)
-        if cached_result:
-            return json.loads(cached_result)
+        cache_key = self._cache_key(code, language, test_type, context)
+        return await self.generation_cache.get_or_compute(
+            cache_key,
+            lambda: self._generate_tests(code, language, test_type, context),
+        )
+
+    async def generate_tests_batch(
+        self, items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Generate tests for several files in one call.
+
+        Identical items are generated once, cached results are read in
+        one Redis round trip, and misses are generated concurrently up
+        to BATCH_CONCURRENCY at a time.
+
+        Args:
+            items: Dicts with code, language, test_type and optional
+                context
+
+        Returns:
+            One result per item, in order; failed items have status
+            'error'
+        """
+        requests = [
+            (
+                self._cache_key(
+                    item["code"],
+                    item["language"],
+                    item["test_type"],
+                    item.get("context"),
+                ),
+                partial(
+                    self._generate_tests,
+                    item["code"],
+                    item["language"],
+                    item["test_type"],
+                    item.get("context"),
+                ),
+            )
+            for item in items
+        ]
+        return await self.generation_cache.get_or_compute_many(
+            requests, concurrency=self.batch_concurrency
+        )
+
+    async def generate_tests_bulk(
+        self, items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Generate tests for many files through the provider batch API.
+
+        For non-interactive work such as nightly regeneration. Uncached
+        items are submitted as one batch, which may take hours, and the
+        results are loaded into the generation cache.
+
+        Args:
+            items: Dicts with code, language, test_type and optional
+                context
 
+        Returns:
+            One result per item, in order; failed items have status
+            'error'
+        """
+        bulk = []
+        for item in items:
+            prompt = self._create_test_generation_prompt(
+                item["code"],
+                item["language"],
+                item["test_type"],
+                item.get("context"),
+            )
+            # The model the cache key names, so results are found later
+            model = self._model_for(prompt)
+            bulk.append(
+                BulkItem(
+                    key=self._cache_key(
+                        item["code"],
+                        item["language"],
+                        item["test_type"],
+                        item.get("context"),
+                    ),
+                    request=BatchRequest(
+                        custom_id="",
+                        model=model["name"],
+                        messages=[
+                            {"role": "system", "content": TESTS_SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt},
+                        ],
+                        max_tokens=model["max_tokens"],
+                        temperature=model["temperature"],
+                    ),
+                    build_result=partial(
+                        self._tests_result,
+                        language=item["language"],
+                        test_type=item["test_type"],
+                    ),
+                )
+            )
+        return await generate_bulk(
+            self.generation_cache,
+            self.batch_provider,
+            bulk,
+            poll_interval=self.batch_poll_interval,
+            timeout=self.batch_timeout,
+        )
+
+    async def _generate_tests(
+        self,
+        code: str,
+        language: str,
+        test_type: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Generate tests with the routed model, bypassing the cache."""
         try:
             prompt = self._create_test_generation_prompt(
                 code, language, test_type, context
             )
-            # Select appropriate model based on task requirements
-            # Estimate tokens needed
-            token_est = int(len(prompt) * 2)
-            model_config = self.model_selector.select_model(
-                "test_generation",
+            token_est = get_token_counter().count(prompt)
+            response = await self.model_selector.generate_completion(
+                prompt,
+                task_type="test_generation",
+                system_prompt=TESTS_SYSTEM_PROMPT,
                 token_estimate=token_est,
                 context={"type": test_type},
             )
 
-            try:
-                response = await self.openai_client.chat.completions.create(
-                    model=model_config["name"],
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "Generate tests for the code.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=model_config["temperature"],
-                    max_tokens=model_config["max_tokens"],
-                )
-            except Exception as e:
-                # Try fallback model if available
-                fallback_config = self.model_selector.get_fallback_model(
-                    model_config["name"]
-                )
-                if not fallback_config:
-                    raise e
-
-                response = await self.openai_client.chat.completions.create(
-                    model=fallback_config["name"],
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "Generate tests for the code.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=fallback_config["temperature"],
-                    max_tokens=fallback_config["max_tokens"],
-                )
-
-            generated_tests = response.choices[0].message["content"]
-            result = {
-                "status": "success",
-                "tests": generated_tests,
-                "language": language,
-                "test_type": test_type,
-                "timestamp": datetime.utcnow().isoformat(),
-                # Using GPT-4 for now, will switch to Mistral
-                "model_used": "gpt-4-turbo-preview",
-            }
-
-            # Cache the result
-            self.redis_client.setex(
-                cache_key, self.cache_ttl, json.dumps(result)
-            )
-
-            return result
+            return self._tests_result(response, language, test_type)
 
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
             raise Exception(str(e))
 
+    async def generate_tests_stream(
+        self,
+        code: str,
+        language: str,
+        test_type: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """Stream generated tests as server-sent events.
+
+        Args:
+            code: Source code to generate tests for
+            language: Programming language of the code
+            test_type: Type of tests to generate (unit, integration, etc.)
+            context: Additional context for test generation
+
+        Yields:
+            ``token`` events as text arrives, then the cached ``result``
+        """
+        cache_key = self._cache_key(code, language, test_type, context)
+        cached_result = await self.generation_cache.get(
+            cache_key,
+            refresh=lambda: self._generate_tests(
+                code, language, test_type, context
+            ),
+        )
+        if cached_result:
+            yield format_sse("result", cached_result)
+            return
+
+        started = time.monotonic()
+
+        async def cache(result: Dict[str, Any]) -> None:
+            await self.generation_cache.set(
+                cache_key, result, delta=time.monotonic() - started
+            )
+
+        prompt = self._create_test_generation_prompt(
+            code, language, test_type, context
+        )
+        stream = self.model_selector.stream_completion(
+            prompt,
+            task_type="test_generation",
+            system_prompt=TESTS_SYSTEM_PROMPT,
+            token_estimate=get_token_counter().count(prompt),
+            context={"type": test_type},
+        )
+        async for event in completion_events(
+            stream, lambda r: self._tests_result(r, language, test_type), cache
+        ):
+            yield event
+
+    def _cache_key(
+        self,
+        code: str,
+        language: str,
+        test_type: str,
+        context: Optional[Dict[str, Any]],
+    ) -> str:
+        """Content-addressed cache key for a test generation request.
+
+        Names the model the request is routed to when all models are
+        healthy, estimated as generation does, so cached tests stay
+        reachable while a model's circuit is open.
+        """
+        prompt = self._create_test_generation_prompt(
+            code, language, test_type, context
+        )
+        return self.generation_cache.key(
+            code,
+            language,
+            test_type,
+            context,
+            model=self._model_for(prompt)["name"],
+        )
+
+    def _model_for(self, prompt: str) -> Dict[str, Any]:
+        """Model a test generation prompt is routed to when all are healthy."""
+        return self.model_selector.primary_model(
+            "test_generation", get_token_counter().count(prompt)
+        )
+
+    def _tests_result(
+        self, response: CompletionResponse, language: str, test_type: str
+    ) -> Dict[str, Any]:
+        """Build the test generation result from a completion."""
+        return {
+            "status": "success",
+            "tests": response.content,
+            "language": language,
+            "test_type": test_type,
+            "timestamp": datetime.utcnow().isoformat(),
+            "model_used": response.model,
+        }
+
     def _create_test_generation_prompt(
         self,
         code: str,
@@ -205,50 +389,22 @@ Additional Context:
         """
         try:
             prompt = self._create_test_validation_prompt(tests, code, language)
-            token_est = int(len(prompt) * 1.5)  # Less tokens
-            model_config = self.model_selector.select_model(
-                "test_validation",
+            token_est = get_token_counter().count(prompt)
+            response = await self.model_selector.generate_completion(
+                prompt,
+                task_type="test_validation",
+                system_prompt="You are a test validator.",
                 token_estimate=token_est,
                 context={"lang": language},
             )
 
-            try:
-                response = await self.openai_client.chat.completions.create(
-                    model=model_config["name"],
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a test validator.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=model_config["temperature"],
-                    max_tokens=model_config["max_tokens"],
-                )
-            except Exception as e:
-                fallback_config = self.model_selector.get_fallback_model(
-                    model_config["name"]
-                )
-                if not fallback_config:
-                    raise e
-
-                response = await self.openai_client.chat.completions.create(
-                    model=fallback_config["name"],
-                    messages=[
-                        {"role": "system", "content": "Validate tests."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=fallback_config["temperature"],
-                    max_tokens=fallback_config["max_tokens"],
-                )
-
-            validation_result = response.choices[0].message["content"]
+            validation_result = response.content
             return {
                 "status": "success",
                 "validation": validation_result,
                 "language": language,
                 "timestamp": datetime.utcnow().isoformat(),
-                "model_used": "gpt-4-turbo-preview",
+                "model_used": response.model,
             }
 
         except Exception as e:
@@ -305,60 +461,73 @@ Please analyze:
             prompt = self._create_performance_test_prompt(
                 code, language, performance_criteria
             )
-            model_config = self.model_selector.select_model(
-                "performance_test",
-                token_estimate=int(len(prompt) * 2),
+            response = await self.model_selector.generate_completion(
+                prompt,
+                task_type="performance_test",
+                system_prompt="Generate performance tests.",
+                token_estimate=get_token_counter().count(prompt),
                 context={"lang": language},
             )
 
-            try:
-                response = await self.openai_client.chat.completions.create(
-                    model=model_config["name"],
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "Generate performance tests.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=model_config["temperature"],
-                    max_tokens=model_config["max_tokens"],
-                )
-            except Exception as e:
-                fallback_config = self.model_selector.get_fallback_model(
-                    model_config["name"]
-                )
-                if not fallback_config:
-                    raise e
-
-                response = await self.openai_client.chat.completions.create(
-                    model=fallback_config["name"],
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "Generate performance tests.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=fallback_config["temperature"],
-                    max_tokens=fallback_config["max_tokens"],
-                )
-
-            performance_tests = response.choices[0].message["content"]
-            return {
-                "status": "success",
-                "performance_tests": performance_tests,
-                "language": language,
-                "criteria": performance_criteria,
-                "timestamp": datetime.utcnow().isoformat(),
-                "model_used": "gpt-4-turbo-preview",
-            }
+            return self._performance_result(
+                response, language, performance_criteria
+            )
 
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
             raise Exception(str(e))
 
+    async def generate_performance_tests_stream(
+        self,
+        code: str,
+        language: str,
+        performance_criteria: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """Stream generated performance tests as server-sent events.
+
+        Args:
+            code: Source code to generate performance tests for
+            language: Programming language of the code
+            performance_criteria: Optional performance requirements
+
+        Yields:
+            ``token`` events as text arrives, then the final ``result``
+        """
+        prompt = self._create_performance_test_prompt(
+            code, language, performance_criteria
+        )
+        stream = self.model_selector.stream_completion(
+            prompt,
+            task_type="performance_test",
+            system_prompt="Generate performance tests.",
+            token_estimate=get_token_counter().count(prompt),
+            context={"lang": language},
+        )
+        async for event in completion_events(
+            stream,
+            lambda r: self._performance_result(
+                r, language, performance_criteria
+            ),
+        ):
+            yield event
+
+    def _performance_result(
+        self,
+        response: CompletionResponse,
+        language: str,
+        performance_criteria: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Build the performance test result from a completion."""
+        return {
+            "status": "success",
+            "performance_tests": response.content,
+            "language": language,
+            "criteria": performance_criteria,
+            "timestamp": datetime.utcnow().isoformat(),
+            "model_used": response.model,
+        }
+
     def _create_performance_test_prompt(
         self,
         code: str,
@@ -0,0 +1,4 @@
+from .rollups import apply_rollups, query_usage
+from .routes import router as usage_router
+
+__all__ = ["apply_rollups", "query_usage", "usage_router"]
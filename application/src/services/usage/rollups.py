@@ -0,0 +1,191 @@
+"""Hourly token usage and cost rollups of the AI log."""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection, Engine
+
+from application.src.models.database import UsageRollup
+
+# Rollup columns summed on ingest and in queries
+SUMS = (
+    "requests",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "cost",
+    "latency",
+)
+
+# Query dimension -> rollup column
+DIMENSIONS = {
+    "hour": "hour",
+    "model": "model",
+    "provider": "provider",
+    "project_id": "project_id",
+    "user": "tenant",
+}
+
+RollupKey = Tuple[datetime, str, int, str]
+
+
+def truncate_hour(moment: datetime) -> datetime:
+    """Start of the hour containing ``moment``."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def cost_of(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    pricing: Dict[str, Dict[str, float]],
+) -> float:
+    """USD cost of a completion; 0 for models without a price."""
+    prices = pricing.get(model)
+    if not prices:
+        return 0.0
+    return (
+        prompt_tokens * prices.get("prompt", 0.0)
+        + completion_tokens * prices.get("completion", 0.0)
+    ) / 1000
+
+
+def aggregate(
+    rows: Iterable[Dict[str, Any]], pricing: Dict[str, Dict[str, float]]
+) -> Dict[RollupKey, Dict[str, Any]]:
+    """Sum AI log rows into rollup increments.
+
+    Args:
+        rows: ``AILog`` column values
+        pricing: USD per 1K prompt and completion tokens by model
+
+    Returns:
+        Rollup row increment by (hour, model, project_id, tenant)
+    """
+    rollups: Dict[RollupKey, Dict[str, Any]] = {}
+    for row in rows:
+        key = (
+            truncate_hour(row["created_at"]),
+            row.get("model") or "unknown",
+            row.get("project_id") or 0,
+            row.get("tenant") or "anonymous",
+        )
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = {
+                "hour": key[0],
+                "model": key[1],
+                "project_id": key[2],
+                "tenant": key[3],
+                "provider": row.get("provider"),
+                **{column: 0 for column in SUMS},
+            }
+        prompt = row.get("prompt_tokens") or 0
+        completion = row.get("completion_tokens") or 0
+        rollup["requests"] += 1
+        rollup["prompt_tokens"] += prompt
+        rollup["completion_tokens"] += completion
+        rollup["total_tokens"] += row.get("tokens_used") or 0
+        rollup["cost"] += cost_of(key[1], prompt, completion, pricing)
+        rollup["latency"] += row.get("latency") or 0.0
+    return rollups
+
+
+def apply_rollups(
+    connection: Connection,
+    rows: Sequence[Dict[str, Any]],
+    pricing: Dict[str, Dict[str, float]],
+) -> None:
+    """Add AI log rows to the rollups within the caller's transaction.
+
+    Each (hour, model, project, user) touched is one upsert, however
+    many rows it covers.
+    """
+    increments = list(aggregate(rows, pricing).values())
+    if not increments:
+        return
+    table = UsageRollup.__table__
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        _apply_portably(connection, increments)
+        return
+    statement = insert(table).values(increments)
+    statement = statement.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key],
+        set_={
+            "provider": statement.excluded.provider,
+            **{
+                column: table.c[column] + statement.excluded[column]
+                for column in SUMS
+            },
+        },
+    )
+    connection.execute(statement)
+
+
+def _apply_portably(
+    connection: Connection, increments: List[Dict[str, Any]]
+) -> None:
+    """Update-or-insert for databases without ON CONFLICT."""
+    table = UsageRollup.__table__
+    for increment in increments:
+        match = [
+            table.c[column.name] == increment[column.name]
+            for column in table.primary_key
+        ]
+        updated = connection.execute(
+            table.update()
+            .where(*match)
+            .values(
+                {
+                    column: table.c[column] + increment[column]
+                    for column in SUMS
+                }
+            )
+        )
+        if not updated.rowcount:
+            connection.execute(table.insert().values(increment))
+
+
+def query_usage(
+    engine: Engine,
+    start: datetime,
+    end: datetime,
+    group_by: Sequence[str] = ("model",),
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Sum rollups over a time range.
+
+    Args:
+        engine: Database holding the rollups
+        start: Range start; rounded down to the hour
+        end: Range end, exclusive
+        group_by: Dimensions from ``DIMENSIONS`` to break totals down by
+        filters: Dimension -> value rows must match
+
+    Returns:
+        One row of dimension values and summed usage per group
+    """
+    table = UsageRollup.__table__
+    dimensions = [table.c[DIMENSIONS[name]].label(name) for name in group_by]
+    statement = select(
+        *dimensions,
+        *[func.sum(table.c[column]).label(column) for column in SUMS],
+    ).where(table.c.hour >= truncate_hour(start), table.c.hour < end)
+    for name, value in (filters or {}).items():
+        statement = statement.where(table.c[DIMENSIONS[name]] == value)
+    if dimensions:
+        statement = statement.group_by(*dimensions).order_by(*dimensions)
+    with engine.connect() as connection:
+        rows = connection.execute(statement).mappings().all()
+    # An empty range still sums to one row of NULLs
+    return [
+        {**row, **{column: row[column] or 0 for column in SUMS}}
+        for row in rows
+        if row["requests"]
+    ]
@@ -0,0 +1,76 @@
+"""Routes for querying token usage and cost."""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from application.src.models.database import User, get_engine
+from application.src.services.auth_service import get_current_user
+
+from .rollups import DIMENSIONS, SUMS, query_usage
+
+router = APIRouter()
+
+# Roles that may see every user's usage
+ALL_USAGE_ROLES = {"project_manager"}
+
+
+@router.get("")
+async def get_usage(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    group_by: List[str] = Query(["model"]),
+    model: Optional[str] = None,
+    project_id: Optional[int] = None,
+    user: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Return tokens and cost per hour, model, provider, project or user
+    over a time range, by default the last 24 hours
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    unknown = set(group_by) - set(DIMENSIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot group by: {', '.join(sorted(unknown))}",
+        )
+
+    own = f"user:{current_user.id}"
+    if current_user.role not in ALL_USAGE_ROLES:
+        if user not in (None, own):
+            raise HTTPException(
+                status_code=403, detail="Not allowed to view other users"
+            )
+        user = own
+    filters = {
+        name: value
+        for name, value in (
+            ("model", model),
+            ("project_id", project_id),
+            ("user", user),
+        )
+        if value is not None
+    }
+
+    engine = get_engine()
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Database not ready")
+    rows = await asyncio.to_thread(
+        query_usage, engine, start, end, group_by, filters
+    )
+    return {
+        "start": start,
+        "end": end,
+        "group_by": group_by,
+        "rows": rows,
+        "totals": {
+            column: sum(row[column] for row in rows) for column in SUMS
+        },
+    }
@@ -0,0 +1,149 @@
+"""Test suite for admission control."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from application.src.core.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    Overloaded,
+)
+from application.src.core.loop_monitor import LoopMonitor
+
+
+@pytest.fixture
+def monitor():
+    """Loop monitor that is not sampling."""
+    return LoopMonitor()
+
+
+@pytest.fixture
+def controller(monitor):
+    """Controller admitting one generation request and queueing one."""
+    return AdmissionController(
+        {"generation": 1, "default": 10},
+        {"generation": 1, "default": 10},
+        queue_timeout=0.5,
+        max_loop_lag=0.5,
+        loop_monitor=monitor,
+    )
+
+
+@pytest.fixture
+def app(controller):
+    """App with a slow generation route and a health check."""
+    app = FastAPI()
+    app.state.release = asyncio.Event()
+
+    @app.get("/code/generate")
+    async def generate():
+        await app.state.release.wait()
+        return {"status": "success"}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=controller,
+        route_classes={"/code": "generation"},
+        exempt_paths=["/health"],
+    )
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """HTTP client calling the app in-process."""
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+@pytest.mark.asyncio
+async def test_rejects_with_429_when_queue_full(app, client, controller):
+    """Test requests beyond the limit and queue are turned away."""
+    first = asyncio.ensure_future(client.get("/code/generate"))
+    second = asyncio.ensure_future(client.get("/code/generate"))
+    await asyncio.sleep(0.05)
+    state = controller.state("generation")
+    assert (state.in_flight, state.waiting) == (1, 1)
+
+    response = await client.get("/code/generate")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    app.state.release.set()
+    assert (await first).status_code == 200
+    assert (await second).status_code == 200
+    assert state.rejected == 1
+    assert state.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_other_route_classes_unaffected(app, client):
+    """Test a saturated class does not block other routes."""
+    app.state.release.clear()
+    blocked = asyncio.ensure_future(client.get("/code/generate"))
+    await asyncio.sleep(0.05)
+
+    response = await client.get("/unknown")
+    assert response.status_code == 404
+
+    app.state.release.set()
+    await blocked
+
+
+@pytest.mark.asyncio
+async def test_sheds_on_loop_lag_but_not_health(client, monitor):
+    """Test a lagging loop rejects requests except exempt ones."""
+    monitor.record(2.0)
+
+    response = await client.get("/code/generate")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+    health = await client.get("/health")
+    assert health.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_wait_would_exceed_timeout(controller):
+    """Test a request is rejected early if the queue is too slow."""
+    state = controller.state("generation")
+    state.latency = 10.0
+    admitted = await controller.acquire("generation")
+
+    with pytest.raises(Overloaded) as excinfo:
+        await controller.acquire("generation")
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.retry_after == 10
+    controller.release("generation", admitted)
+
+
+@pytest.mark.asyncio
+async def test_times_out_waiting_for_slot(controller):
+    """Test a queued request gives up after the queue timeout."""
+    controller.queue_timeout = 0.01
+    admitted = await controller.acquire("generation")
+
+    with pytest.raises(Overloaded) as excinfo:
+        await controller.acquire("generation")
+    assert excinfo.value.status_code == 503
+    assert controller.state("generation").waiting == 0
+
+    controller.release("generation", admitted)
+    await controller.acquire("generation")
+
+
+def test_retry_after_is_capped(controller):
+    """Test Retry-After stays within bounds."""
+    state = controller.state("generation")
+    state.latency = 1000.0
+    assert controller.retry_after(state) == 60
+    state.latency = 0.001
+    assert controller.retry_after(state) == 1
@@ -0,0 +1,96 @@
+"""Test suite for the AI assistant's requirement analysis."""
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from application.src.core.ai_assistant import AIAssistant
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.ai.scheduler import scheduling
+from application.src.services.cache import SemanticCache
+from application.tests.utils.model_test_utils import (
+    create_mock_client,
+    create_mock_completion,
+    mock_token_usage,
+)
+
+VECTORS = {"Login": [1.0, 0.0], "Sign-in": [0.98, 0.2]}
+
+
+async def embed(text):
+    """Embed a request by the feature its description names."""
+    for feature, vector in VECTORS.items():
+        if feature in text:
+            return vector
+    raise ValueError(f"unexpected request {text}")
+
+
+@pytest.fixture
+def openai_client():
+    """Create a mock OpenAI client answering with a JSON analysis."""
+    client = create_mock_client("openai")
+    client.chat.completions.create.return_value = create_mock_completion(
+        json.dumps({"summary": "login"}), mock_token_usage(50, 30)
+    )
+    return client
+
+
+@pytest.fixture
+def assistant(openai_client, monkeypatch):
+    """Create an assistant with a semantic cache and mock Pinecone."""
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    with patch.multiple(
+        "application.src.core.ai_assistant",
+        pinecone=Mock(list_indexes=Mock(return_value=["ai-sdlc-tasks"])),
+        OpenAIEmbeddings=Mock(),
+        get_semantic_cache=Mock(return_value=SemanticCache(embed)),
+    ):
+        assistant = AIAssistant(
+            LLMClientPool(clients={"openai": openai_client})
+        )
+    assistant.embeddings.aembed_query = AsyncMock(return_value=[0.1])
+    return assistant
+
+
+def indexed_projects(assistant):
+    """Project ids of the analyses upserted to Pinecone, in order."""
+    return [
+        call.kwargs["vectors"][0]["metadata"]["project_id"]
+        for call in assistant.index.upsert.call_args_list
+    ]
+
+
+def project(project_id, description):
+    """Project data for an analysis request."""
+    return {"id": project_id, "name": "Portal", "description": description}
+
+
+@pytest.mark.asyncio
+async def test_reused_analysis_is_indexed_for_requesting_project(
+    assistant, openai_client
+):
+    """Test a semantic hit is still indexed under the new project."""
+    with scheduling(tenant="user:1"):
+        first = await assistant.analyze_requirements(project(1, "Login"))
+        second = await assistant.analyze_requirements(project(2, "Sign-in"))
+
+    assert openai_client.chat.completions.create.await_count == 1
+    assert second["analysis"] == first["analysis"] == {"summary": "login"}
+    assert "semantic_similarity" in second
+    assert indexed_projects(assistant) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_analyses_are_not_shared_between_tenants(
+    assistant, openai_client
+):
+    """Test another user's similar project is analyzed afresh."""
+    with scheduling(tenant="user:1"):
+        await assistant.analyze_requirements(project(1, "Login"))
+    with scheduling(tenant="user:2"):
+        result = await assistant.analyze_requirements(project(2, "Sign-in"))
+
+    assert openai_client.chat.completions.create.await_count == 2
+    assert "semantic_similarity" not in result
+    assert indexed_projects(assistant) == [1, 2]
@@ -0,0 +1,108 @@
+"""Test suite for event loop lag sampling and blocking diagnostics."""
+
+import asyncio
+import logging
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from application.src.core.loop_monitor import (
+    UNATTRIBUTED,
+    BlockingDetector,
+    LoopDiagnosticsMiddleware,
+    LoopMonitor,
+)
+
+
+@pytest.fixture
+def monitor():
+    """Monitor with blocking diagnostics."""
+    return LoopMonitor(
+        interval=0.01, detector=BlockingDetector(threshold=0.05)
+    )
+
+
+@pytest.mark.asyncio
+async def test_measures_lag():
+    """Test a blocked loop shows up as lag."""
+    monitor = LoopMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)
+    await asyncio.sleep(0.02)
+    assert monitor.lag >= 0.05
+    await monitor.stop()
+    assert not monitor.running
+
+
+@pytest.mark.asyncio
+async def test_blocking_route_is_reported(monitor, caplog):
+    """Test a route blocking the loop is logged with its stack."""
+    app = FastAPI()
+
+    @app.get("/block")
+    async def block():
+        time.sleep(0.2)
+        return {}
+
+    @app.get("/fine")
+    async def fine():
+        await asyncio.sleep(0.01)
+        return {}
+
+    app.add_middleware(LoopDiagnosticsMiddleware, detector=monitor.detector)
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+    monitor.start()
+    await asyncio.sleep(0.02)
+    with caplog.at_level(logging.WARNING):
+        await client.get("/fine")
+        await client.get("/block")
+        await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    snapshot = monitor.detector.snapshot()
+    assert snapshot["blocked_seconds"]["GET /block"] >= 0.15
+    assert snapshot["stalls"]["GET /block"] == 1
+    assert "GET /fine" not in snapshot["blocked_seconds"]
+    assert "time.sleep(0.2)" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_child_tasks_inherit_route(monitor):
+    """Test tasks created by a request are attributed to it."""
+    monitor.start()
+    detector = monitor.detector
+    route = type("Route", (), {"path": "/items/{id}"})()
+    detector.track({"method": "POST", "route": route})
+
+    child = asyncio.ensure_future(asyncio.sleep(0))
+    assert detector.route(child) == "POST /items/{id}"
+    await child
+    assert detector.route(None) == UNATTRIBUTED
+    await monitor.stop()
+
+
+def test_short_lag_not_counted():
+    """Test samples below the threshold are not charged."""
+    detector = BlockingDetector(threshold=0.1)
+    detector.record(0.05)
+    assert detector.snapshot() == {"blocked_seconds": {}, "stalls": {}}
+    detector.record(0.2)
+    assert detector.stalls[UNATTRIBUTED] == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_restores_task_factory():
+    """Test the loop is left as found."""
+    loop = asyncio.get_running_loop()
+    previous = loop.get_task_factory()
+    monitor = LoopMonitor(detector=BlockingDetector())
+    monitor.start()
+    assert loop.get_task_factory() is not previous
+    await monitor.stop()
+    assert loop.get_task_factory() is previous
@@ -0,0 +1,104 @@
+"""Test suite for Prometheus metrics."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+
+from application.src.core import metrics
+from application.src.services.ai.model_selector import TokenUsage
+
+
+def sample(name, **labels):
+    """Current value of a metric sample, 0 if absent."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def client():
+    """Client for an app with one parameterized route."""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(metrics.MetricsMiddleware)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+@pytest.mark.asyncio
+async def test_requests_labelled_by_route_template(client):
+    """Test requests are counted per route template and status."""
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    before = sample("http_requests_total", status="200", **labels)
+    observed = sample("http_request_duration_seconds_count", **labels)
+
+    await client.get("/items/1")
+    await client.get("/items/2")
+
+    assert sample("http_requests_total", status="200", **labels) == (
+        before + 2
+    )
+    assert sample("http_request_duration_seconds_count", **labels) == (
+        observed + 2
+    )
+
+
+@pytest.mark.asyncio
+async def test_unmatched_paths_share_a_label(client):
+    """Test unknown paths do not create a series each."""
+    labels = {"method": "GET", "route": metrics.UNMATCHED, "status": "404"}
+    before = sample("http_requests_total", **labels)
+
+    await client.get("/nope/1")
+    await client.get("/nope/2")
+
+    assert sample("http_requests_total", **labels) == before + 2
+
+
+def test_observe_llm_records_latency_and_tokens():
+    """Test provider calls feed latency, first token and token metrics."""
+    labels = {"provider": "openai", "model": "metrics-test"}
+    metrics.observe_llm(
+        "openai", "metrics-test", 1.5, TokenUsage(10, 5, 15), first_token=0.3
+    )
+    metrics.count_llm_failure("openai", "metrics-test")
+
+    assert sample("llm_request_duration_seconds_count", **labels) == 1
+    assert sample("llm_time_to_first_token_seconds_sum", **labels) == 0.3
+    assert sample("llm_tokens_total", kind="prompt", **labels) == 10
+    assert sample("llm_tokens_total", kind="completion", **labels) == 5
+    assert sample("llm_requests_total", outcome="error", **labels) == 1
+
+
+@pytest.mark.asyncio
+async def test_render_includes_sampled_gauges(monkeypatch):
+    """Test a scrape samples queue depth and pool usage."""
+    redis_client = AsyncMock()
+    redis_client.llen.side_effect = [3, 1]
+    queue = SimpleNamespace(
+        redis_client=redis_client,
+        pending_key="jobs:pending",
+        processing_key="jobs:processing",
+    )
+    monkeypatch.setattr(
+        "application.src.services.jobs.queue.get_job_queue", lambda: queue
+    )
+    pool = SimpleNamespace(
+        checkedout=lambda: 2, checkedin=lambda: 3, overflow=lambda: -1
+    )
+    metrics.watch_db_pool(SimpleNamespace(pool=pool))
+
+    text = (await metrics.render_metrics()).decode()
+
+    assert 'job_queue_depth{state="pending"} 3.0' in text
+    assert 'db_pool_connections{state="in_use"} 2.0' in text
+    assert 'db_pool_connections{state="overflow"} 0.0' in text
+    assert "event_loop_lag_seconds" in text
+    metrics.watch_db_pool(None)
@@ -0,0 +1,228 @@
+"""Test suite for offline bulk completions."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.src.services.ai.batch import (
+    BatchJob,
+    BatchRequest,
+    BulkItem,
+    LocalBatchProvider,
+    OpenAIBatchProvider,
+    generate_bulk,
+    run_batch,
+)
+from application.src.services.ai.model_selector import (
+    CompletionResponse,
+    TokenUsage,
+)
+
+
+def completion(content):
+    """Build a gateway completion."""
+    return CompletionResponse(
+        content=content,
+        model="gpt-4",
+        provider="openai",
+        usage=TokenUsage(10, 5, 15),
+        latency=0.1,
+    )
+
+
+def request(custom_id, prompt="prompt"):
+    """Build a batch request."""
+    return BatchRequest(
+        custom_id, "gpt-4", [{"role": "user", "content": prompt}]
+    )
+
+
+def output_line(custom_id, content=None, error=None):
+    """Build a line of an OpenAI batch output file."""
+    if error:
+        return json.dumps(
+            {"custom_id": custom_id, "response": None, "error": error}
+        )
+    body = {
+        "model": "gpt-4",
+        "choices": [{"message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 2},
+    }
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {"status_code": 200, "body": body},
+            "error": None,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_local_provider_round_trip(tmp_path):
+    """Test the file-based stand-in answers every request."""
+
+    async def respond(body):
+        if body["messages"][-1]["content"] == "bad":
+            raise Exception("refused")
+        return completion(body["messages"][-1]["content"].upper())
+
+    provider = LocalBatchProvider(str(tmp_path), respond)
+
+    outcomes = await run_batch(
+        provider, [request("a", "hi"), request("b", "bad")], poll_interval=0
+    )
+
+    assert outcomes["a"].content == "HI"
+    assert outcomes["a"].usage.total_tokens == 15
+    assert outcomes["b"] == "refused"
+    (batch_dir,) = tmp_path.iterdir()
+    lines = (batch_dir / "input.jsonl").read_text().splitlines()
+    assert json.loads(lines[0])["url"] == "/v1/chat/completions"
+
+
+def batch(status, output_file_id=None, error_file_id=None, errors=None):
+    """Build an OpenAI batch object."""
+    return SimpleNamespace(
+        id="b1",
+        status=status,
+        output_file_id=output_file_id,
+        error_file_id=error_file_id,
+        errors=errors,
+    )
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_polls_until_done():
+    """Test batches are uploaded as JSONL and polled to completion."""
+    client = Mock()
+    client.files.create = AsyncMock(return_value=SimpleNamespace(id="f1"))
+    client.batches.create = AsyncMock(
+        return_value=SimpleNamespace(id="b1", status="validating")
+    )
+    client.batches.retrieve = AsyncMock(
+        side_effect=[
+            batch("in_progress"),
+            batch("expired", output_file_id="f2"),
+        ]
+    )
+    client.files.content = AsyncMock(
+        return_value=SimpleNamespace(text=output_line("a", "done") + "\n")
+    )
+    provider = OpenAIBatchProvider(client)
+
+    outcomes = await run_batch(
+        provider, [request("a"), request("b")], poll_interval=0
+    )
+
+    assert outcomes["a"].content == "done"
+    assert outcomes["a"].usage.prompt_tokens == 3
+    assert outcomes["b"] == "Not processed: batch expired"
+    name, data = client.files.create.call_args.kwargs["file"]
+    assert [json.loads(line)["custom_id"] for line in data.splitlines()] == [
+        "a",
+        "b",
+    ]
+    assert client.batches.create.call_args.kwargs["input_file_id"] == "f1"
+
+
+@pytest.mark.asyncio
+async def test_generate_bulk_submits_only_misses():
+    """Test cached items are skipped and new results are cached."""
+    cache = Mock()
+    cache.get_many = AsyncMock(
+        return_value={"hit": {"code": "cached"}, "miss": None, "bad": None}
+    )
+    cache.set_many = AsyncMock()
+    provider = Mock(name="provider")
+    provider.name = "openai"
+    provider.submit = AsyncMock(return_value=BatchJob("b1", "completed"))
+    provider.read_output = AsyncMock(
+        return_value="\n".join(
+            [
+                output_line("request-0", "new"),
+                output_line("request-1", error={"message": "too long"}),
+            ]
+        )
+    )
+
+    def item(key):
+        return BulkItem(
+            key, request(""), lambda r: {"code": r.content, "key": key}
+        )
+
+    results = await generate_bulk(
+        cache, provider, [item("hit"), item("miss"), item("bad"), item("miss")]
+    )
+
+    assert results == [
+        {"code": "cached"},
+        {"code": "new", "key": "miss"},
+        {"status": "error", "error": "too long"},
+        {"code": "new", "key": "miss"},
+    ]
+    submitted = provider.submit.call_args.args[0]
+    assert [r.custom_id for r in submitted] == ["request-0", "request-1"]
+    cache.set_many.assert_awaited_once_with(
+        {"miss": {"code": "new", "key": "miss"}}
+    )
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_reads_error_file():
+    """Test each failed request reports its own error."""
+    client = Mock()
+    client.files.create = AsyncMock(return_value=SimpleNamespace(id="f1"))
+    client.batches.create = AsyncMock(return_value=batch("validating"))
+    client.batches.retrieve = AsyncMock(
+        return_value=batch("completed", "f2", "f3")
+    )
+    failed = json.dumps(
+        {
+            "custom_id": "b",
+            "response": {
+                "status_code": 400,
+                "body": {"error": {"message": "max_tokens is too large"}},
+            },
+            "error": None,
+        }
+    )
+    files = {
+        "f2": output_line("a", "done") + "\n",
+        "f3": failed + "\n",
+    }
+    client.files.content = AsyncMock(
+        side_effect=lambda file_id: SimpleNamespace(text=files[file_id])
+    )
+
+    outcomes = await run_batch(
+        OpenAIBatchProvider(client),
+        [request("a"), request("b")],
+        poll_interval=0,
+    )
+
+    assert outcomes["a"].content == "done"
+    assert outcomes["b"] == "max_tokens is too large"
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_reports_its_errors():
+    """Test requests of a batch that failed validation carry the reason."""
+    client = Mock()
+    client.files.create = AsyncMock(return_value=SimpleNamespace(id="f1"))
+    client.batches.create = AsyncMock(return_value=batch("validating"))
+    errors = SimpleNamespace(
+        data=[SimpleNamespace(message="Model gpt-5 not found")]
+    )
+    client.batches.retrieve = AsyncMock(
+        return_value=batch("failed", errors=errors)
+    )
+
+    outcomes = await run_batch(
+        OpenAIBatchProvider(client), [request("a")], poll_interval=0
+    )
+
+    assert (
+        outcomes["a"] == "Not processed: batch failed: Model gpt-5 not found"
+    )
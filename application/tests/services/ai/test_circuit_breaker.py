@@ -0,0 +1,198 @@
+"""Test suite for the per-model circuit breaker."""
+
+import pytest
+
+from application.src.core.config import Settings
+from application.src.services.ai.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.ai.model_selector import ModelSelector
+from application.tests.utils.model_test_utils import (
+    create_mock_client,
+    create_mock_completion,
+    mock_token_usage,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Create a fake clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    """Create a breaker that opens after two of four calls fail."""
+    return CircuitBreaker(
+        "gpt-4",
+        failure_rate=0.5,
+        min_calls=4,
+        cooldown_seconds=30,
+        slow_call_seconds=10,
+        clock=clock,
+    )
+
+
+def test_breaker_opens_on_error_rate(breaker):
+    """Test the circuit opens once the failure rate is reached."""
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+
+def test_slow_calls_count_as_failures(breaker):
+    """Test calls above the slow-call threshold count as failures."""
+    for _ in range(4):
+        breaker.record_success(15.0)
+
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_half_open_probe_closes_circuit(breaker, clock):
+    """Test a successful probe after cool-down closes the circuit."""
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 31
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # Only one probe at a time
+
+    breaker.record_success(0.1)
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_probe_failure_reopens(breaker, clock):
+    """Test a failed probe re-opens the circuit for another cool-down."""
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 31
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    clock.now = 45
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_window_drops_old_calls(breaker, clock):
+    """Test calls outside the rolling window are forgotten."""
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 120
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.fixture
+def openai_client():
+    """Create a mock OpenAI client."""
+    return create_mock_client("openai")
+
+
+@pytest.fixture
+def model_selector(openai_client):
+    """Create ModelSelector backed by a mock OpenAI client."""
+    return ModelSelector(
+        Settings(),
+        client_pool=LLMClientPool(clients={"openai": openai_client}),
+    )
+
+
+def open_circuit(model_selector, model_name):
+    """Force a model's circuit open."""
+    breaker = model_selector.breaker(model_name)
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+
+
+def test_select_model_skips_open_circuit(model_selector):
+    """Test selection skips models whose circuit is open."""
+    open_circuit(model_selector, "gpt-4-turbo-preview")
+
+    model = model_selector.select_model("test_generation")
+
+    assert model["name"] == "gpt-4-0125-preview"
+
+
+def test_get_fallback_model_skips_open_circuit(model_selector):
+    """Test fallback skips models whose circuit is open."""
+    open_circuit(model_selector, "gpt-4-0125-preview")
+
+    fallback = model_selector.get_fallback_model("gpt-4-turbo-preview")
+
+    assert fallback["name"] == "gpt-4"
+
+
+@pytest.mark.asyncio
+async def test_gateway_skips_open_circuit(model_selector, openai_client):
+    """Test the gateway never calls a model with an open circuit."""
+    create = openai_client.chat.completions.create
+    create.return_value = create_mock_completion("ok", mock_token_usage(5, 5))
+    open_circuit(model_selector, "gpt-4-turbo-preview")
+
+    response = await model_selector.generate_completion(
+        "test prompt", model="openai"
+    )
+
+    assert response.model == "gpt-4-0125-preview"
+    assert create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_gateway_all_circuits_open(model_selector, openai_client):
+    """Test the gateway fails fast when every circuit is open."""
+    for name in ["gpt-4-turbo-preview", "gpt-4-0125-preview", "gpt-4"]:
+        open_circuit(model_selector, name)
+
+    with pytest.raises(CircuitOpenError):
+        await model_selector.generate_completion("test prompt", model="openai")
+
+    openai_client.chat.completions.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_gateway_records_failures(model_selector, openai_client):
+    """Test repeated provider errors open the model's circuit."""
+    openai_client.chat.completions.create.side_effect = Exception("down")
+
+    for _ in range(5):
+        with pytest.raises(Exception):
+            await model_selector.generate_completion(
+                "test prompt", model="gpt-4"
+            )
+
+    assert not model_selector.is_available("gpt-4")
+
+
+def test_primary_model_ignores_open_circuit(model_selector):
+    """Test the configured route is reported whatever the circuit state."""
+    open_circuit(model_selector, "gpt-4-turbo-preview")
+
+    model = model_selector.primary_model("test_generation")
+
+    assert model["name"] == "gpt-4-turbo-preview"
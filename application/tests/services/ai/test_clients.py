@@ -0,0 +1,81 @@
+"""Test suite for the shared async LLM client pool."""
+
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+from application.src.core.config import Settings
+from application.src.services.ai.clients import LLMClientPool
+from application.tests.utils.model_test_utils import setup_model_environment
+
+
+@pytest.fixture
+def client_pool():
+    """Create an LLMClientPool with test credentials."""
+    with patch.dict(os.environ, setup_model_environment()):
+        yield LLMClientPool(Settings())
+
+
+def test_openai_client_is_async_and_shared(client_pool):
+    """Test OpenAI client is created once and reused."""
+    client = client_pool.get_client("openai")
+
+    assert client.__class__.__name__ == "AsyncOpenAI"
+    assert client_pool.get_client("openai") is client
+
+
+def test_openai_client_helicone_headers(client_pool):
+    """Test Helicone headers are applied to the shared OpenAI client."""
+    headers = client_pool.get_client("openai").default_headers
+
+    assert headers["Helicone-Auth"] == "Bearer test-helicone-key"
+    assert headers["Helicone-Cache-Enabled"] == "true"
+    assert headers["Helicone-Cache-TTL"] == "3600"
+    assert headers["X-Custom-Header"] == "nu-cron"
+
+
+def test_clients_share_http_transport(client_pool):
+    """Test provider clients reuse the pool's HTTP transport."""
+    anthropic_client = client_pool.get_client("anthropic")
+
+    http_client = client_pool.http_client
+    assert client_pool.get_client("openai")._client is http_client
+    assert anthropic_client.__class__.__name__ == "AsyncAnthropic"
+    assert anthropic_client._client is http_client
+
+
+def test_injected_clients_are_used():
+    """Test pre-built clients bypass client construction."""
+    mock_client = Mock()
+    client_pool = LLMClientPool(clients={"openai": mock_client})
+
+    assert client_pool.get_client("openai") is mock_client
+
+
+def test_missing_api_key():
+    """Test missing OpenAI key is reported on first use."""
+    with patch.dict(os.environ, {}, clear=True):
+        client_pool = LLMClientPool(Settings())
+        with pytest.raises(ValueError) as exc_info:
+            client_pool.get_client("openai")
+    assert "OPENAI_API_KEY" in str(exc_info.value)
+
+
+def test_unsupported_provider(client_pool):
+    """Test requesting an unknown provider fails."""
+    with pytest.raises(ValueError) as exc_info:
+        client_pool.get_client("unknown")
+    assert "Unsupported provider" in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_aclose_releases_transport(client_pool):
+    """Test closing the pool closes the shared transport."""
+    http_client = client_pool.http_client
+    client_pool.get_client("openai")
+
+    await client_pool.aclose()
+
+    assert http_client.is_closed
+    assert client_pool._clients == {}
@@ -0,0 +1,181 @@
+"""Test suite for the ModelSelector completion gateway."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.src.core.config import Settings
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.ai.model_selector import ModelSelector
+from application.tests.utils.model_test_utils import (
+    create_mock_client,
+    create_mock_completion,
+    mock_token_usage,
+)
+
+
+def create_mock_claude_message(content: str, tokens: dict) -> Mock:
+    """Create a mock Anthropic messages response."""
+    message = Mock()
+    message.content = [Mock(text=content)]
+    message.usage = {
+        "input_tokens": tokens["prompt_tokens"],
+        "output_tokens": tokens["completion_tokens"],
+    }
+    return message
+
+
+@pytest.fixture
+def clients():
+    """Create mock provider clients."""
+    return {
+        "openai": create_mock_client("openai"),
+        "anthropic": create_mock_client("claude"),
+        "mistral": create_mock_client("mistral"),
+    }
+
+
+@pytest.fixture
+def model_selector(clients):
+    """Create ModelSelector backed by mock provider clients."""
+    return ModelSelector(
+        Settings(), client_pool=LLMClientPool(clients=clients)
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_completion_success(model_selector, clients):
+    """Test completion is normalized with content and usage."""
+    tokens = mock_token_usage(50, 30)
+    create = clients["openai"].chat.completions.create
+    create.return_value = create_mock_completion("Generated", tokens)
+
+    response = await model_selector.generate_completion(
+        "test prompt", model="openai", system_prompt="Be brief."
+    )
+
+    assert response.content == "Generated"
+    assert response.model == "gpt-4-turbo-preview"
+    assert response.provider == "openai"
+    assert response.usage.total_tokens == 80
+    assert response.failed_models == []
+    messages = create.call_args.kwargs["messages"]
+    assert messages[0] == {"role": "system", "content": "Be brief."}
+
+
+@pytest.mark.asyncio
+async def test_completions_are_queued_for_ai_log(clients):
+    """Test successful completions are handed to the AI log writer."""
+    usage_log = Mock(record=AsyncMock())
+    model_selector = ModelSelector(
+        Settings(),
+        client_pool=LLMClientPool(clients=clients),
+        usage_log=usage_log,
+    )
+    create = clients["openai"].chat.completions.create
+    create.side_effect = [
+        Exception("Primary model error"),
+        create_mock_completion("Generated", mock_token_usage(50, 30)),
+    ]
+
+    await model_selector.generate_completion("test prompt", model="openai")
+
+    fields = usage_log.record.call_args.kwargs
+    assert fields["prompt"] == "test prompt"
+    assert fields["response"] == "Generated"
+    assert fields["tokens_used"] == 80
+    assert fields["model"] == "gpt-4-0125-preview"
+    assert fields["failed_models"] == ["gpt-4-turbo-preview"]
+    assert fields["tenant"] == "anonymous"
+
+
+@pytest.mark.asyncio
+async def test_generate_completion_walks_fallback_chain(
+    model_selector, clients
+):
+    """Test the provider fallback_chain is tried in order."""
+    tokens = mock_token_usage(40, 20)
+    create = clients["openai"].chat.completions.create
+    create.side_effect = [
+        Exception("Primary model error"),
+        Exception("Fallback model error"),
+        create_mock_completion("Last resort", tokens),
+    ]
+
+    response = await model_selector.generate_completion(
+        "test prompt", model="openai"
+    )
+
+    assert response.content == "Last resort"
+    assert response.model == "gpt-4"
+    assert response.failed_models == [
+        "gpt-4-turbo-preview",
+        "gpt-4-0125-preview",
+    ]
+    models = [call.kwargs["model"] for call in create.call_args_list]
+    assert models == ["gpt-4-turbo-preview", "gpt-4-0125-preview", "gpt-4"]
+
+
+@pytest.mark.asyncio
+async def test_generate_completion_cross_provider(model_selector, clients):
+    """Test fallback providers are tried after the primary chain."""
+    tokens = mock_token_usage(45, 25)
+    clients["openai"].chat.completions.create.side_effect = Exception(
+        "OpenAI down"
+    )
+    claude_message = create_mock_claude_message("Claude response", tokens)
+    clients["anthropic"].messages.create.return_value = claude_message
+
+    response = await model_selector.generate_completion(
+        "test prompt",
+        model="openai",
+        fallback_providers=["claude", "mistral"],
+    )
+
+    assert response.content == "Claude response"
+    assert response.provider == "anthropic"
+    assert response.usage.total_tokens == tokens["total_tokens"]
+    clients["mistral"].chat.completions.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_generate_completion_selects_by_task(model_selector, clients):
+    """Test model is selected by token estimate when not given."""
+    tokens = mock_token_usage(10, 10)
+    create = clients["openai"].chat.completions.create
+    create.return_value = create_mock_completion("Large", tokens)
+
+    response = await model_selector.generate_completion(
+        "test prompt", task_type="test_generation", token_estimate=5000
+    )
+
+    assert response.model == "gpt-4"
+    assert create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_completion_accumulates_usage(model_selector, clients):
+    """Test token usage is accumulated per model."""
+    create = clients["openai"].chat.completions.create
+    create.return_value = create_mock_completion("ok", mock_token_usage(10, 5))
+
+    await model_selector.generate_completion("one", model="openai")
+    await model_selector.generate_completion("two", model="openai")
+
+    usage = model_selector.token_usage["gpt-4-turbo-preview"]
+    assert usage.prompt_tokens == 20
+    assert usage.total_tokens == 30
+
+
+@pytest.mark.asyncio
+async def test_generate_completion_all_fail(model_selector, clients):
+    """Test the last provider error is raised when every model fails."""
+    clients["openai"].chat.completions.create = AsyncMock(
+        side_effect=Exception("Model error")
+    )
+
+    with pytest.raises(Exception) as exc_info:
+        await model_selector.generate_completion("test prompt", model="openai")
+
+    assert "Model error" in str(exc_info.value)
+    assert clients["openai"].chat.completions.create.call_count == 3
@@ -0,0 +1,191 @@
+"""Test suite for hedged requests across the model fallback chain."""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from application.src.core.config import Settings
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.ai.latency import LatencyWindow
+from application.src.services.ai.model_selector import ModelSelector
+from application.tests.utils.model_test_utils import (
+    create_mock_client,
+    create_mock_completion,
+    mock_token_usage,
+)
+
+
+@pytest.fixture
+def openai_client():
+    """Create a mock OpenAI client."""
+    return create_mock_client("openai")
+
+
+@pytest.fixture
+def model_selector(openai_client):
+    """Create ModelSelector with hedging enabled and a short delay."""
+    settings = Settings(LLM_HEDGING_ENABLED=True, LLM_HEDGE_DELAY=0.01)
+    return ModelSelector(
+        settings, client_pool=LLMClientPool(clients={"openai": openai_client})
+    )
+
+
+def delayed_responses(delays: dict, cancelled: list):
+    """Build a create() side effect answering each model after a delay."""
+
+    async def create(model, **kwargs):
+        try:
+            await asyncio.sleep(delays[model])
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return create_mock_completion(model, mock_token_usage(10, 5))
+
+    return create
+
+
+@pytest.mark.asyncio
+async def test_hedge_fires_when_primary_stalls(model_selector, openai_client):
+    """Test a stalled primary is hedged and the loser cancelled."""
+    cancelled = []
+    openai_client.chat.completions.create.side_effect = delayed_responses(
+        {"gpt-4-turbo-preview": 5, "gpt-4-0125-preview": 0}, cancelled
+    )
+
+    response = await model_selector.generate_completion(
+        "test prompt", model="openai"
+    )
+    await asyncio.sleep(0)
+
+    assert response.model == "gpt-4-0125-preview"
+    assert cancelled == ["gpt-4-turbo-preview"]
+
+
+@pytest.mark.asyncio
+async def test_losing_hedge_cancelled_before_logging(openai_client):
+    """Test a slow AI log write does not keep the losing hedge running."""
+    cancelled, cancelled_when_logged = [], []
+
+    async def record(**fields):
+        await asyncio.sleep(0.05)  # The writer's queue is full
+        cancelled_when_logged.extend(cancelled)
+
+    model_selector = ModelSelector(
+        Settings(LLM_HEDGING_ENABLED=True, LLM_HEDGE_DELAY=0.01),
+        client_pool=LLMClientPool(clients={"openai": openai_client}),
+        usage_log=Mock(record=record),
+    )
+    openai_client.chat.completions.create.side_effect = delayed_responses(
+        {"gpt-4-turbo-preview": 5, "gpt-4-0125-preview": 0}, cancelled
+    )
+
+    response = await model_selector.generate_completion(
+        "test prompt", model="openai"
+    )
+
+    assert response.model == "gpt-4-0125-preview"
+    assert cancelled_when_logged == ["gpt-4-turbo-preview"]
+
+
+@pytest.mark.asyncio
+async def test_calls_finishing_together_are_all_recorded(
+    model_selector, openai_client
+):
+    """Test a failure finishing with the winner is counted, not relaunched."""
+    release = asyncio.Event()
+    called = []
+
+    async def create(model, **kwargs):
+        called.append(model)
+        if len(called) == 2:
+            release.set()
+        await release.wait()
+        if model == "gpt-4-turbo-preview":
+            raise Exception("Primary model error")
+        return create_mock_completion(model, mock_token_usage(10, 5))
+
+    openai_client.chat.completions.create.side_effect = create
+    wait = asyncio.wait
+
+    async def winner_first(*args, **kwargs):
+        # Finished calls come back as a set; fix the order to winner first
+        done, pending = await wait(*args, **kwargs)
+        ordered = sorted(done, key=lambda task: task.exception() is not None)
+        return ordered, pending
+
+    with patch("asyncio.wait", new=winner_first):
+        response = await model_selector.generate_completion(
+            "test prompt", model="openai"
+        )
+
+    assert response.model == "gpt-4-0125-preview"
+    assert response.failed_models == ["gpt-4-turbo-preview"]
+    assert model_selector.breaker("gpt-4-turbo-preview")._calls[-1][1]
+    assert called == ["gpt-4-turbo-preview", "gpt-4-0125-preview"]
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_primary_is_fast(model_selector, openai_client):
+    """Test a fast primary answers without firing a hedge."""
+    openai_client.chat.completions.create.side_effect = delayed_responses(
+        {"gpt-4-turbo-preview": 0}, []
+    )
+
+    response = await model_selector.generate_completion(
+        "test prompt", model="openai"
+    )
+
+    assert response.model == "gpt-4-turbo-preview"
+    assert openai_client.chat.completions.create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_hedging_disabled_waits_for_primary(
+    model_selector, openai_client
+):
+    """Test requests stay sequential when hedging is turned off."""
+    openai_client.chat.completions.create.side_effect = delayed_responses(
+        {"gpt-4-turbo-preview": 0.05}, []
+    )
+
+    response = await model_selector.generate_completion(
+        "test prompt", model="openai", hedge=False
+    )
+
+    assert response.model == "gpt-4-turbo-preview"
+    assert openai_client.chat.completions.create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_falls_through(model_selector, openai_client):
+    """Test failures while hedging move on to the remaining models."""
+
+    async def create(model, **kwargs):
+        if model == "gpt-4":
+            return create_mock_completion(model, mock_token_usage(10, 5))
+        raise Exception(f"{model} error")
+
+    openai_client.chat.completions.create.side_effect = create
+
+    response = await model_selector.generate_completion(
+        "test prompt", model="openai"
+    )
+
+    assert response.model == "gpt-4"
+    assert set(response.failed_models) == {
+        "gpt-4-turbo-preview",
+        "gpt-4-0125-preview",
+    }
+
+
+def test_hedge_delay_uses_latency_percentile(model_selector):
+    """Test hedge delay follows the observed latency percentile."""
+    assert model_selector.hedge_delay("gpt-4") == 0.01
+
+    window = LatencyWindow()
+    for i in range(1, 101):
+        window.record(i / 100)
+    model_selector.latencies["gpt-4"] = window
+
+    assert model_selector.hedge_delay("gpt-4") == 0.95
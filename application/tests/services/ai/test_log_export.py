@@ -0,0 +1,96 @@
+"""Test suite for the Parquet export of AI logs."""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from application.src.models.database import AILog
+from application.src.services.ai.blob_store import LocalBlobStore
+from application.src.services.ai.log_export import LogExporter
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def insert(engine, *created_at, **fields):
+    """Insert one AI log per creation time."""
+    rows = [
+        {
+            "model": "gpt-4",
+            "provider": "openai",
+            "prompt": "prompt",
+            "response": "answer",
+            "tokens_used": 15,
+            "latency": 0.5,
+            "tenant": "user:1",
+            "created_at": moment,
+            **fields,
+        }
+        for moment in created_at
+    ]
+    with engine.begin() as connection:
+        connection.execute(AILog.__table__.insert(), rows)
+
+
+def read(root):
+    """All exported rows, by id."""
+    table = pq.read_table(root)
+    return sorted(table.to_pylist(), key=lambda row: row["id"])
+
+
+def test_exports_partitioned_by_day(engine, tmp_path):
+    """Test rows are written per day with model names dictionary-encoded."""
+    insert(
+        engine,
+        datetime(2026, 1, 1, 10),
+        datetime(2026, 1, 2, 10),
+        failed_models=["gpt-4-turbo-preview"],
+    )
+    exporter = LogExporter(engine, str(tmp_path), batch_size=1)
+
+    assert exporter.run() == 2
+    assert sorted(os.listdir(tmp_path)) == [
+        "_watermark.json",
+        "date=2026-01-01",
+        "date=2026-01-02",
+    ]
+    rows = read(str(tmp_path))
+    assert [row["id"] for row in rows] == [1, 2]
+    assert rows[0]["model"] == "gpt-4"
+    assert rows[0]["prompt_bytes"] == len("prompt")
+    assert rows[0]["failed_models"] == ["gpt-4-turbo-preview"]
+    schema = pq.read_schema(
+        os.path.join(tmp_path, "date=2026-01-01", "part-000000000001.parquet")
+    )
+    assert str(schema.field("model").type).startswith("dictionary")
+    assert exporter.watermark == 2
+
+
+def test_runs_are_incremental_and_wait_for_settling(engine, tmp_path):
+    """Test each run exports only new rows older than the settle time."""
+    old = datetime.utcnow() - timedelta(hours=1)
+    insert(engine, old, old)
+    exporter = LogExporter(engine, str(tmp_path), settle=60)
+    assert exporter.run() == 2
+
+    insert(engine, old, datetime.utcnow(), old)
+    assert exporter.run() == 1
+    assert exporter.watermark == 3
+
+    restarted = LogExporter(engine, str(tmp_path), settle=0)
+    assert restarted.run() == 2
+    assert [row["id"] for row in read(str(tmp_path))] == [1, 2, 3, 4, 5]
+
+
+def test_offloaded_bodies_are_resolved(engine, tmp_path):
+    """Test bodies kept in the blob store are exported in full."""
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    digest = store.put("x" * 1000)
+    insert(engine, datetime(2026, 1, 1), prompt=None, prompt_blob=digest)
+    root = str(tmp_path / "export")
+    LogExporter(engine, root, blob_store=store).run()
+
+    (row,) = read(root)
+    assert row["prompt"] == "x" * 1000
+    assert row["prompt_bytes"] == 1000
+    assert row["prompt_blob"] == digest
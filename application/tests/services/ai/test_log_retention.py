@@ -0,0 +1,91 @@
+"""Test suite for AI log retention and offloaded bodies."""
+
+import os
+import time
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from application.src.models import partitions
+from application.src.models.migrate import upgrade
+from application.src.services.ai.blob_store import LocalBlobStore
+from application.src.services.ai.log_retention import run_retention
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Blob store in a temporary directory."""
+    return LocalBlobStore(str(tmp_path))
+
+
+def blob_files(store):
+    """Paths of every stored blob."""
+    return [
+        os.path.join(directory, name)
+        for directory, _, files in os.walk(store.root)
+        for name in files
+    ]
+
+
+def test_blobs_round_trip_and_deduplicate(store):
+    """Test texts are read back and identical texts stored once."""
+    text = "system prompt " * 1000
+    digest = store.put(text)
+
+    assert store.put(text) == digest == LocalBlobStore.digest(text)
+    assert store.get(digest) == text
+    assert len(blob_files(store)) == 1
+    assert store.get("0" * 64) is None
+
+
+def test_sweep_deletes_unreferenced_blobs(store):
+    """Test only blobs not referenced recently are swept."""
+    old = store.put("old body")
+    kept = store.put("kept body")
+    month_ago = time.time() - 31 * 86400
+    for digest in (old, kept):
+        path = store._path(digest)
+        os.utime(path, (month_ago, month_ago))
+    # Referencing a blob again keeps it
+    store.put("kept body")
+
+    assert store.sweep(30 * 86400) == 1
+    assert store.get(old) is None
+    assert store.get(kept) == "kept body"
+
+
+def test_partition_months():
+    """Test month arithmetic and partition names."""
+    assert partitions.month_start(date(2026, 3, 17)) == date(2026, 3, 1)
+    assert partitions.add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert partitions.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partitions.partition_name(date(2026, 1, 1)) == "ai_logs_y2026m01"
+
+
+def test_retention_fails_on_unpartitioned_postgres(store):
+    """Test retention refuses to silently keep logs on PostgreSQL."""
+    engine = MagicMock()
+    connection = engine.begin.return_value.__enter__.return_value
+    connection.dialect.name = "postgresql"
+
+    with patch.object(partitions, "is_partitioned", return_value=False):
+        with pytest.raises(RuntimeError, match="not partitioned"):
+            run_retention(engine, store, retention_months=6)
+
+
+def test_migrate_applies_every_revision(tmp_path):
+    """Test the deploy migration creates the tables and reaches head."""
+    database_url = f"sqlite:///{tmp_path / 'app.db'}"
+    upgrade(database_url)
+    upgrade(database_url)
+
+    with create_engine(database_url).connect() as connection:
+        version = connection.execute(
+            text("SELECT version_num FROM alembic_version")
+        ).scalar()
+        columns = connection.execute(text("PRAGMA table_info(ai_logs)"))
+        names = {row[1] for row in columns}
+    assert version == "e4b8a2f6c913"
+    assert {"prompt_blob", "response_blob", "failed_models"} <= names
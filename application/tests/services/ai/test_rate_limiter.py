@@ -0,0 +1,202 @@
+"""Test suite for provider token-bucket rate limiting."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from redis.exceptions import RedisError
+
+from application.src.core.config import Settings
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.ai.model_selector import ModelSelector
+from application.src.services.ai.rate_limiter import (
+    RateLimiter,
+    RedisRateLimiter,
+    TokenBucket,
+)
+from application.src.services.ai.scheduler import BATCH, scheduling
+from application.src.services.ai.token_counter import get_token_counter
+from application.tests.utils.model_test_utils import (
+    create_mock_client,
+    create_mock_completion,
+    mock_token_usage,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_allows_burst_up_to_capacity():
+    """Test a full bucket admits requests without waiting."""
+    bucket = TokenBucket(3, 1.0, clock=FakeClock())
+
+    assert [bucket.reserve(1) for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_token_bucket_queues_in_arrival_order():
+    """Test each caller past capacity waits behind the previous one."""
+    bucket = TokenBucket(2, 1.0, clock=FakeClock())
+    bucket.reserve(2)
+
+    assert bucket.reserve(1) == 1.0
+    assert bucket.reserve(1) == 2.0
+
+
+def test_token_bucket_refills_over_time():
+    """Test tokens are replenished at the refill rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(2, 1.0, clock=clock)
+    bucket.reserve(2)
+    clock.now = 1.5
+
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(0.5)
+
+
+def test_limits_for_model():
+    """Test provider quotas and variant limits resolve to their scopes."""
+    settings = Settings()
+    settings.OPENAI_MODELS["gpt-4"]["tpm"] = 1000
+    limiter = RateLimiter(settings)
+
+    assert limiter.limits_for("openai", "gpt-4") == {
+        "openai": {
+            "rpm": settings.AI_MODELS["openai"]["rpm"],
+            "tpm": settings.AI_MODELS["openai"]["tpm"],
+        },
+        "openai:gpt-4": {"tpm": 1000},
+    }
+    assert limiter.limits_for("unknown", "model") == {}
+
+
+@pytest.mark.asyncio
+async def test_provider_quota_shared_by_models():
+    """Test every model of a provider draws on one provider quota."""
+    settings = Settings()
+    settings.AI_MODELS["openai"]["tpm"] = 600  # 10 tokens per second
+    settings.RATE_LIMIT_LANE_SHARES = {}
+    limiter = RateLimiter(settings)
+
+    with patch("asyncio.sleep", new=AsyncMock()):
+        await limiter.acquire("openai", "gpt-4", 600)
+        wait = await limiter.acquire("openai", "gpt-4-turbo-preview", 100)
+
+    assert wait == pytest.approx(10.0, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_tokens():
+    """Test acquire sleeps when the token budget is exhausted."""
+    settings = Settings()
+    settings.AI_MODELS["openai"]["tpm"] = 600  # 10 tokens per second
+    settings.RATE_LIMIT_LANE_SHARES = {}
+    limiter = RateLimiter(settings)
+
+    with patch("asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        first = await limiter.acquire("openai", "gpt-4", 600)
+        second = await limiter.acquire("openai", "gpt-4", 100)
+
+    assert first == 0.0
+    assert second == pytest.approx(10.0, abs=0.1)
+    mock_sleep.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_backlog_does_not_delay_interactive_calls():
+    """Test a saturated batch lane leaves the interactive budget intact."""
+    settings = Settings()
+    settings.AI_MODELS["openai"]["tpm"] = 600  # 10 tokens per second
+    settings.RATE_LIMIT_LANE_SHARES = {"interactive": 0.5, "batch": 0.5}
+    limiter = RateLimiter(settings)
+
+    with patch("asyncio.sleep", new=AsyncMock()):
+        with scheduling(lane=BATCH):
+            batch_waits = [
+                await limiter.acquire("openai", "gpt-4", 300) for _ in range(5)
+            ]
+        interactive = await limiter.acquire("openai", "gpt-4", 100)
+        unknown = await limiter.acquire("openai", "gpt-4", 100, lane="bulk")
+
+    assert batch_waits[-1] == pytest.approx(240.0, abs=0.1)
+    assert interactive == 0.0
+    assert unknown == 0.0
+
+
+@pytest.mark.asyncio
+async def test_acquire_unlimited_model():
+    """Test models without configured limits are never delayed."""
+    limiter = RateLimiter(Settings())
+
+    assert await limiter.acquire("custom", "model", 10**9) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_uses_shared_bucket():
+    """Test the Redis limiter reserves through the atomic script."""
+    script = AsyncMock(side_effect=[0, 1500])
+    redis_client = Mock()
+    redis_client.register_script.return_value = script
+    limiter = RedisRateLimiter(Settings(), redis_client)
+
+    with patch("asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        wait = await limiter.acquire("openai", "gpt-4", 100)
+
+    assert wait == 1.5
+    mock_sleep.assert_awaited_once_with(1.5)
+    keys = [call.kwargs["keys"][0] for call in script.call_args_list]
+    assert keys == [
+        "ratelimit:openai:interactive:rpm",
+        "ratelimit:openai:interactive:tpm",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_falls_back_to_local_bucket():
+    """Test a Redis outage limits locally instead of failing the call."""
+    script = AsyncMock(side_effect=RedisError("down"))
+    redis_client = Mock()
+    redis_client.register_script.return_value = script
+    settings = Settings()
+    settings.AI_MODELS["openai"]["tpm"] = 600
+    settings.RATE_LIMIT_LANE_SHARES = {}
+    limiter = RedisRateLimiter(settings, redis_client)
+
+    with patch("asyncio.sleep", new=AsyncMock()):
+        first = await limiter.acquire("openai", "gpt-4", 600)
+        second = await limiter.acquire("openai", "gpt-4", 100)
+
+    assert first == 0.0
+    assert second == pytest.approx(10.0, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_gateway_acquires_before_calling_provider():
+    """Test the gateway reserves prompt and completion tokens."""
+    openai_client = create_mock_client("openai")
+    openai_client.chat.completions.create.return_value = (
+        create_mock_completion("ok", mock_token_usage(5, 5))
+    )
+    limiter = Mock()
+    limiter.acquire = AsyncMock(return_value=0.0)
+    model_selector = ModelSelector(
+        Settings(),
+        client_pool=LLMClientPool(clients={"openai": openai_client}),
+        rate_limiter=limiter,
+    )
+
+    await model_selector.generate_completion(
+        "x" * 400, model="gpt-4", max_tokens=500
+    )
+
+    prompt_tokens = get_token_counter().count_messages(
+        [{"role": "user", "content": "x" * 400}]
+    )
+    limiter.acquire.assert_awaited_once_with(
+        "openai", "gpt-4", prompt_tokens + 500
+    )
@@ -0,0 +1,116 @@
+"""Test suite for the precomputed model routing index."""
+
+import random
+
+import pytest
+
+from application.src.core.config import Settings
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.ai.model_selector import ModelSelector
+from application.src.services.ai.routing import RoutingIndex
+
+
+def random_models(rng: random.Random, count: int) -> dict:
+    """Build a model table with shared priorities and capacities."""
+    return {
+        f"model-{i}": {
+            "name": f"model-{i}",
+            "max_tokens": rng.choice([2048, 4096, 8192, 16384, 32768]),
+            "temperature": 0.7,
+            "priority": rng.randint(1, count // 2 + 1),
+        }
+        for i in range(count)
+    }
+
+
+def reference_select(models, healthy, token_estimate):
+    """Selection rules evaluated by scanning every model."""
+    ordered = sorted(models.values(), key=lambda c: c["priority"])
+    candidates = [c for c in ordered if c["name"] in healthy] or ordered
+    if token_estimate:
+        candidates = [
+            c for c in candidates if c["max_tokens"] >= token_estimate
+        ]
+    if not candidates:
+        return max(models.values(), key=lambda c: c["max_tokens"])
+    return candidates[0]
+
+
+def reference_fallback(models, healthy, current):
+    """Fallback rules evaluated by scanning every model."""
+    current_priority = next(
+        c["priority"] for c in models.values() if c["name"] == current
+    )
+    fallbacks = [
+        c
+        for c in models.values()
+        if c["priority"] > current_priority and c["name"] in healthy
+    ]
+    return min(fallbacks, key=lambda c: c["priority"]) if fallbacks else None
+
+
+def make_selector(models) -> ModelSelector:
+    """Create a selector over a custom model table."""
+    return ModelSelector(
+        Settings(OPENAI_MODELS=models), client_pool=LLMClientPool(clients={})
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_index_matches_reference(seed):
+    """Test indexed selection agrees with a full scan."""
+    rng = random.Random(seed)
+    models = random_models(rng, 40)
+    selector = make_selector(models)
+    names = [c["name"] for c in models.values()]
+    unhealthy = set(rng.sample(names, rng.randint(0, len(names))))
+    for name in unhealthy:
+        breaker = selector.breaker(name)
+        for _ in range(breaker.min_calls):
+            breaker.record_failure()
+    healthy = set(names) - unhealthy
+
+    for estimate in [None, 1000, 4096, 5000, 20000, 40000]:
+        assert selector.select_model("test", estimate) == reference_select(
+            models, healthy, estimate
+        )
+    for name in names:
+        assert selector.get_fallback_model(name) == reference_fallback(
+            models, healthy, name
+        )
+
+
+def test_best_for_capacity_boundaries():
+    """Test bisection picks the best model at exact capacity limits."""
+    index = RoutingIndex.build(
+        {
+            "small": {"name": "small", "max_tokens": 4096, "priority": 1},
+            "large": {"name": "large", "max_tokens": 8192, "priority": 2},
+        }
+    )
+
+    assert index.best_for(None)["name"] == "small"
+    assert index.best_for(4096)["name"] == "small"
+    assert index.best_for(4097)["name"] == "large"
+    assert index.best_for(8193) is None
+
+
+def test_reload_rebuilds_index():
+    """Test reload picks up a changed model table."""
+    selector = make_selector(random_models(random.Random(0), 4))
+
+    selector.reload(
+        Settings(
+            OPENAI_MODELS={
+                "new": {
+                    "name": "new-model",
+                    "max_tokens": 4096,
+                    "temperature": 0.2,
+                    "priority": 1,
+                }
+            }
+        )
+    )
+
+    assert selector.select_model("test")["name"] == "new-model"
+    assert selector.get_fallback_model("model-0") is None
@@ -0,0 +1,149 @@
+"""Test suite for priority lanes and fair queuing of provider calls."""
+
+import asyncio
+
+import pytest
+
+from application.src.services.ai.scheduler import (
+    BATCH,
+    INTERACTIVE,
+    FairScheduler,
+    current_lane,
+    current_tenant,
+    scheduling,
+)
+
+
+@pytest.fixture
+def scheduler():
+    """Scheduler with one slot per lane."""
+    return FairScheduler({INTERACTIVE: 1, BATCH: 1})
+
+
+async def hold(scheduler, release, **kwargs):
+    """Hold a slot until released."""
+    async with scheduler.slot(**kwargs):
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_saturated_batch_lane_does_not_block_interactive(scheduler):
+    """Test interactive calls run while the batch lane is full."""
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(scheduler, release, lane=BATCH))
+    queued = asyncio.ensure_future(hold(scheduler, release, lane=BATCH))
+    await asyncio.sleep(0)
+    assert scheduler.waiting(BATCH) == 1
+
+    async with scheduler.slot(lane=INTERACTIVE):
+        assert scheduler.waiting(INTERACTIVE) == 0
+
+    release.set()
+    await asyncio.gather(holder, queued)
+
+
+@pytest.mark.asyncio
+async def test_slots_cap_concurrency():
+    """Test no more calls run at once than the lane has slots."""
+    scheduler = FairScheduler({INTERACTIVE: 2})
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with scheduler.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+
+    await asyncio.gather(*[call() for _ in range(6)])
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_heavy_tenant_waits_behind_light_tenant(scheduler):
+    """Test a tenant with many queued calls does not starve another."""
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(scheduler, release, tenant="heavy"))
+    await asyncio.sleep(0)
+    order = []
+
+    async def call(tenant):
+        async with scheduler.slot(tenant=tenant):
+            order.append(tenant)
+
+    calls = [asyncio.ensure_future(call("heavy")) for _ in range(3)]
+    await asyncio.sleep(0)
+    calls.append(asyncio.ensure_future(call("light")))
+    await asyncio.sleep(0)
+
+    release.set()
+    await asyncio.gather(holder, *calls)
+    assert order.index("light") <= 1
+
+
+@pytest.mark.asyncio
+async def test_tenant_weight_shares_slots(scheduler):
+    """Test a weighted tenant is admitted more often."""
+    scheduler.tenant_weights = {"premium": 3.0}
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(scheduler, release, tenant="basic"))
+    await asyncio.sleep(0)
+    order = []
+
+    async def call(tenant):
+        async with scheduler.slot(tenant=tenant):
+            order.append(tenant)
+
+    calls = [
+        asyncio.ensure_future(call(tenant))
+        for _ in range(3)
+        for tenant in ("basic", "premium")
+    ]
+    await asyncio.sleep(0)
+
+    release.set()
+    await asyncio.gather(holder, *calls)
+    assert order[:4].count("premium") == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_up_its_place(scheduler):
+    """Test a cancelled call neither holds nor leaks a slot."""
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(scheduler, release))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(hold(scheduler, release))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    release.set()
+    await holder
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    async with scheduler.slot():
+        assert scheduler.lanes[INTERACTIVE].active == 1
+    assert scheduler.lanes[INTERACTIVE].active == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_uses_request_lane_and_tenant(scheduler):
+    """Test calls are scheduled for the current lane and tenant."""
+    with scheduling(lane=BATCH, tenant="user:1"):
+        async with scheduler.slot(cost=10):
+            assert scheduler.lanes[BATCH].active == 1
+            assert "user:1" in scheduler.lanes[BATCH].finish_tags
+    assert scheduler.lanes[BATCH].active == 0
+
+
+def test_scheduling_restores_context():
+    """Test the lane and tenant revert after the block."""
+    with scheduling(lane=BATCH, tenant="user:1"):
+        assert current_lane.get() == BATCH
+        assert current_tenant.get() == "user:1"
+        with scheduling(tenant="user:2"):
+            assert current_lane.get() == BATCH
+            assert current_tenant.get() == "user:2"
+    assert current_lane.get() == INTERACTIVE
+    assert current_tenant.get() == "anonymous"
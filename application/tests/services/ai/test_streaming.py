@@ -0,0 +1,216 @@
+"""Test suite for streamed completions and server-sent events."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from application.src.core.config import Settings
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.ai.model_selector import ModelSelector
+from application.src.services.ai.streaming import (
+    completion_events,
+    format_sse,
+)
+from application.tests.utils.model_test_utils import (
+    create_mock_client,
+    create_mock_stream,
+    mock_token_usage,
+)
+
+
+@pytest.fixture
+def openai_client():
+    """Create a mock OpenAI client."""
+    return create_mock_client("openai")
+
+
+@pytest.fixture
+def model_selector(openai_client):
+    """Create ModelSelector backed by a mock OpenAI client."""
+    return ModelSelector(
+        Settings(RATE_LIMIT_ENABLED=False),
+        client_pool=LLMClientPool(clients={"openai": openai_client}),
+    )
+
+
+def parse_events(events):
+    """Decode server-sent events into (event, data) pairs."""
+    parsed = []
+    for event in events:
+        name, data = event.strip().split("\n")
+        parsed.append((name.split(": ")[1], json.loads(data[6:])))
+    return parsed
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_deltas(model_selector, openai_client):
+    """Test text is relayed as it arrives and assembled at the end."""
+    openai_client.chat.completions.create.return_value = create_mock_stream(
+        ["def ", "add", "()"], mock_token_usage(12, 3)
+    )
+
+    stream = model_selector.stream_completion("prompt", model="gpt-4")
+    deltas = [delta async for delta in stream]
+
+    assert deltas == ["def ", "add", "()"]
+    assert stream.response.content == "def add()"
+    assert stream.response.model == "gpt-4"
+    assert stream.response.usage.total_tokens == 15
+    kwargs = openai_client.chat.completions.create.call_args.kwargs
+    assert kwargs["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_stream_latency_excludes_queueing(openai_client):
+    """Test waiting for provider quota does not count as model latency."""
+    openai_client.chat.completions.create.return_value = create_mock_stream(
+        ["ok"]
+    )
+
+    async def acquire(provider, model, tokens):
+        await asyncio.sleep(0.2)
+        return 0.2
+
+    limiter = Mock()
+    limiter.acquire = acquire
+    model_selector = ModelSelector(
+        Settings(RATE_LIMIT_ENABLED=True),
+        client_pool=LLMClientPool(clients={"openai": openai_client}),
+        rate_limiter=limiter,
+    )
+
+    breaker = model_selector.breaker("gpt-4")
+
+    with patch.object(breaker, "record_success") as record_success:
+        stream = model_selector.stream_completion("prompt", model="gpt-4")
+        assert [delta async for delta in stream] == ["ok"]
+
+    assert stream.response.latency < 0.1
+    assert record_success.call_args.args[0] < 0.1
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_before_first_token(
+    model_selector, openai_client
+):
+    """Test a model failing before any output is replaced by the next."""
+
+    async def create(model, **kwargs):
+        if model == "gpt-4-turbo-preview":
+            raise Exception("unavailable")
+        return create_mock_stream(["ok"])
+
+    openai_client.chat.completions.create.side_effect = create
+
+    stream = model_selector.stream_completion("prompt", model="openai")
+    deltas = [delta async for delta in stream]
+
+    assert deltas == ["ok"]
+    assert stream.response.model == "gpt-4-0125-preview"
+    assert stream.response.failed_models == ["gpt-4-turbo-preview"]
+    assert stream.response.usage.completion_tokens > 0
+
+
+@pytest.mark.asyncio
+async def test_stream_error_after_output_is_raised(
+    model_selector, openai_client
+):
+    """Test errors after text was emitted end the stream."""
+
+    async def broken():
+        async for chunk in create_mock_stream(["partial"]):
+            yield chunk
+        raise Exception("connection reset")
+
+    openai_client.chat.completions.create.return_value = broken()
+
+    deltas = []
+    with pytest.raises(Exception, match="connection reset"):
+        async for delta in model_selector.stream_completion(
+            "prompt", model="openai"
+        ):
+            deltas.append(delta)
+
+    assert deltas == ["partial"]
+    assert openai_client.chat.completions.create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_anthropic_events():
+    """Test Claude message events are translated into text deltas."""
+    claude_client = create_mock_client("claude")
+
+    async def events():
+        yield SimpleNamespace(
+            type="message_start",
+            message=SimpleNamespace(usage={"input_tokens": 7}),
+        )
+        yield SimpleNamespace(
+            type="content_block_delta", delta=SimpleNamespace(text="Hi")
+        )
+        yield SimpleNamespace(type="message_delta", usage={"output_tokens": 1})
+
+    claude_client.messages.create.return_value = events()
+    model_selector = ModelSelector(
+        Settings(RATE_LIMIT_ENABLED=False),
+        client_pool=LLMClientPool(clients={"anthropic": claude_client}),
+    )
+
+    stream = model_selector.stream_completion(
+        "prompt", model="claude", system_prompt="Be brief."
+    )
+    deltas = [delta async for delta in stream]
+
+    assert deltas == ["Hi"]
+    assert stream.response.usage.prompt_tokens == 7
+    assert stream.response.usage.completion_tokens == 1
+    kwargs = claude_client.messages.create.call_args.kwargs
+    assert kwargs["system"] == "Be brief."
+
+
+@pytest.mark.asyncio
+async def test_completion_events(model_selector, openai_client):
+    """Test streams are encoded as token events and a final result."""
+    openai_client.chat.completions.create.return_value = create_mock_stream(
+        ["a", "b"]
+    )
+    on_result = Mock()
+
+    async def cache(result):
+        on_result(result)
+
+    stream = model_selector.stream_completion("prompt", model="gpt-4")
+    events = [
+        event
+        async for event in completion_events(
+            stream, lambda r: {"code": r.content}, cache
+        )
+    ]
+
+    assert parse_events(events) == [
+        ("token", {"text": "a"}),
+        ("token", {"text": "b"}),
+        ("result", {"code": "ab"}),
+    ]
+    on_result.assert_called_once_with({"code": "ab"})
+
+
+@pytest.mark.asyncio
+async def test_completion_events_error(model_selector, openai_client):
+    """Test provider errors are reported as an error event."""
+    openai_client.chat.completions.create.side_effect = Exception("down")
+
+    stream = model_selector.stream_completion("prompt", model="gpt-4")
+    events = [e async for e in completion_events(stream, lambda r: {})]
+
+    assert parse_events(events) == [("error", {"detail": "down"})]
+
+
+def test_format_sse():
+    """Test event encoding."""
+    assert format_sse("token", {"text": "x"}) == (
+        'event: token\ndata: {"text": "x"}\n\n'
+    )
@@ -0,0 +1,72 @@
+"""Test suite for token counting."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from application.src.core.config import Settings
+from application.src.services.ai import token_counter
+from application.src.services.ai.token_counter import TokenCounter
+
+
+class WordEncoder:
+    """Stand-in BPE encoder producing one token per word."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+
+@pytest.fixture
+def counter():
+    """Create a counter whose encoders split on whitespace."""
+    counter = TokenCounter(
+        Settings(TOKEN_APPROX_THRESHOLD=1000, TOKEN_APPROX_SAMPLE=400)
+    )
+    counter._load_encoder = Mock(return_value=WordEncoder())
+    with patch.object(token_counter, "TIKTOKEN_AVAILABLE", True):
+        yield counter
+
+
+def test_count_uses_encoder(counter):
+    """Test short texts are counted exactly."""
+    assert counter.count("def add(a, b): return a + b", "gpt-4") == 7
+    assert counter.count("", "gpt-4") == 0
+
+
+def test_encoder_loaded_once_per_model(counter):
+    """Test encoders are cached after the first load."""
+    counter.count("one", "gpt-4")
+    counter.count("two", "gpt-4")
+    counter.count("three", "claude-3-opus")
+
+    assert counter._load_encoder.call_count == 2
+
+
+def test_large_input_is_approximated(counter):
+    """Test inputs past the threshold are extrapolated from a sample."""
+    text = "word " * 1000
+
+    assert counter.count(text) == pytest.approx(1000, rel=0.05)
+    encoder = counter.encoder_for()
+    with patch.object(encoder, "encode", wraps=encoder.encode) as encode:
+        counter.count(text)
+    assert len(encode.call_args.args[0]) <= 400
+
+
+def test_count_messages_adds_overhead(counter):
+    """Test chat formatting overhead is included."""
+    messages = [
+        {"role": "system", "content": "Be brief."},
+        {"role": "user", "content": "Write a test"},
+    ]
+
+    assert counter.count_messages(messages) == 5 + 2 * 4 + 3
+
+
+def test_heuristic_without_tiktoken():
+    """Test counts fall back to characters when tiktoken is missing."""
+    counter = TokenCounter(Settings())
+
+    with patch.object(token_counter, "TIKTOKEN_AVAILABLE", False):
+        assert counter.count("x" * 400) == 100
+        assert counter.encoder_for("gpt-4") is None
@@ -0,0 +1,124 @@
+"""Test suite for write-behind AI log persistence."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+
+from application.src.models.database import AILog, UsageRollup
+from application.src.services.ai.blob_store import LocalBlobStore
+from application.src.services.ai.usage_log import AILogWriter
+
+
+def count_rows(engine):
+    """Number of AI log rows written."""
+    with engine.connect() as connection:
+        return connection.execute(select(func.count(AILog.id))).scalar()
+
+
+def row(n=0):
+    """Column values of one completion."""
+    return {
+        "model": "gpt-4",
+        "provider": "openai",
+        "prompt": f"prompt {n}",
+        "response": "answer",
+        "tokens_used": 15,
+        "prompt_tokens": 10,
+        "completion_tokens": 5,
+        "latency": 0.5,
+        "tenant": "user:1",
+    }
+
+
+@pytest.mark.asyncio
+async def test_flushes_full_batches(engine):
+    """Test a full batch is written without waiting for the interval."""
+    writer = AILogWriter(engine, batch_size=10, flush_interval=60)
+    writer.start()
+    with patch.object(writer, "_insert", wraps=writer._insert) as insert:
+        for n in range(25):
+            await writer.record(**row(n))
+        await asyncio.sleep(0.1)
+
+        assert count_rows(engine) == 20
+        assert [len(c.args[0]) for c in insert.call_args_list] == [10, 10]
+        await writer.close()
+    assert count_rows(engine) == 25
+
+
+@pytest.mark.asyncio
+async def test_flushes_partial_batch_after_interval(engine):
+    """Test rows are written within the flush interval."""
+    writer = AILogWriter(engine, batch_size=100, flush_interval=0.05)
+    writer.start()
+    await writer.record(**row())
+    await asyncio.sleep(0.2)
+
+    assert count_rows(engine) == 1
+    with engine.connect() as connection:
+        stored = connection.execute(select(AILog)).one()
+    assert stored.tenant == "user:1"
+    assert stored.created_at is not None
+    with engine.connect() as connection:
+        rollup = connection.execute(select(UsageRollup)).one()
+    assert (rollup.tenant, rollup.requests, rollup.total_tokens) == (
+        "user:1",
+        1,
+        15,
+    )
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_waits_then_drops(engine):
+    """Test producers are slowed, then rows dropped, when full."""
+    writer = AILogWriter(engine, max_pending=2, put_timeout=0.01)
+    assert await writer.record(**row(1))
+    assert await writer.record(**row(2))
+
+    assert not await writer.record(**row(3))
+    assert writer.dropped == 1
+    assert writer.pending == 2
+
+    await writer.close()
+    assert count_rows(engine) == 2
+
+
+@pytest.mark.asyncio
+async def test_database_errors_do_not_stop_writer(engine):
+    """Test a failed batch is dropped and later rows still written."""
+    writer = AILogWriter(engine, batch_size=1, flush_interval=0.01)
+    writer.start()
+    with patch.object(
+        writer, "_insert", side_effect=[RuntimeError("down"), None]
+    ):
+        await writer.record(**row(1))
+        await asyncio.sleep(0.05)
+    assert writer.dropped == 1
+
+    await writer.record(**row(2))
+    await writer.close()
+    assert count_rows(engine) == 1
+
+
+@pytest.mark.asyncio
+async def test_large_bodies_offloaded_to_blob_store(engine, tmp_path):
+    """Test bodies over the threshold are stored by hash, not inline."""
+    store = LocalBlobStore(str(tmp_path))
+    writer = AILogWriter(engine, blob_store=store, blob_threshold=100)
+    large = {**row(), "prompt": "x" * 1000}
+    await writer.record(**large)
+    await writer.record(**row())
+    await writer.close()
+
+    with engine.connect() as connection:
+        offloaded, inline = connection.execute(
+            select(AILog).order_by(AILog.id)
+        ).all()
+    assert offloaded.prompt is None
+    assert store.get(offloaded.prompt_blob) == "x" * 1000
+    assert offloaded.response == "answer"
+    assert offloaded.response_blob is None
+    assert (inline.prompt, inline.prompt_blob) == ("prompt 0", None)
@@ -0,0 +1,82 @@
+"""Test suite for the cache value codec."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from application.src.services.cache import Codec, CodecError
+
+RESULT = {"code": "def add(a, b):\n    return a + b\n" * 50, "tokens": 120}
+
+
+@pytest.mark.parametrize("serializer", ["json", "orjson"])
+@pytest.mark.parametrize("compression", ["none", "zlib", "zstd"])
+def test_roundtrip(serializer, compression):
+    """Test every configuration decodes what it encodes."""
+    codec = Codec(serializer=serializer, compression=compression)
+
+    assert codec.decode(codec.encode(RESULT)) == RESULT
+
+
+def test_large_values_are_compressed():
+    """Test values above the threshold shrink."""
+    codec = Codec(compression="zlib")
+
+    assert len(codec.encode(RESULT)) < len(json.dumps(RESULT)) / 4
+
+
+def test_small_values_are_stored_uncompressed():
+    """Test values below the threshold skip compression."""
+    codec = Codec(serializer="json", compression="zlib", min_size=512)
+
+    payload = codec.encode({"code": "x"})
+
+    assert payload[3] == 0
+    assert payload[4:] == b'{"code":"x"}'
+
+
+def test_legacy_json_entries_are_readable():
+    """Test entries written before the codec still decode."""
+    codec = Codec()
+
+    assert codec.decode(json.dumps(RESULT).encode()) == RESULT
+    assert codec.decode(json.dumps(RESULT)) == RESULT
+
+
+def test_entries_from_other_settings_are_readable():
+    """Test the header, not the reader's settings, selects the decoder."""
+    writer = Codec(serializer="json", compression="zlib")
+    reader = Codec(serializer="orjson", compression="none")
+
+    assert reader.decode(writer.encode(RESULT)) == RESULT
+
+
+def test_missing_zstd_falls_back_to_zlib():
+    """Test zstd is replaced with zlib when zstandard is not installed."""
+    with patch("application.src.services.cache.codecs.ZSTD_AVAILABLE", False):
+        codec = Codec(compression="zstd")
+
+    assert codec.compression == "zlib"
+    assert codec.decode(codec.encode(RESULT)) == RESULT
+
+
+def test_corrupt_payload_raises():
+    """Test damaged bodies raise CodecError."""
+    codec = Codec(compression="zlib")
+    payload = codec.encode(RESULT)
+
+    with pytest.raises(CodecError):
+        codec.decode(payload[:-10])
+
+
+def test_unknown_version_raises():
+    """Test entries from a newer format are rejected."""
+    with pytest.raises(CodecError, match="Unsupported"):
+        Codec().decode(b"\xc1\x09\x00\x00{}")
+
+
+def test_unknown_options_rejected():
+    """Test misconfiguration fails fast."""
+    with pytest.raises(ValueError):
+        Codec(compression="lz4")
@@ -0,0 +1,357 @@
+"""Test suite for the two-tier generation cache."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+from redis.exceptions import ConnectionError
+
+from application.src.services.cache import (
+    GenerationCache,
+    LRUCache,
+    SingleFlight,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    """Test the oldest untouched entry is evicted when full."""
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_lru_expires_entries():
+    """Test entries are dropped after their TTL."""
+    clock = FakeClock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 10
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.fixture
+def redis_client():
+    """Create a mock Redis client with no stored entries."""
+    client = AsyncMock()
+    client.get.return_value = None
+    client.pipeline = Mock()
+    return client
+
+
+@pytest.fixture
+def generation_cache(redis_client):
+    """Create a generation cache over the mock client."""
+    return GenerationCache(redis_client, "code_gen", ttl=60)
+
+
+def test_key_covers_every_input(generation_cache):
+    """Test keys are stable and change with each input."""
+    key = generation_cache.key({"a": 1, "b": 2}, "python", model="gpt-4")
+
+    assert key == generation_cache.key(
+        {"b": 2, "a": 1}, "python", model="gpt-4"
+    )
+    assert key != generation_cache.key({"a": 1, "b": 2}, "go", model="gpt-4")
+    assert key != generation_cache.key(
+        {"a": 1, "b": 2}, "python", model="gpt-3.5"
+    )
+    other_version = GenerationCache(Mock(), "code_gen", template_version="2")
+    assert key != other_version.key({"a": 1, "b": 2}, "python", model="gpt-4")
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_is_kept_locally(generation_cache, redis_client):
+    """Test a Redis hit is served from the worker afterwards."""
+    redis_client.get.return_value = json.dumps({"code": "x"}).encode()
+
+    assert await generation_cache.get("key") == {"code": "x"}
+    assert await generation_cache.get("key") == {"code": "x"}
+    redis_client.get.assert_called_once_with("key")
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_counted(generation_cache):
+    """Test hits and misses are exported as metrics."""
+
+    def lookups(result):
+        labels = {"cache": "generation", "result": result}
+        return REGISTRY.get_sample_value("cache_requests_total", labels) or 0
+
+    hits, misses = lookups("hit"), lookups("miss")
+    await generation_cache.get("key")
+    await generation_cache.set("key", {"code": "x"})
+    await generation_cache.get("key")
+
+    assert lookups("hit") == hits + 1
+    assert lookups("miss") == misses + 1
+
+
+@pytest.mark.asyncio
+async def test_set_writes_both_tiers(generation_cache, redis_client):
+    """Test results are stored locally and in Redis with the TTL."""
+    await generation_cache.set("key", {"code": "x"})
+
+    key, ttl, payload = redis_client.setex.call_args.args
+    assert (key, ttl) == ("key", 60)
+    assert generation_cache.codec.decode(payload)["value"] == {"code": "x"}
+    assert await generation_cache.get("key") == {"code": "x"}
+    redis_client.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_are_misses(generation_cache, redis_client):
+    """Test an unavailable Redis degrades to the local tier."""
+    redis_client.get.side_effect = ConnectionError("down")
+    redis_client.setex.side_effect = ConnectionError("down")
+
+    assert await generation_cache.get("key") is None
+    await generation_cache.set("key", {"code": "x"})
+    assert await generation_cache.get("key") == {"code": "x"}
+
+
+class FakePipeline:
+    """Records queued commands and answers them from a dict."""
+
+    def __init__(self, store: dict):
+        self.store = store
+        self.commands = []
+        self.executions = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    def setex(self, key, ttl, value):
+        self.commands.append(("setex", key, ttl, value))
+
+    async def execute(self):
+        self.executions += 1
+        results = []
+        for command in self.commands:
+            if command[0] == "get":
+                results.append(self.store.get(command[1]))
+            else:
+                self.store[command[1]] = command[3]
+                results.append(True)
+        self.commands = []
+        return results
+
+
+@pytest.mark.asyncio
+async def test_get_many_uses_one_round_trip(generation_cache, redis_client):
+    """Test bulk reads pipeline every local miss together."""
+    pipe = FakePipeline({"b": json.dumps({"code": "b"}).encode()})
+    redis_client.pipeline.return_value = pipe
+    await generation_cache.set("a", {"code": "a"})
+
+    results = await generation_cache.get_many(["a", "b", "c"])
+
+    assert results == {"a": {"code": "a"}, "b": {"code": "b"}, "c": None}
+    assert pipe.executions == 1
+    redis_client.pipeline.assert_called_once_with(transaction=False)
+    assert generation_cache.local.get("b").value == {"code": "b"}
+
+
+@pytest.mark.asyncio
+async def test_set_many_uses_one_round_trip(generation_cache, redis_client):
+    """Test bulk writes are pipelined with the cache TTL."""
+    store = {}
+    pipe = FakePipeline(store)
+    redis_client.pipeline.return_value = pipe
+
+    await generation_cache.set_many({"a": {"code": "a"}, "b": {"code": "b"}})
+
+    assert pipe.executions == 1
+    assert generation_cache.codec.decode(store["b"])["value"] == {"code": "b"}
+    assert generation_cache.local.get("a").value == {"code": "a"}
+
+
+@pytest.mark.asyncio
+async def test_unreadable_entries_are_misses(generation_cache, redis_client):
+    """Test corrupt Redis entries are discarded rather than raised."""
+    redis_client.get.return_value = b"\xc1\x01\x01\x01garbage"
+
+    assert await generation_cache.get("key") is None
+    assert generation_cache.local.get("key") is None
+
+
+@pytest.fixture
+def clock():
+    """Create a manually advanced wall clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def swr_cache(redis_client, clock):
+    """Create a cache serving entries stale for a minute past expiry."""
+    return GenerationCache(
+        redis_client,
+        "code_gen",
+        ttl=60,
+        stale_ttl=60,
+        early_refresh_beta=0,
+        single_flight=SingleFlight(),
+        clock=clock,
+    )
+
+
+def test_ttls_are_jittered(redis_client):
+    """Test entries written together get spread expiries."""
+    cache = GenerationCache(redis_client, "code_gen", ttl=100, ttl_jitter=0.1)
+
+    ttls = {cache._entry({"code": "x"}, 0.0)[1] for _ in range(50)}
+
+    assert len(ttls) > 1
+    assert all(90 <= ttl <= 110 for ttl in ttls)
+
+
+@pytest.mark.asyncio
+async def test_miss_computes_once(swr_cache):
+    """Test concurrent misses share one computation."""
+    compute = AsyncMock(return_value={"code": "x"})
+
+    results = await asyncio.gather(
+        *[swr_cache.get_or_compute("key", compute) for _ in range(5)]
+    )
+
+    assert results == [{"code": "x"}] * 5
+    compute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_refreshing(swr_cache, clock):
+    """Test expired entries are returned while one task recomputes."""
+    await swr_cache.set("key", {"code": "old"})
+    clock.now = 61
+    compute = AsyncMock(return_value={"code": "new"})
+
+    results = await asyncio.gather(
+        *[swr_cache.get_or_compute("key", compute) for _ in range(5)]
+    )
+    await asyncio.gather(*swr_cache._refreshes.values())
+
+    assert results == [{"code": "old"}] * 5
+    compute.assert_awaited_once()
+    assert await swr_cache.get_or_compute("key", compute) == {"code": "new"}
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_entry(swr_cache, clock):
+    """Test a refresh error leaves the stale result in place."""
+    await swr_cache.set("key", {"code": "old"})
+    clock.now = 61
+    compute = AsyncMock(side_effect=Exception("down"))
+
+    assert await swr_cache.get_or_compute("key", compute) == {"code": "old"}
+    await asyncio.gather(*swr_cache._refreshes.values())
+
+    assert await swr_cache.get_or_compute("key", compute) == {"code": "old"}
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_miss_without_refresh(swr_cache, clock):
+    """Test stale results are only served to callers that can refresh."""
+    await swr_cache.set("key", {"code": "old"})
+    clock.now = 61
+
+    assert await swr_cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_early_refresh_near_expiry(redis_client, clock):
+    """Test XFetch refreshes slow entries shortly before they expire."""
+    cache = GenerationCache(redis_client, "code_gen", ttl=60, clock=clock)
+    await cache.set("key", {"code": "old"}, delta=10)
+    compute = AsyncMock(return_value={"code": "new"})
+
+    with patch(
+        "application.src.services.cache.generation_cache.random.random",
+        return_value=0.5,
+    ):
+        clock.now = 30
+        await cache.get_or_compute("key", compute)
+        compute.assert_not_awaited()
+
+        # -10 * ln(0.5) is about 7 seconds before expiry
+        clock.now = 55
+        assert await cache.get_or_compute("key", compute) == {"code": "old"}
+        await asyncio.gather(*cache._refreshes.values())
+
+    compute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_legacy_entries_are_fresh(generation_cache, redis_client):
+    """Test bare results written before expiry metadata are served."""
+    redis_client.get.return_value = json.dumps({"code": "x"}).encode()
+    compute = AsyncMock()
+
+    assert await generation_cache.get_or_compute("key", compute) == {
+        "code": "x"
+    }
+    compute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_dedupes_and_bounds_fan_out(
+    generation_cache, redis_client
+):
+    """Test batches compute each miss once, a few at a time."""
+    redis_client.pipeline.return_value = FakePipeline(
+        {"hit": generation_cache.codec.encode({"code": "cached"})}
+    )
+    running = 0
+    peak = 0
+
+    async def compute(name):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        if name == "bad":
+            raise Exception("upstream failed")
+        return {"code": name}
+
+    keys = ["a", "b", "hit", "a", "bad", "c", "d"]
+    results = await generation_cache.get_or_compute_many(
+        [(key, lambda key=key: compute(key)) for key in keys],
+        concurrency=2,
+    )
+
+    assert results == [
+        {"code": "a"},
+        {"code": "b"},
+        {"code": "cached"},
+        {"code": "a"},
+        {"status": "error", "error": "upstream failed"},
+        {"code": "c"},
+        {"code": "d"},
+    ]
+    assert peak == 2
+    assert redis_client.setex.await_count == 4
@@ -0,0 +1,38 @@
+"""Test suite for the shared Redis connection pool."""
+
+import pytest
+import redis.asyncio as aioredis
+
+from application.src.services.cache import redis_pool
+
+
+@pytest.fixture(autouse=True)
+def reset_pool():
+    """Start each test without a shared client."""
+    redis_pool._redis = None
+    yield
+    redis_pool._redis = None
+
+
+def test_get_redis_shares_bounded_pool(monkeypatch):
+    """Test one blocking pool is built from settings and reused."""
+    monkeypatch.setenv("REDIS_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("REDIS_HEALTH_CHECK_INTERVAL", "15")
+
+    client = redis_pool.get_redis()
+    pool = client.connection_pool
+
+    assert redis_pool.get_redis() is client
+    assert isinstance(pool, aioredis.BlockingConnectionPool)
+    assert pool.max_connections == 7
+    assert pool.connection_kwargs["health_check_interval"] == 15
+
+
+@pytest.mark.asyncio
+async def test_close_redis_resets_client():
+    """Test closing releases the shared client."""
+    client = redis_pool.get_redis()
+
+    await redis_pool.close_redis()
+
+    assert redis_pool.get_redis() is not client
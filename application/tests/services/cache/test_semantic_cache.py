@@ -0,0 +1,152 @@
+"""Test suite for the embedding-similarity cache."""
+
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from application.src.services.ai.scheduler import scheduling
+from application.src.services.cache import SemanticCache
+from application.src.services.cache.semantic_cache import VectorIndex
+
+VECTORS = {
+    "login": [1.0, 0.0, 0.0],
+    "sign in": [0.98, 0.2, 0.0],
+    "billing": [0.0, 1.0, 0.0],
+}
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def embed(text):
+    """Embed a request by the feature it names."""
+    for feature, vector in VECTORS.items():
+        if f'"{feature}"' in text:
+            return vector
+    raise ValueError(f"unexpected request {text}")
+
+
+@pytest.fixture
+def clock():
+    """Create a manually advanced wall clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def semantic_cache(clock):
+    """Create a semantic cache over the fake embeddings."""
+    return SemanticCache(embed, threshold=0.95, ttl=60, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_similar_request_reuses_result(semantic_cache):
+    """Test a reworded request is answered with the stored result."""
+    compute = AsyncMock(return_value={"code": "login()"})
+    await semantic_cache.get_or_compute("py", {"f": "login"}, compute)
+
+    result = await semantic_cache.get_or_compute(
+        "py", {"f": "sign in"}, compute
+    )
+
+    compute.assert_awaited_once()
+    assert result["code"] == "login()"
+    assert 0.95 <= result["semantic_similarity"] < 1
+
+
+@pytest.mark.asyncio
+async def test_dissimilar_request_is_computed(semantic_cache):
+    """Test requests below the threshold are computed and indexed."""
+    compute = AsyncMock(side_effect=[{"code": "a"}, {"code": "b"}])
+    await semantic_cache.get_or_compute("py", {"f": "login"}, compute)
+
+    result = await semantic_cache.get_or_compute(
+        "py", {"f": "billing"}, compute
+    )
+
+    assert result == {"code": "b"}
+
+
+@pytest.mark.asyncio
+async def test_scopes_are_isolated(semantic_cache):
+    """Test results never cross languages or models."""
+    compute = AsyncMock(side_effect=[{"code": "py"}, {"code": "go"}])
+    await semantic_cache.get_or_compute("py", {"f": "login"}, compute)
+
+    result = await semantic_cache.get_or_compute(
+        "go", {"f": "sign in"}, compute
+    )
+
+    assert result == {"code": "go"}
+
+
+@pytest.mark.asyncio
+async def test_tenants_are_isolated(semantic_cache):
+    """Test one user's results are never served to another."""
+    compute = AsyncMock(side_effect=[{"code": "mine"}, {"code": "theirs"}])
+    with scheduling(tenant="user:1"):
+        await semantic_cache.get_or_compute("py", {"f": "login"}, compute)
+    with scheduling(tenant="user:2"):
+        result = await semantic_cache.get_or_compute(
+            "py", {"f": "sign in"}, compute
+        )
+
+    assert result == {"code": "theirs"}
+
+
+@pytest.mark.asyncio
+async def test_identical_request_is_recomputed(semantic_cache):
+    """Test exact repeats are left to the exact cache to refresh."""
+    compute = AsyncMock(side_effect=[{"code": "old"}, {"code": "new"}])
+    await semantic_cache.get_or_compute("py", {"f": "login"}, compute)
+
+    result = await semantic_cache.get_or_compute("py", {"f": "login"}, compute)
+
+    assert result == {"code": "new"}
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(semantic_cache, clock):
+    """Test entries are not served after their TTL."""
+    compute = AsyncMock(side_effect=[{"code": "a"}, {"code": "b"}])
+    await semantic_cache.get_or_compute("py", {"f": "login"}, compute)
+    clock.now = 60
+
+    result = await semantic_cache.get_or_compute(
+        "py", {"f": "sign in"}, compute
+    )
+
+    assert result == {"code": "b"}
+
+
+@pytest.mark.asyncio
+async def test_embedding_failure_falls_through(semantic_cache):
+    """Test the request is still served when embedding fails."""
+    compute = AsyncMock(return_value={"code": "x"})
+
+    result = await semantic_cache.get_or_compute(
+        "py", {"f": "unknown"}, compute
+    )
+
+    assert result == {"code": "x"}
+
+
+def test_index_overwrites_oldest_when_full(clock):
+    """Test the index keeps only the newest entries."""
+    index = VectorIndex(capacity=2, clock=clock)
+    for i, name in enumerate(["a", "b", "c"]):
+        vector = np.zeros(3, dtype=np.float32)
+        vector[i] = 1.0
+        index.add(name, vector, {"name": name}, ttl=60)
+
+    assert len(index) == 2
+    assert index.search(np.array([1.0, 0, 0], dtype=np.float32)).score == 0
+    hit = index.search(np.array([0, 0, 1.0], dtype=np.float32))
+    assert hit.value == {"name": "c"}
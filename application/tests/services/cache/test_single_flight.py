@@ -0,0 +1,133 @@
+"""Test suite for single-flight request coalescing."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.src.services.cache import SingleFlight, canonical_key
+
+
+def test_canonical_key_ignores_key_order():
+    """Test equal inputs produce the same key in any key order."""
+    first = canonical_key("code_gen", {"a": 1, "b": [1, 2]}, "python")
+    second = canonical_key("code_gen", {"b": [1, 2], "a": 1}, "python")
+
+    assert first == second
+    assert first.startswith("code_gen:")
+    assert first != canonical_key("code_gen", {"a": 1}, "python")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    """Test callers with the same key join the in-flight call."""
+    single_flight = SingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"result": "ok"}
+
+    results = await asyncio.gather(
+        *[single_flight.do("key", fn) for _ in range(10)]
+    )
+
+    assert len(calls) == 1
+    assert all(result == {"result": "ok"} for result in results)
+    assert not single_flight.in_flight("key")
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    """Test a failed call raises for all joined callers."""
+    single_flight = SingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    results = await asyncio.gather(
+        single_flight.do("key", fn),
+        single_flight.do("key", fn),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    """Test the shared call survives one caller going away."""
+    single_flight = SingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(single_flight.do("key", fn))
+    second = asyncio.create_task(single_flight.do("key", fn))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+
+
+def redis_mock(lock_acquired: bool, stored_result=None) -> Mock:
+    """Create a mock redis.asyncio client."""
+    redis_client = Mock()
+    redis_client.set = AsyncMock(return_value=lock_acquired)
+    redis_client.get = AsyncMock(return_value=stored_result)
+    redis_client.exists = AsyncMock(return_value=1)
+    redis_client.publish = AsyncMock()
+    redis_client.register_script.return_value = AsyncMock()
+    pubsub = Mock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.get_message = AsyncMock(return_value=None)
+    pubsub.aclose = AsyncMock()
+    redis_client.pubsub.return_value = pubsub
+    return redis_client
+
+
+@pytest.mark.asyncio
+async def test_leader_publishes_result():
+    """Test the lock holder runs the call and notifies other processes."""
+    redis_client = redis_mock(lock_acquired=True)
+    single_flight = SingleFlight(redis_client)
+
+    result = await single_flight.do("key", AsyncMock(return_value=[1, 2]))
+
+    assert result == [1, 2]
+    payload = json.dumps({"ok": True, "result": [1, 2]})
+    redis_client.publish.assert_awaited_once_with(
+        "singleflight:done:key", payload
+    )
+    redis_client.register_script.return_value.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_follower_reuses_remote_result():
+    """Test another process's published result is returned."""
+    redis_client = redis_mock(lock_acquired=False)
+    redis_client.pubsub.return_value.get_message.return_value = {
+        "data": json.dumps({"ok": True, "result": "shared"})
+    }
+    single_flight = SingleFlight(redis_client)
+    fn = AsyncMock()
+
+    assert await single_flight.do("key", fn) == "shared"
+    fn.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_after_leader_fails():
+    """Test followers run the call when the remote leader failed."""
+    redis_client = redis_mock(lock_acquired=False)
+    redis_client.set.side_effect = [False, True, True]
+    redis_client.pubsub.return_value.get_message.return_value = {
+        "data": json.dumps({"ok": False})
+    }
+    single_flight = SingleFlight(redis_client)
+
+    assert await single_flight.do("key", AsyncMock(return_value=3)) == 3
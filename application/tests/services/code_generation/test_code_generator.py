@@ -1,5 +1,6 @@
 """Test suite for the CodeGenerator class."""
 
+import asyncio
 import json
 import os
 from datetime import datetime
@@ -7,27 +8,30 @@ from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.cache import SemanticCache
 from application.src.services.code_generation.code_generator import (
     CodeGenerator,
 )
+from application.tests.utils.model_test_utils import create_mock_stream
 
 
 @pytest.fixture
 def code_generator():
     """Create a CodeGenerator instance with mocked dependencies."""
-    with patch("redis.Redis.from_url") as mock_redis, patch(
-        "openai.OpenAI"
-    ) as mock_openai, patch.dict(
+    with patch(
+        "application.src.services.code_generation.code_generator.get_redis"
+    ) as mock_redis, patch.dict(
         os.environ,
         {
             "OPENAI_API_KEY": "test-key",
             "HELICONE_API_KEY": "test-helicone-key",
         },
     ):
-        mock_redis_client = Mock()
+        mock_redis_client = AsyncMock()
         mock_redis_client.get.return_value = None
         mock_redis.return_value = mock_redis_client
-        mock_openai.return_value = Mock()
+        mock_openai_client = Mock()
 
         # Set up async response mock
         mock_response = Mock()
@@ -35,10 +39,11 @@ def code_generator():
         mock_response.choices[0].message = {
             "content": "Generated code content"
         }
-        mock_openai.return_value.chat.completions.create = AsyncMock(
+        mock_openai_client.chat.completions.create = AsyncMock(
             return_value=mock_response
         )
-        yield CodeGenerator()
+        client_pool = LLMClientPool(clients={"openai": mock_openai_client})
+        yield CodeGenerator(client_pool=client_pool)
 
 
 @pytest.mark.asyncio
@@ -158,3 +163,81 @@ async def test_generate_code_error_handling(code_generator):
         await code_generator.generate_code(requirements, language)
 
     assert str(exc_info.value) == "500: API Error"
+
+
+@pytest.mark.asyncio
+async def test_generate_code_stream_caches_result(code_generator):
+    """Test streamed generation caches the assembled result."""
+    requirements = {"feature": "user authentication"}
+    code_generator.openai_client.chat.completions.create = AsyncMock(
+        return_value=create_mock_stream(["def ", "login(): pass"])
+    )
+
+    events = [
+        event
+        async for event in code_generator.generate_code_stream(
+            requirements, "python"
+        )
+    ]
+
+    assert events[0].startswith("event: token")
+    assert events[-1].startswith("event: result")
+    payload = code_generator.redis_client.setex.call_args.args[2]
+    cached = code_generator.generation_cache.codec.decode(payload)["value"]
+    assert cached["code"] == "def login(): pass"
+    assert cached["model_used"] == "gpt-4-turbo-preview"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reviews_are_coalesced(code_generator):
+    """Test identical concurrent reviews make one upstream call."""
+    create = code_generator.openai_client.chat.completions.create
+
+    results = await asyncio.gather(
+        *[
+            code_generator.review_code("def f(): pass", "python")
+            for _ in range(5)
+        ]
+    )
+
+    assert create.call_count == 1
+    assert all(result == results[0] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_reworded_requirements_use_semantic_cache(code_generator):
+    """Test near-duplicate requirements reuse an earlier generation."""
+    create = code_generator.openai_client.chat.completions.create
+
+    async def embed(text):
+        return [1.0, 0.01] if "login" in text else [1.0, 0.0]
+
+    code_generator.semantic_cache = SemanticCache(embed)
+
+    first = await code_generator.generate_code(
+        {"feature": "user login"}, "python"
+    )
+    second = await code_generator.generate_code(
+        {"feature": "user sign-in"}, "python"
+    )
+
+    assert create.call_count == 1
+    assert second["code"] == first["code"]
+    assert second["semantic_similarity"] > 0.99
+
+
+@pytest.mark.asyncio
+async def test_generate_code_cache_key_survives_open_circuit(code_generator):
+    """Test cached code is still found while the primary model is down."""
+    requirements = {"feature": "login"}
+    await code_generator.generate_code(requirements, "python")
+    breaker = code_generator.model_selector.breaker("gpt-4-turbo-preview")
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+
+    create = code_generator.openai_client.chat.completions.create
+    create.reset_mock()
+    result = await code_generator.generate_code(requirements, "python")
+
+    assert result["status"] == "success"
+    create.assert_not_called()
@@ -0,0 +1,19 @@
+"""Fixtures shared by the service test suites."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from application.src.models.database import Base
+
+
+@pytest.fixture
+def engine():
+    """In-memory database with the application schema."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    return engine
@@ -0,0 +1,302 @@
+"""Test suite for the background job queue and worker."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from application.src.models.database import User
+from application.src.services.ai.scheduler import (
+    current_project,
+    current_tenant,
+    scheduling,
+)
+from application.src.services.auth_service import get_current_user
+from application.src.services.jobs import handlers, jobs_router
+from application.src.services.jobs.queue import JobQueue
+from application.src.services.jobs.worker import JobWorker
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands the queue uses."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.lists = {}
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        fields = dict(mapping or {field: value})
+        self.hashes.setdefault(key, {}).update(
+            {k.encode(): str(v).encode() for k, v in fields.items()}
+        )
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field.encode())
+
+    async def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(f.encode()) for f in fields]
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def expire(self, key, ttl):
+        return True
+
+    async def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value.encode())
+
+    async def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    async def lrem(self, key, count, value):
+        items = self.lists.get(key, [])
+        if value.encode() in items:
+            items.remove(value.encode())
+            return 1
+        return 0
+
+    async def blmove(self, source, destination, timeout, src, dest):
+        if not self.lists.get(source):
+            await asyncio.sleep(0)
+            return None
+        value = self.lists[source].pop()
+        self.lists.setdefault(destination, []).insert(0, value)
+        return value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        return [
+            await getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.calls
+        ]
+
+
+@pytest.fixture
+def queue():
+    """Create a job queue over the in-memory Redis."""
+    return JobQueue(FakeRedis())
+
+
+@pytest.mark.asyncio
+async def test_enqueue_and_get(queue):
+    """Test queued jobs are visible with their parameters."""
+    job_id = await queue.enqueue("testing.generate", {"code": "x"})
+
+    job = await queue.get(job_id)
+
+    assert job["status"] == "queued"
+    assert job["params"] == {"code": "x"}
+    assert job["progress"] == 0.0
+    assert await queue.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_jobs_in_order(queue):
+    """Test the worker stores results, progress and failures."""
+    seen = []
+
+    async def succeed(params, progress):
+        seen.append(params["n"])
+        await progress(0.5)
+        return {"n": params["n"]}
+
+    async def fail(params, progress):
+        raise Exception("model unavailable")
+
+    worker = JobWorker(
+        queue, {"ok": succeed, "bad": fail}, concurrency=1, poll_timeout=0
+    )
+    first = await queue.enqueue("ok", {"n": 1})
+    second = await queue.enqueue("bad", {})
+    third = await queue.enqueue("ok", {"n": 3})
+
+    for _ in range(3):
+        await worker.process(await queue.dequeue(0))
+
+    assert seen == [1, 3]
+    job = await queue.get(first)
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"n": 1}
+    assert job["progress"] == 1.0
+    failed = await queue.get(second)
+    assert failed["status"] == "failed"
+    assert failed["error"] == "model unavailable"
+    assert (await queue.get(third))["status"] == "succeeded"
+    assert queue.redis_client.lists[queue.processing_key] == []
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_only_visible_to_their_submitter(queue, monkeypatch):
+    """Test other users' jobs are not found, except by project managers."""
+    monkeypatch.setattr(
+        "application.src.services.jobs.routes.get_job_queue", lambda: queue
+    )
+    app = FastAPI()
+    app.include_router(jobs_router, prefix="/jobs")
+    app.state.user = User(id=1, role="developer")
+    app.dependency_overrides[get_current_user] = lambda: app.state.user
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+    with scheduling(tenant="user:1"):
+        mine = await queue.enqueue("testing.generate", {"code": "x"})
+    with scheduling(tenant="user:2"):
+        theirs = await queue.enqueue("testing.generate", {"code": "y"})
+
+    response = await client.get(f"/jobs/{mine}")
+    assert response.status_code == 200
+    assert response.json()["params"] == {"code": "x"}
+    assert (await client.get(f"/jobs/{theirs}")).status_code == 404
+
+    app.state.user = User(id=3, role="project_manager")
+    assert (await client.get(f"/jobs/{theirs}")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_for_their_submitter_and_project(queue):
+    """Test a job's calls are attributed like its submitter's request."""
+    seen = []
+
+    async def record(params, progress):
+        seen.append((current_tenant.get(), current_project.get()))
+
+    worker = JobWorker(queue, {"ok": record}, poll_timeout=0)
+    with scheduling(tenant="user:4", project_id=9):
+        job_id = await queue.enqueue("ok", {})
+    plain = await queue.enqueue("ok", {})
+
+    assert (await queue.get(job_id))["project_id"] == 9
+    assert "project_id" not in await queue.get(plain)
+    for _ in range(2):
+        await worker.process(await queue.dequeue(0))
+    assert seen == [("user:4", 9), ("anonymous", None)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "job_type, factory, method",
+    [
+        ("code.generate_bulk", "_code_generator", "generate_code_bulk"),
+        ("testing.generate_bulk", "_test_generator", "generate_tests_bulk"),
+    ],
+)
+async def test_bulk_job_types(queue, job_type, factory, method):
+    """Test bulk generation can be queued and runs the batch API mode."""
+    generator = Mock()
+    setattr(generator, method, AsyncMock(return_value=[{"status": "ok"}]))
+    job_id = await queue.enqueue(job_type, {"items": [{"code": "x"}]})
+
+    with patch.object(handlers, factory, return_value=generator):
+        await JobWorker(queue).process(await queue.dequeue(0))
+
+    getattr(generator, method).assert_awaited_once_with([{"code": "x"}])
+    assert (await queue.get(job_id))["result"] == [{"status": "ok"}]
+
+
+@pytest.mark.asyncio
+async def test_unknown_job_type_fails(queue):
+    """Test jobs without a handler are failed rather than retried."""
+    job_id = await queue.enqueue("nope", {})
+    worker = JobWorker(queue, {})
+
+    await worker.process(await queue.dequeue(0))
+
+    job = await queue.get(job_id)
+    assert job["status"] == "failed"
+    assert "Unknown job type" in job["error"]
+
+
+@pytest.mark.asyncio
+async def test_stalled_jobs_are_requeued(queue):
+    """Test jobs whose worker stopped heartbeating are handed out again."""
+    job_id = await queue.enqueue("ok", {})
+    await queue.dequeue(0)
+    await queue.start(job_id)
+
+    assert await queue.requeue_stalled(older_than=60) == 0
+    assert await queue.requeue_stalled(older_than=-1) == 1
+    assert await queue.dequeue(0) == job_id
+    assert (await queue.get(job_id))["status"] == "queued"
+
+
+@pytest.mark.asyncio
+async def test_jobs_taken_but_never_started_are_requeued(queue):
+    """Test jobs lost before their first heartbeat are handed out again."""
+    waited = await queue.enqueue("ok", {})
+    lost = await queue.enqueue("ok", {})
+    hour_ago = time.time() - 3600
+    for job_id in (waited, lost):
+        await queue.redis_client.hset(
+            queue._job_key(job_id), "created_at", hour_ago
+        )
+    # Waited an hour in the queue, but was only just taken
+    assert await queue.dequeue(0) == waited
+    # Worker died between taking the job and recording that it had
+    await queue.redis_client.blmove(
+        queue.pending_key, queue.processing_key, 0, "RIGHT", "LEFT"
+    )
+
+    assert await queue.requeue_stalled(older_than=60) == 1
+    assert await queue.dequeue(0) == lost
+    assert await queue.requeue_stalled(older_than=60) == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_jobs_are_dropped_from_processing(queue):
+    """Test ids whose record has expired do not linger in processing."""
+    job_id = await queue.enqueue("ok", {})
+    await queue.dequeue(0)
+    del queue.redis_client.hashes[queue._job_key(job_id)]
+
+    assert await queue.requeue_stalled(older_than=60) == 0
+    assert queue.redis_client.lists[queue.processing_key] == []
+
+
+@pytest.mark.asyncio
+async def test_worker_recovers_stalled_jobs_while_running(queue):
+    """Test the worker keeps scanning for stalled jobs, not only at start."""
+    queue.requeue_stalled = AsyncMock(return_value=0)
+    worker = JobWorker(
+        queue, {}, concurrency=1, poll_timeout=0, recover_interval=0.01
+    )
+
+    running = asyncio.create_task(worker.run())
+    await asyncio.sleep(0.1)
+    worker.stop()
+    await asyncio.wait_for(running, timeout=1)
+
+    assert queue.requeue_stalled.await_count >= 3
+
+
+@pytest.mark.asyncio
+async def test_worker_stops(queue):
+    """Test a stopped worker returns once its loops notice."""
+    worker = JobWorker(queue, {}, concurrency=2, poll_timeout=0)
+    worker.stop()
+
+    await asyncio.wait_for(worker.run(), timeout=1)
@@ -7,15 +7,16 @@ from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from application.src.services.ai.clients import LLMClientPool
 from application.src.services.testing.test_generator import TestGenerator
 
 
 @pytest.fixture
 def test_generator():
     """Create a TestGenerator instance with mocked dependencies."""
-    with patch("redis.Redis.from_url") as mock_redis, patch(
-        "openai.OpenAI"
-    ) as mock_openai, patch(
+    with patch(
+        "application.src.services.testing.test_generator.get_redis"
+    ) as mock_redis, patch(
         "application.src.services.ai.model_selector" ".ModelSelector"
     ) as mock_selector, patch.dict(
         os.environ,
@@ -25,18 +26,18 @@ def test_generator():
         },
     ):
         # Mock Redis
-        mock_redis_client = Mock()
+        mock_redis_client = AsyncMock()
         mock_redis_client.get.return_value = None
         mock_redis.return_value = mock_redis_client
 
         # Mock OpenAI
-        mock_openai.return_value = Mock()
+        mock_openai_client = Mock()
         mock_response = Mock()
         mock_response.choices = [Mock()]
         mock_response.choices[0].message = {
             "content": "Generated test content"
         }
-        mock_openai.return_value.chat.completions.create = AsyncMock(
+        mock_openai_client.chat.completions.create = AsyncMock(
             return_value=mock_response
         )
 
@@ -55,7 +56,8 @@ def test_generator():
             "priority": 2,
         }
 
-        yield TestGenerator()
+        client_pool = LLMClientPool(clients={"openai": mock_openai_client})
+        yield TestGenerator(client_pool=client_pool)
 
 
 @pytest.mark.asyncio
@@ -183,3 +185,79 @@ async def test_generate_tests_error_handling(test_generator):
         await test_generator.generate_tests(code, language, test_type)
 
     assert str(exc_info.value) == "API Error"
+
+
+@pytest.mark.asyncio
+async def test_generate_tests_cache_key_covers_language(test_generator):
+    """Test requests differing only in language are cached separately."""
+    create = test_generator.openai_client.chat.completions.create
+    code = "def add(a, b): return a + b"
+
+    await test_generator.generate_tests(code, "python", "unit")
+    await test_generator.generate_tests(code, "javascript", "unit")
+    await test_generator.generate_tests(code, "python", "unit")
+
+    assert create.call_count == 2
+    keys = [c.args[0] for c in test_generator.redis_client.setex.mock_calls]
+    assert len(set(keys)) == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_tests_batch(test_generator):
+    """Test batch items are deduplicated and returned in order."""
+    create = test_generator.openai_client.chat.completions.create
+    item = {"code": "def f(): pass", "language": "python", "test_type": "unit"}
+    pipe = AsyncMock()
+    pipe.__aenter__.return_value = pipe
+    pipe.get = Mock()
+    pipe.execute.return_value = [None, None]
+    test_generator.redis_client.pipeline = Mock(return_value=pipe)
+
+    results = await test_generator.generate_tests_batch(
+        [item, {**item, "language": "go"}, item]
+    )
+
+    assert create.call_count == 2
+    assert [result["language"] for result in results] == [
+        "python",
+        "go",
+        "python",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_generate_tests_cache_key_survives_open_circuit(test_generator):
+    """Test cached tests are still found while the primary model is down."""
+    code = "def add(a, b): return a + b"
+    await test_generator.generate_tests(code, "python", "unit")
+    breaker = test_generator.model_selector.breaker("gpt-4-turbo-preview")
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+
+    create = test_generator.openai_client.chat.completions.create
+    create.reset_mock()
+    result = await test_generator.generate_tests(code, "python", "unit")
+
+    assert result["status"] == "success"
+    create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_generate_tests_bulk_uses_cache_key_model(test_generator):
+    """Test bulk requests go to the model their cache key names."""
+    code = "def f():\n" + "    x = 1\n" * 2000  # Too long for a 4K model
+    item = {"code": code, "language": "python", "test_type": "unit"}
+    with patch(
+        "application.src.services.testing.test_generator.generate_bulk",
+        new=AsyncMock(return_value=[{"status": "success"}]),
+    ) as generate_bulk:
+        await test_generator.generate_tests_bulk([item])
+
+    (bulk_item,) = generate_bulk.call_args.args[2]
+    assert bulk_item.request.model == "gpt-4"
+    assert bulk_item.key == test_generator._cache_key(
+        code, "python", "unit", None
+    )
+    assert bulk_item.key == test_generator.generation_cache.key(
+        code, "python", "unit", None, model="gpt-4"
+    )
@@ -0,0 +1,193 @@
+"""Test suite for hourly usage rollups and the usage API."""
+
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from application.src.core.config import Settings
+from application.src.models.database import UsageRollup, User
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.ai.model_selector import ModelSelector
+from application.src.services.ai.scheduler import scheduling
+from application.src.services.ai.usage_log import AILogWriter
+from application.src.services.auth_service import get_current_user
+from application.src.services.usage import (
+    apply_rollups,
+    query_usage,
+    usage_router,
+)
+from application.src.services.usage.rollups import cost_of
+from application.tests.utils.model_test_utils import (
+    create_mock_client,
+    create_mock_completion,
+    mock_token_usage,
+)
+
+PRICING = {"gpt-4": {"prompt": 0.03, "completion": 0.06}}
+
+
+def log(minute, model="gpt-4", tenant="user:1", hour=9, tokens=(100, 50)):
+    """AI log row values."""
+    return {
+        "created_at": datetime(2026, 1, 1, hour, minute),
+        "model": model,
+        "provider": "openai",
+        "tenant": tenant,
+        "prompt_tokens": tokens[0],
+        "completion_tokens": tokens[1],
+        "tokens_used": sum(tokens),
+        "latency": 1.0,
+    }
+
+
+def ingest(engine, rows):
+    """Apply rows to the rollups in one transaction."""
+    with engine.begin() as connection:
+        apply_rollups(connection, rows, PRICING)
+
+
+def test_cost_uses_per_thousand_prices():
+    """Test cost is priced per 1K tokens and 0 when unpriced."""
+    assert cost_of("gpt-4", 1000, 500, PRICING) == pytest.approx(0.06)
+    assert cost_of("unknown", 1000, 500, PRICING) == 0.0
+
+
+def test_rollups_accumulate_across_batches(engine):
+    """Test repeated ingests add to the same hourly row."""
+    ingest(engine, [log(1), log(30)])
+    ingest(engine, [log(59), log(5, hour=10)])
+
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(UsageRollup).order_by(UsageRollup.hour)
+        ).all()
+    assert [(r.hour.hour, r.requests) for r in rows] == [(9, 3), (10, 1)]
+    assert rows[0].total_tokens == 450
+    assert rows[0].project_id == 0
+    assert rows[0].cost == pytest.approx(
+        3 * cost_of("gpt-4", 100, 50, PRICING)
+    )
+
+
+def test_query_groups_and_filters(engine):
+    """Test range queries are answered from the rollups."""
+    ingest(
+        engine,
+        [
+            log(1),
+            log(2, tenant="user:2"),
+            log(3, model="claude"),
+            log(4, hour=11),
+        ],
+    )
+    start, end = datetime(2026, 1, 1, 9, 30), datetime(2026, 1, 1, 11)
+
+    by_model = query_usage(engine, start, end, ["model"])
+    assert [(r["model"], r["requests"]) for r in by_model] == [
+        ("claude", 1),
+        ("gpt-4", 2),
+    ]
+
+    mine = query_usage(engine, start, end, ["user"], {"user": "user:2"})
+    assert [(r["user"], r["total_tokens"]) for r in mine] == [("user:2", 150)]
+
+    assert query_usage(engine, end, datetime(2026, 1, 2), []) == [
+        {
+            "requests": 1,
+            "prompt_tokens": 100,
+            "completion_tokens": 50,
+            "total_tokens": 150,
+            "cost": pytest.approx(cost_of("gpt-4", 100, 50, PRICING)),
+            "latency": 1.0,
+        }
+    ]
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    """Client for the usage API as a developer."""
+    monkeypatch.setattr(
+        "application.src.services.usage.routes.get_engine", lambda: engine
+    )
+    app = FastAPI()
+    app.include_router(usage_router, prefix="/usage")
+    app.state.user = User(id=1, role="developer")
+    app.dependency_overrides[get_current_user] = lambda: app.state.user
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+@pytest.mark.asyncio
+async def test_usage_api_limits_developers_to_own_usage(client, engine):
+    """Test developers only see their own usage."""
+    ingest(engine, [log(1), log(2, tenant="user:2")])
+    params = {
+        "start": "2026-01-01T00:00:00",
+        "end": "2026-01-02T00:00:00",
+        "group_by": ["user"],
+    }
+
+    response = await client.get("/usage", params=params)
+    assert response.status_code == 200
+    body = response.json()
+    assert [row["user"] for row in body["rows"]] == ["user:1"]
+    assert body["totals"]["requests"] == 1
+
+    response = await client.get("/usage", params={**params, "user": "user:2"})
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_usage_api_reports_project_usage(client, engine):
+    """Test completions made for a project are reported for it."""
+    openai_client = create_mock_client("openai")
+    openai_client.chat.completions.create.return_value = (
+        create_mock_completion("ok", mock_token_usage(100, 50))
+    )
+    usage_log = AILogWriter(engine, pricing=PRICING)
+    model_selector = ModelSelector(
+        Settings(RATE_LIMIT_ENABLED=False),
+        client_pool=LLMClientPool(clients={"openai": openai_client}),
+        usage_log=usage_log,
+    )
+    with scheduling(tenant="user:1"):
+        for project_id in (7, 7, 8):
+            with scheduling(project_id=project_id):
+                await model_selector.generate_completion(
+                    "prompt", model="gpt-4"
+                )
+        await model_selector.generate_completion("prompt", model="gpt-4")
+    await usage_log.close()
+
+    now = datetime.utcnow()
+    response = await client.get(
+        "/usage",
+        params={
+            "start": (now - timedelta(hours=2)).isoformat(),
+            "end": (now + timedelta(hours=1)).isoformat(),
+            "group_by": ["project_id"],
+            "project_id": 7,
+        },
+    )
+
+    assert response.status_code == 200
+    rows = response.json()["rows"]
+    assert [(row["project_id"], row["requests"]) for row in rows] == [(7, 2)]
+    assert rows[0]["total_tokens"] == 300
+
+
+@pytest.mark.asyncio
+async def test_usage_api_rejects_bad_queries(client):
+    """Test unknown dimensions and empty ranges are rejected."""
+    response = await client.get("/usage", params={"group_by": "prompt"})
+    assert response.status_code == 400
+
+    response = await client.get(
+        "/usage",
+        params={"start": "2026-01-02T00:00:00", "end": "2026-01-01T00:00:00"},
+    )
+    assert response.status_code == 400
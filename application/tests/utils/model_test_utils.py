@@ -1,7 +1,7 @@
 """Shared utilities for AI model testing."""
 
 import asyncio
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from unittest.mock import AsyncMock, Mock
 
 
@@ -25,6 +25,27 @@ def create_mock_completion(
     return mock_response
 
 
+async def create_mock_stream(
+    deltas: List[str], tokens: Optional[Dict[str, int]] = None
+) -> AsyncIterator[Mock]:
+    """Create a mock streamed chat completion.
+
+    Args:
+        deltas: Text pieces emitted one chunk at a time
+        tokens: Optional token usage sent in a final chunk
+
+    Yields:
+        Mock chunks simulating a streamed model response
+    """
+    for delta in deltas:
+        chunk = Mock(usage=None)
+        chunk.choices = [Mock()]
+        chunk.choices[0].delta.content = delta
+        yield chunk
+    if tokens:
+        yield Mock(usage=tokens, choices=[])
+
+
 def setup_mock_future(
     content: str, tokens: Optional[Dict[str, int]] = None
 ) -> asyncio.Future:
@@ -0,0 +1,67 @@
+"""Micro-benchmark for ModelSelector routing as model variants grow.
+
+Run with ``PYTHONPATH=. python tests/performance/benchmark_model_selector.py``
+from the repository root.
+"""
+
+import argparse
+import random
+import timeit
+
+from application.src.core.config import Settings
+from application.src.services.ai.clients import LLMClientPool
+from application.src.services.ai.model_selector import ModelSelector
+
+
+def build_models(count: int) -> dict:
+    """Create a model table with the given number of variants."""
+    rng = random.Random(count)
+    return {
+        f"variant-{i}": {
+            "name": f"variant-{i}",
+            "max_tokens": rng.choice([4096, 8192, 16384, 32768, 128000]),
+            "temperature": 0.7,
+            "priority": i + 1,
+        }
+        for i in range(count)
+    }
+
+
+def bench(count: int, number: int) -> dict:
+    """Time selection and fallback lookups, in microseconds per call."""
+    selector = ModelSelector(
+        Settings(OPENAI_MODELS=build_models(count)),
+        client_pool=LLMClientPool(clients={}),
+    )
+    last = f"variant-{count - 1}"
+    cases = {
+        "select": lambda: selector.select_model("code_generation"),
+        "select_tokens": lambda: selector.select_model(
+            "code_generation", token_estimate=20000
+        ),
+        "fallback": lambda: selector.get_fallback_model("variant-0"),
+        "find_last": lambda: selector._find_model(last),
+    }
+    return {
+        name: timeit.timeit(case, number=number) / number * 1e6
+        for name, case in cases.items()
+    }
+
+
+def main() -> None:
+    """Print per-call timings for growing model tables."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'models':>7} " + " ".join(f"{n:>14}" for n in bench(1, 1)))
+    for count in [3, 10, 30, 100, 300]:
+        timings = bench(count, args.number)
+        print(
+            f"{count:>7} "
+            + " ".join(f"{t:>12.3f}us" for t in timings.values())
+        )
+
+
+if __name__ == "__main__":
+    main()